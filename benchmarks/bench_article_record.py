@@ -0,0 +1,96 @@
+"""Benchmark des enregistrements d'articles : dictionnaire avec `raw_html` contre `ProductArticle`.
+
+Un lot de `--articles` pages (les pages de `benchmarks/fixtures/`, répétées)
+est parsé deux fois et gardé en mémoire comme le fait le pipeline entre ses
+étages : une fois avec l'ancien enregistrement (dictionnaire + `str(soup)`,
+le DOM re-sérialisé), une fois avec `ProductArticle`. On mesure la durée et
+la mémoire retenue par le lot ; avec `--raw-html`, les pages brutes sont en
+plus écrites compressées dans un `RawHtmlStore` temporaire.
+
+Usage : python benchmarks/bench_article_record.py --articles 200 --raw-html
+"""
+import argparse
+import gc
+import glob
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.extraction import (extract_blocks, extract_product_image, extract_title, main_content_element,
+                               parse_product_page)
+from scrapx.parsing import make_soup
+from scrapx.raw_html_store import RawHtmlStore
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def parse_as_dict(html, parser, url):
+    """L'ancien `ProductScraper.parse_article`."""
+    soup = make_soup(html, parser)
+    content_element = main_content_element(soup)
+    return {
+        'url': url,
+        'title': extract_title(soup),
+        'content': content_element.get_text(separator=' ', strip=True),
+        'paragraphs': extract_blocks(content_element),
+        'image_url': extract_product_image(soup),
+        'raw_html': str(soup),
+    }
+
+
+def parse_all(parse, pages, store=None):
+    records = []
+    for i, html in enumerate(pages):
+        url = f"https://example.com/article-{i}"
+        if store:
+            store.save(url, html)
+        records.append(parse(html, 'lxml', url))
+    return records
+
+
+def run(label, parse, pages, store=None):
+    # Durée sans tracemalloc (qui ralentit fortement le parsing), mémoire dans un second passage
+    start = time.perf_counter()
+    parse_all(parse, pages, store)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    records = parse_all(parse, pages)
+    # Après un collect : ne reste que ce que le lot garde (les arbres sont libérés)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    print(f"{label:<24}: {elapsed:.2f}s | lot retenu {retained / 1024 / 1024:6.1f} Mo | "
+          f"pic {peak / 1024 / 1024:5.1f} Mo")
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la mémoire des enregistrements d'articles")
+    parser.add_argument('--articles', type=int, default=200, help="Nombre d'articles gardés dans le lot")
+    parser.add_argument('--raw-html', action='store_true', help="Écrire aussi les pages brutes compressées")
+    args = parser.parse_args()
+
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            corpus.append(f.read())
+    pages = [corpus[i % len(corpus)] for i in range(args.articles)]
+
+    before = run('dict + raw_html', parse_as_dict, pages)
+    after = run('ProductArticle', parse_product_page, pages)
+    print(f"Mémoire du lot divisée par {before / max(after, 1):.1f}")
+    if args.raw_html:
+        with tempfile.TemporaryDirectory() as directory:
+            store = RawHtmlStore(directory)
+            run('ProductArticle + disque', parse_product_page, pages, store)
+            store.report()
+
+
+if __name__ == '__main__':
+    main()
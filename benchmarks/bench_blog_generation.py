@@ -0,0 +1,66 @@
+"""Benchmark de la génération d'articles : appel structuré unique contre titre puis article.
+
+Les deux modes de `BlogArticleGenerator` tournent sur le même modèle factice
+(latence réglable) à travers le répartiteur Gemini, sans cache : le mode
+`single` doit faire deux fois moins de requêtes et prendre environ deux fois
+moins de temps.
+
+Usage : python benchmarks/bench_blog_generation.py --articles 20 --latency 0.3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.blog_generation import SINGLE_CALL, TWO_STEP, BlogArticleGenerator
+from scrapx.fake_model import FakeGenerativeModel
+from scrapx.gemini import GeminiDispatcher
+
+BODY = "# Un titre\n\n" + "Un paragraphe réécrit de l'article. " * 200
+
+
+def respond(prompt):
+    """Réponse plausible selon le prompt : titre seul, JSON structuré ou document MDX."""
+    if prompt.lstrip().startswith("Génère uniquement un titre"):
+        return "'Un titre SEO pour l''article'"
+    if "objet JSON" in prompt:
+        return json.dumps({'title': "L'article réécrit", 'excerpt': "Un extrait.",
+                           'tags': ['jeux', 'tech', 'news'], 'body': BODY}, ensure_ascii=False)
+    return f"---\npublishDate: 2024-01-02\ntitle: 'Un titre'\n---\n\n{BODY}"
+
+
+def run(mode, contents, latency, concurrency):
+    model = FakeGenerativeModel(respond, latency=latency)
+    dispatcher = GeminiDispatcher(model, rpm=100_000, tpm=1_000_000_000, max_concurrency=concurrency)
+    generator = BlogArticleGenerator(dispatcher, mode)
+    start = time.perf_counter()
+    # Les workers de l'étage de génération appellent le générateur en parallèle
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        articles = list(pool.map(generator.generate, contents))
+    elapsed = time.perf_counter() - start
+    generated = sum(1 for article in articles if article)
+    print(f"{mode:<9}: {generated}/{len(contents)} article(s), {model.calls} requête(s) "
+          f"({model.calls / len(contents):.1f} par article) en {elapsed:.2f}s")
+    return model.calls, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la génération d'articles (modèle factice)")
+    parser.add_argument('--articles', type=int, default=20, help="Nombre d'articles générés")
+    parser.add_argument('--latency', type=float, default=0.3, help="Latence simulée du modèle (s)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Générations simultanées")
+    args = parser.parse_args()
+
+    contents = [f"Contenu source de l'article {i}. " * 100 for i in range(args.articles)]
+    two_step_calls, two_step_time = run(TWO_STEP, contents, args.latency, args.concurrency)
+    single_calls, single_time = run(SINGLE_CALL, contents, args.latency, args.concurrency)
+    print(f"Requêtes divisées par {two_step_calls / max(1, single_calls):.1f}, "
+          f"durée par {two_step_time / max(single_time, 1e-9):.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark de la génération en streaming : délai avant le premier octet écrit sur disque.
+
+Le même article est généré par un modèle factice (latence répartie entre les
+fragments de la réponse), une fois en attendant la réponse complète puis en
+l'écrivant, une fois en écrivant chaque fragment dès qu'il arrive. On mesure
+le délai avant que le fichier ne contienne ses premiers octets et la durée
+totale, pour les deux modes de génération.
+
+Usage : python benchmarks/bench_blog_streaming.py --latency 2 --chunk-size 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.blog_generation import SINGLE_CALL, TWO_STEP, BlogArticleGenerator
+from scrapx.fake_model import FakeGenerativeModel
+from scrapx.gemini import GeminiDispatcher
+
+BODY = "# Un titre\n\n" + "\n\n".join("Un paragraphe réécrit de l'article, assez long pour le test. " * 6
+                                       for _ in range(40))
+
+
+def respond(prompt):
+    """Réponse plausible selon le prompt : titre seul, JSON structuré ou document MDX."""
+    if prompt.lstrip().startswith("Génère uniquement un titre"):
+        return "'Un titre SEO pour l''article'"
+    if "objet JSON" in prompt:
+        return json.dumps({'title': "L'article réécrit", 'excerpt': "Un extrait.",
+                           'tags': ['jeux', 'tech', 'news'], 'body': BODY}, ensure_ascii=False)
+    return f"```markdown\n---\npublishDate: 2024-01-02\ntitle: 'Un titre'\n---\n\n{BODY}\n```"
+
+
+def write(chunks, path):
+    """Écrit `chunks` dans `path` ; retourne le délai avant le premier octet écrit et la durée totale."""
+    start = time.perf_counter()
+    first = None
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+            if first is None:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def run(mode, latency, chunk_size, directory):
+    model = FakeGenerativeModel(respond, latency=latency, chunk_size=chunk_size)
+    generator = BlogArticleGenerator(GeminiDispatcher(model, rpm=100_000, tpm=1_000_000_000), mode)
+    content = "Contenu source de l'article. " * 100
+
+    path = os.path.join(directory, f"{mode}-complet.mdx")
+    # La génération complète a lieu au premier tour de boucle de `write`
+    full_first, full_total = write((generator.generate(content) for _ in range(1)), path)
+    with open(path, encoding='utf-8') as f:
+        expected = f.read()
+
+    path = os.path.join(directory, f"{mode}-stream.mdx")
+    stream_first, stream_total = write(generator.stream(content), path)
+    with open(path, encoding='utf-8') as f:
+        identical = f.read() == expected
+
+    print(f"{mode:<9}: premier octet {full_first:.2f}s → {stream_first:.2f}s | "
+          f"total {full_total:.2f}s → {stream_total:.2f}s | fichier identique : {'oui' if identical else 'NON'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la génération en streaming (modèle factice)")
+    parser.add_argument('--latency', type=float, default=2.0, help="Durée simulée d'une réponse complète (s)")
+    parser.add_argument('--chunk-size', type=int, default=200, help="Taille des fragments (caractères)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in (SINGLE_CALL, TWO_STEP):
+            run(mode, args.latency, args.chunk_size, directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark de la condensation du contenu source : troncature [:4000] contre budget de tokens.
+
+Pour chaque page de `benchmarks/fixtures`, on compare le texte envoyé à Gemini
+par l'ancienne troncature et par `condense` : nombre de tokens, et part des
+lignes chiffrées de la page (caractéristiques, lignes de tableau) conservées.
+
+Usage : python benchmarks/bench_condense.py --budget 1000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.condense import DEFAULT_CONTENT_TOKENS, clean_blocks, condense
+from scrapx.extraction import parse_product_page
+from scrapx.gemini import estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def kept(blocks, text):
+    """Part des blocs chiffrés de `blocks` présents en entier dans `text`."""
+    numeric = [block for block in blocks if any(char.isdigit() for char in block)]
+    if not numeric:
+        return 1.0
+    return sum(1 for block in numeric if block in text) / len(numeric)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la condensation du contenu source")
+    parser.add_argument('--budget', type=int, default=DEFAULT_CONTENT_TOKENS, help="Budget de tokens")
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            page = parse_product_page(f.read(), 'lxml')
+        blocks = clean_blocks(page.paragraphs)
+        truncated = ' '.join(page.content.split())[:4000]
+        start = time.perf_counter()
+        condensed = condense(page.paragraphs, args.budget)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{os.path.basename(path):<24} [:4000] {estimate_tokens(truncated):>5} tokens, "
+              f"{kept(blocks, truncated):4.0%} des lignes chiffrées | condensé {estimate_tokens(condensed):>5} "
+              f"tokens, {kept(blocks, condensed):4.0%} ({elapsed:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
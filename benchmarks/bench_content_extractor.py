@@ -0,0 +1,113 @@
+"""Évaluation des moteurs d'extraction du texte principal : cascade de sélecteurs contre densité de texte.
+
+Sur les pages de `benchmarks/fixtures/`, le texte principal est extrait comme
+le font les deux scripts (`article_content_element` pour le blog,
+`main_content_element` pour les fiches) avec chaque moteur. Pour chaque page :
+longueur extraite et tokens estimés (réduction par rapport à la cascade), part
+du texte dans des liens et blocs parasites (cookies, « À lire aussi »...)
+restés dans l'extrait, part des longs paragraphes sans lien de la page (le
+corps du texte) conservés, et durée de l'extraction seule : choix de
+l'élément, texte et blocs gardés par les scripts (arbres construits hors
+chronomètre).
+
+Usage : python benchmarks/bench_content_extractor.py --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parse import FIXTURES_DIR, load_fixtures
+from scrapx.condense import BOILERPLATE, BOILERPLATE_MAX_CHARS
+from scrapx.density import CASCADE, EXTRACTORS
+from scrapx.extraction import article_content_element, extract_blocks, main_content_element
+from scrapx.gemini import estimate_tokens
+from scrapx.parsing import make_soup, resolve_parser
+
+SCRIPTS = {'blog': article_content_element, 'fiche': main_content_element}
+# Pages de liste : les scripts n'en extraient que les liens, elles restent hors des totaux
+LISTING_PAGES = {'blog_index.html'}
+# Paragraphe assez long et sans lien : corps du texte (les avis clients font moins)
+BODY_PARAGRAPH_CHARS = 150
+
+
+def body_paragraphs(html, parser):
+    soup = make_soup(html, parser)
+    return {p.get_text(' ', strip=True) for p in soup.find_all('p')
+            if len(p.get_text(strip=True)) >= BODY_PARAGRAPH_CHARS and not p.find('a')}
+
+
+def measure(html, parser, content_element, extractor, rounds):
+    """Extrait et mesure le texte d'une page ; durée moyenne de l'extraction seule."""
+    trees = [make_soup(html, parser) for _ in range(rounds)]
+    start = time.perf_counter()
+    for soup in trees:
+        # Ce que gardent les scripts : le texte et ses blocs
+        element = content_element(soup, extractor=extractor)
+        text = element.get_text(separator=' ', strip=True) if element else ""
+        blocks = extract_blocks(element)
+    elapsed = (time.perf_counter() - start) / rounds
+    if element is None:
+        return {'chars': 0, 'tokens': 0, 'links': 0, 'boilerplate': 0, 'paragraphs': set(), 'ms': elapsed * 1000}
+    length = len(element.get_text(strip=True))
+    links = sum(len(link.get_text(strip=True)) for link in element.find_all('a'))
+    return {
+        'chars': length,
+        'tokens': estimate_tokens(text),
+        'links': links / max(length, 1),
+        'boilerplate': sum(1 for block in blocks if len(block) <= BOILERPLATE_MAX_CHARS and BOILERPLATE.search(block)),
+        'paragraphs': {p.get_text(' ', strip=True) for p in element.find_all('p')},
+        'ms': elapsed * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évaluation des moteurs d'extraction du texte principal")
+    parser.add_argument('--rounds', type=int, default=20, help='Nombre de passages par page')
+    parser.add_argument('--parser', default='auto', help='Parseur HTML (auto, lxml, html.parser)')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Dossier des pages HTML enregistrées')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        sys.exit(f"Aucune page .html dans {args.fixtures}")
+    html_parser = resolve_parser(args.parser)
+    print(f"{len(pages)} page(s) | parseur : {html_parser}")
+    for script, content_element in SCRIPTS.items():
+        print(f"\n[{script}] {'page':<24} {'moteur':<8} {'car.':>6} {'tokens':>7} {'réduction':>10} "
+              f"{'liens':>6} {'parasites':>9} {'corps':>6} {'ms':>6}")
+        totals = {extractor: {'tokens': 0, 'ms': 0.0, 'kept': 0, 'boilerplate': 0} for extractor in EXTRACTORS}
+        body_total = 0
+        for name, html in pages.items():
+            body = body_paragraphs(html, html_parser)
+            if name not in LISTING_PAGES:
+                body_total += len(body)
+            reference = None
+            for extractor in EXTRACTORS:
+                result = measure(html, html_parser, content_element, extractor, args.rounds)
+                if extractor == CASCADE:
+                    reference = result['tokens']
+                kept = len(body & result['paragraphs'])
+                if name not in LISTING_PAGES:
+                    total = totals[extractor]
+                    total['tokens'] += result['tokens']
+                    total['ms'] += result['ms']
+                    total['kept'] += kept
+                    total['boilerplate'] += result['boilerplate']
+                reduction = 1 - result['tokens'] / max(reference, 1)
+                print(f"{'':<7} {name:<24} {extractor:<8} {result['chars']:>6} {result['tokens']:>7} "
+                      f"{reduction:>10.0%} {result['links']:>6.0%} {result['boilerplate']:>9} "
+                      f"{kept:>2}/{len(body):<3} {result['ms']:>6.2f}")
+        cascade = totals[CASCADE]
+        print(f"  Totaux hors pages de liste ({', '.join(sorted(LISTING_PAGES))}) :")
+        for extractor, total in totals.items():
+            print(f"  Total {extractor:<8}: {total['tokens']:>6} tokens "
+                  f"({1 - total['tokens'] / max(cascade['tokens'], 1):.0%} de moins que la cascade), "
+                  f"{total['boilerplate']} bloc(s) parasite(s), "
+                  f"{total['kept']}/{body_total} paragraphes du corps conservés, {total['ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark des profils d'extraction par domaine sur de gros lots d'un même site.
+
+Chaque page de `benchmarks/fixtures/` joue le gabarit d'un site dont on
+extrait `--pages` pages (champs des deux scripts : contenu, titre, image).
+On compte les cascades complètes de sélecteurs et on mesure la durée de
+l'extraction (arbres construits hors chronomètre), sans puis avec profils.
+Puis chaque site change de gabarit (refonte) : les sélecteurs appris qui ne
+trouvent plus rien sont corrigés aussitôt ; ceux qui trouvent encore quelque
+chose, et les `NO_MATCH`, attendent la revérification périodique
+(`RECHECK_EVERY` pages) : ce sont les seules pages dont l'extraction peut
+différer de celle de la cascade.
+
+Usage : python benchmarks/bench_extraction_profiles.py --pages 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parse import FIXTURES_DIR, load_fixtures
+from scrapx.extraction import (article_content_element, extract_main_image, extract_product_image, extract_title,
+                               main_content_element)
+from scrapx.extraction_profiles import RECHECK_EVERY, ExtractionProfiles
+from scrapx.parsing import make_soup, resolve_parser
+
+# Champs cherchés par page : contenu, titre et image (fiche), contenu et image (article)
+FIELDS_PER_PAGE = 5
+
+
+def extract(url, html, parser, profiles=None):
+    """Extraction des deux scripts ; retourne (résultats, durée hors construction des arbres)."""
+    fiche_soup, blog_soup = make_soup(html, parser), make_soup(html, parser)
+    fiche = profiles['fiche'].profile_for(url) if profiles else None
+    blog = profiles['blog'].profile_for(url) if profiles else None
+    start = time.perf_counter()
+    element = main_content_element(fiche_soup, fiche)
+    results = (element.get_text(separator=' ', strip=True), extract_title(fiche_soup, fiche),
+               extract_product_image(fiche_soup, fiche))
+    element = article_content_element(blog_soup, blog)
+    results += (element.get_text(strip=True) if element else "", extract_main_image(blog_soup, blog))
+    elapsed = time.perf_counter() - start
+    if profiles:
+        profiles['fiche'].update(url, fiche)
+        profiles['blog'].update(url, blog)
+    return results, elapsed
+
+
+def run(label, pages, parser, profiles=None):
+    """Extrait `pages` ([(url, html)]) ; retourne les résultats de chaque page."""
+    misses_before = sum(store.misses for store in profiles.values()) if profiles else 0
+    invalidated_before = sum(store.invalidated for store in profiles.values()) if profiles else 0
+    total = 0.0
+    results = []
+    for url, html in pages:
+        result, elapsed = extract(url, html, parser, profiles)
+        results.append(result)
+        total += elapsed
+    lookups = len(pages) * FIELDS_PER_PAGE
+    cascades = sum(store.misses for store in profiles.values()) - misses_before if profiles else lookups
+    line = (f"{label:<24}: {total / len(pages) * 1000:6.2f} ms d'extraction par page | "
+            f"{cascades}/{lookups} cascade(s) complète(s) ({cascades / lookups:.1%})")
+    if profiles:
+        line += f" | {sum(store.invalidated for store in profiles.values()) - invalidated_before} profil(s) corrigé(s)"
+    print(line)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des profils d'extraction par domaine")
+    parser.add_argument('--pages', type=int, default=200, help="Pages extraites par site")
+    parser.add_argument('--parser', default='auto', help='Parseur HTML (auto, lxml, html.parser)')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Dossier des pages HTML enregistrées')
+    args = parser.parse_args()
+
+    templates = list(load_fixtures(args.fixtures).values())
+    if not templates:
+        sys.exit(f"Aucune page .html dans {args.fixtures}")
+    html_parser = resolve_parser(args.parser)
+    sites = [f"https://site-{i}.example" for i in range(len(templates))]
+    pages = [(f"{site}/page-{n}", html) for n in range(args.pages) for site, html in zip(sites, templates)]
+    # Refonte : chaque site prend le gabarit du suivant
+    redesign = [(f"{site}/refonte-{n}", templates[(i + 1) % len(templates)])
+                for n in range(args.pages) for i, site in enumerate(sites)]
+
+    print(f"{len(sites)} site(s) x {args.pages} page(s) | parseur : {html_parser}")
+    expected = run('cascade', pages, html_parser)
+    expected_redesign = run('cascade (refonte)', redesign, html_parser)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'profiles.sqlite3')
+        profiles = {'fiche': ExtractionProfiles('fiche', path), 'blog': ExtractionProfiles('blog', path)}
+        learned = run('profils', pages, html_parser, profiles)
+        learned_redesign = run('profils (refonte)', redesign, html_parser, profiles)
+        for store in profiles.values():
+            store.close()
+    stable = sum(a != b for a, b in zip(expected, learned))
+    redesigned = sum(a != b for a, b in zip(expected_redesign, learned_redesign))
+    print(f"Pages dont l'extraction diffère de la cascade : {stable}/{len(pages)} sur les sites stables, "
+          f"{redesigned}/{len(redesign)} pendant la refonte (avant revérification, une page sur {RECHECK_EVERY})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark du téléchargement séquentiel vs concurrent (pages/seconde).
+
+Usage : python benchmarks/bench_fetch.py --pages 200 --latency 0.05 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_server import LocalServer
+from scrapx.fetcher import AsyncFetcher
+
+
+def run_sequential(urls):
+    session = requests.Session()
+    for url in urls:
+        response = session.get(url, timeout=10)
+        response.raise_for_status()
+        _ = response.content
+
+
+async def _consume(fetcher, urls):
+    failures = 0
+    async for page in fetcher.fetch_iter(urls):
+        if not page.ok:
+            failures += 1
+    return failures
+
+
+def run_concurrent(urls, concurrency):
+    fetcher = AsyncFetcher(requests.Session(), concurrency)
+    try:
+        return asyncio.run(_consume(fetcher, urls))
+    finally:
+        fetcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du moteur de téléchargement concurrent')
+    parser.add_argument('--pages', type=int, default=200, help='Nombre de pages à télécharger')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latence simulée du serveur (s)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrence globale')
+    args = parser.parse_args()
+
+    with LocalServer(latency=args.latency) as server:
+        urls = [f"{server.base_url}/article/{i}" for i in range(args.pages)]
+
+        start = time.perf_counter()
+        run_sequential(urls)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        failures = run_concurrent(urls, args.concurrency)
+        concurrent = time.perf_counter() - start
+
+    print(f"Pages : {args.pages} | latence : {args.latency * 1000:.0f} ms | concurrence : {args.concurrency}")
+    print(f"Séquentiel : {sequential:.2f} s ({args.pages / sequential:.1f} pages/s)")
+    print(f"Concurrent : {concurrent:.2f} s ({args.pages / concurrent:.1f} pages/s), échecs : {failures}")
+    print(f"Accélération : x{sequential / concurrent:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark des téléchargements bornés : refus précoce et taille maximale des corps.
+
+Le serveur local sert des pages normales, un PDF et une page HTML énorme
+envoyée sans Content-Length (transfert par morceaux). On les télécharge avec
+et sans limite, en mesurant la durée, les octets reçus et le pic de mémoire
+allouée : avec la limite, le PDF est refusé dès les en-têtes et la page
+énorme est abandonnée après `--max-mb` Mo.
+
+Usage : python benchmarks/bench_fetch_limits.py --huge-mb 50 --max-mb 10
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_server import LocalServer, _Handler
+from scrapx.fetcher import AsyncFetcher
+from scrapx.http_client import create_session
+
+BLOCK = b"<p>" + b"Du texte de remplissage. " * 2600 + b"</p>\n"   # ~64 Ko
+
+
+class _LimitsHandler(_Handler):
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith('/document.pdf'):
+            body = b"%PDF-1.7\n" + b"\0" * (server.huge_mb * 1024 * 1024 // 4)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self._write(body)
+        elif self.path.startswith('/huge'):
+            # Pas de Content-Length : seule la lecture par morceaux permet de s'arrêter à temps
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for _ in range(server.huge_mb * 1024 * 1024 // len(BLOCK)):
+                if not self._write(b"%x\r\n%s\r\n" % (len(BLOCK), BLOCK)):
+                    return
+            self._write(b"0\r\n\r\n")
+        else:
+            super().do_GET()
+
+    def _write(self, data: bytes) -> bool:
+        try:
+            self.wfile.write(data)
+            self.server.bytes_sent += len(data)
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+
+def run(label, server, max_body):
+    urls = [f"{server.base_url}/article-{i}" for i in range(5)]
+    urls += [f"{server.base_url}/document.pdf", f"{server.base_url}/huge"]
+    fetcher = AsyncFetcher(create_session(1), 1, max_body=max_body)
+    sent_before = server.bytes_sent
+    tracemalloc.start()
+    start = time.perf_counter()
+    outcomes = []
+    for url in urls:
+        try:
+            outcomes.append(f"{len(fetcher.get(url).content) // 1024} Ko")
+        except requests.RequestException as e:
+            outcomes.append(str(e))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    fetcher.close()
+    print(f"{label:<12}: {elapsed:.2f}s | pic mémoire {peak / 1024 / 1024:.1f} Mo | "
+          f"~{(server.bytes_sent - sent_before) / 1024 / 1024:.1f} Mo envoyés par le serveur")
+    print(f"              PDF : {outcomes[-2]} | page énorme : {outcomes[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des téléchargements bornés")
+    parser.add_argument('--huge-mb', type=int, default=50, help="Taille de la page énorme (Mo)")
+    parser.add_argument('--max-mb', type=float, default=10, help="Taille maximale acceptée (Mo)")
+    args = parser.parse_args()
+
+    with LocalServer(handler=_LimitsHandler, etags=False) as server:
+        server.httpd.huge_mb = args.huge_mb
+        run('sans limite', server, 0)  # le type de contenu reste contrôlé
+        run('avec limite', server, int(args.max_mb * 1024 * 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark du répartiteur Gemini sur un modèle factice (latence et erreurs 429 simulées).
+
+Usage : python benchmarks/bench_gemini.py --prompts 40 --latency 0.5 --concurrency 8 --rpm 600
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.fake_model import FakeGenerativeModel
+from scrapx.gemini import GeminiDispatcher
+
+
+def run_sequential(prompts, latency):
+    model = FakeGenerativeModel(latency=latency)
+    for prompt in prompts:
+        model.generate_content(prompt)
+
+
+def run_dispatcher(prompts, latency, concurrency, rpm, tpm, fail_every):
+    model = FakeGenerativeModel(latency=latency, fail_every=fail_every)
+    dispatcher = GeminiDispatcher(model, rpm=rpm, tpm=tpm, max_concurrency=concurrency,
+                                  base_backoff=0.1, max_backoff=1.0)
+    # Les workers de l'étage de génération appellent le répartiteur en parallèle
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(dispatcher.generate, prompts))
+    return model, dispatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du répartiteur Gemini (modèle factice)')
+    parser.add_argument('--prompts', type=int, default=40, help='Nombre de requêtes')
+    parser.add_argument('--latency', type=float, default=0.5, help='Latence simulée du modèle (s)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requêtes simultanées')
+    parser.add_argument('--rpm', type=float, default=600, help='Budget de requêtes par minute')
+    parser.add_argument('--tpm', type=float, default=1_000_000, help='Budget de tokens par minute')
+    parser.add_argument('--fail-every', type=int, default=10, help='Un appel sur N renvoie une 429 (0 = jamais)')
+    args = parser.parse_args()
+
+    prompts = [f"Prompt de test numéro {i} " * 50 for i in range(args.prompts)]
+
+    start = time.perf_counter()
+    run_sequential(prompts, args.latency)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model, dispatcher = run_dispatcher(prompts, args.latency, args.concurrency, args.rpm, args.tpm,
+                                       args.fail_every)
+    concurrent = time.perf_counter() - start
+
+    print(f"Requêtes : {args.prompts} | latence : {args.latency:g}s | concurrence : {args.concurrency} | "
+          f"budget : {args.rpm:g} RPM / {args.tpm:g} TPM")
+    print(f"Séquentiel : {sequential:.2f}s ({args.prompts / sequential * 60:.0f} req/min)")
+    print(f"Répartiteur : {concurrent:.2f}s ({args.prompts / concurrent * 60:.0f} req/min), "
+          f"pic de concurrence {model.peak_in_flight}")
+    dispatcher.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark du cache HTTP : octets économisés sur un second passage identique.
+
+Usage : python benchmarks/bench_http_cache.py --pages 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_server import LocalServer
+from scrapx.fetcher import AsyncFetcher
+from scrapx.http_cache import HttpCache
+
+
+async def _consume(fetcher, urls):
+    async for _ in fetcher.fetch_iter(urls):
+        pass
+
+
+def crawl(urls, cache, server):
+    """Un passage complet ; retourne (octets envoyés par le serveur, durée)."""
+    sent_before = server.bytes_sent
+    fetcher = AsyncFetcher(requests.Session(), 8, http_cache=cache)
+    start = time.perf_counter()
+    asyncio.run(_consume(fetcher, urls))
+    elapsed = time.perf_counter() - start
+    return server.bytes_sent - sent_before, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du cache HTTP (ETag / Last-Modified)')
+    parser.add_argument('--pages', type=int, default=100, help='Nombre de pages')
+    parser.add_argument('--paragraphs', type=int, default=200, help='Taille des pages (paragraphes)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, LocalServer(paragraphs=args.paragraphs) as server:
+        cache = HttpCache(os.path.join(tmp, 'http_cache.sqlite3'))
+        urls = [f"{server.base_url}/article/{i}" for i in range(args.pages)]
+
+        first_bytes, first_time = crawl(urls, cache, server)
+        second_bytes, second_time = crawl(urls, cache, server)
+        cache.close()
+        stored = os.path.getsize(cache.path)
+
+    print(f"Pages : {args.pages}")
+    print(f"1er passage : {first_bytes / 1024:.0f} Ko reçus en {first_time:.2f}s")
+    print(f"2e passage  : {second_bytes / 1024:.0f} Ko reçus en {second_time:.2f}s "
+          f"({cache.revalidated} réponses 304)")
+    saved = first_bytes - second_bytes
+    print(f"Octets économisés : {saved / 1024:.0f} Ko ({saved / first_bytes:.0%}) | "
+          f"taille du cache sur disque : {stored / 1024:.0f} Ko (corps compressés)")
+
+
+if __name__ == '__main__':
+    main()
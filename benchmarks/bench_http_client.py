@@ -0,0 +1,64 @@
+"""Benchmark du client HTTP partagé : connexions réutilisées contre une connexion par URL.
+
+Une liste d'URLs d'un même hôte est téléchargée une fois avec `requests.get`
+(nouvelle connexion à chaque page) et une fois avec la session de
+`scrapx.http_client` (connexions gardées ouvertes). Le serveur local simule le
+coût d'établissement d'une connexion (`--handshake`, l'équivalent d'une
+poignée de main TCP+TLS) ; on compte les connexions ouvertes et le temps
+gagné par URL.
+
+Usage : python benchmarks/bench_http_client.py --pages 100 --handshake 0.03 --concurrency 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_server import LocalServer
+from scrapx.http_client import create_session
+
+
+def download(get, urls, concurrency):
+    def fetch(url):
+        response = get(url, timeout=10)
+        response.raise_for_status()
+        return len(response.content)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, urls))
+    return time.perf_counter() - start
+
+
+def run(label, get, args):
+    with LocalServer(handshake=args.handshake) as server:
+        urls = [f"{server.base_url}/article-{i}" for i in range(args.pages)]
+        elapsed = download(get, urls, args.concurrency)
+        print(f"{label:<18}: {args.pages} page(s) en {elapsed:.2f}s ({args.pages / elapsed:.0f} pages/s), "
+              f"{server.connections} connexion(s) ouverte(s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du client HTTP partagé (pools de connexions)")
+    parser.add_argument('--pages', type=int, default=100, help="Nombre de pages du même hôte")
+    parser.add_argument('--handshake', type=float, default=0.03, help="Coût simulé d'une nouvelle connexion (s)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Téléchargements simultanés")
+    args = parser.parse_args()
+
+    without_pool = run('requests.get', requests.get, args)
+    session = create_session(args.concurrency)
+    with_pool = run('session partagée', session.get, args)
+    session.close()
+    saved = (without_pool - with_pool) * args.concurrency / args.pages
+    print(f"Établissement de connexion économisé : ~{saved * 1000:.0f} ms par URL "
+          f"(durée divisée par {without_pool / max(with_pool, 1e-9):.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark du routage entre modèles : un seul modèle limité contre plusieurs modèles routés.
+
+Le modèle principal est lent et répond 429 une fois sur `--fail-every` ; deux
+modèles de secours factices sont plus rapides. Sans routeur, chaque 429 coûte
+un backoff du répartiteur ; avec le routeur, la requête bascule aussitôt vers
+un autre modèle et les suivantes vont au plus rapide.
+
+Usage : python benchmarks/bench_model_router.py --prompts 40 --latency 0.3 --fail-every 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.fake_model import FakeGenerativeModel
+from scrapx.gemini import GeminiDispatcher
+from scrapx.model_router import ModelRouter
+
+RESPONSE = "Une réponse factice de longueur moyenne. " * 50
+
+
+def models(latency, fail_every):
+    return [
+        FakeGenerativeModel(RESPONSE, latency=latency, model_name='gemini-2.0-flash', fail_every=fail_every),
+        FakeGenerativeModel(RESPONSE, latency=latency / 3, model_name='gemini-2.0-flash-lite'),
+        FakeGenerativeModel(RESPONSE, latency=latency / 2, model_name='gemini-1.5-flash'),
+    ]
+
+
+def run(label, model, prompts, concurrency):
+    dispatcher = GeminiDispatcher(model, rpm=100_000, tpm=1_000_000_000, max_concurrency=concurrency,
+                                  base_backoff=1.0)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(dispatcher.generate, prompts))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12}: {len(prompts)} prompt(s) en {elapsed:.2f}s, {dispatcher.retries} backoff(s) du répartiteur")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du routage entre modèles Gemini (modèles factices)")
+    parser.add_argument('--prompts', type=int, default=40, help="Nombre de prompts")
+    parser.add_argument('--latency', type=float, default=0.3, help="Latence du modèle principal (s)")
+    parser.add_argument('--fail-every', type=int, default=4, help="Le modèle principal répond 429 un appel sur N")
+    parser.add_argument('--concurrency', type=int, default=4, help="Requêtes simultanées")
+    args = parser.parse_args()
+
+    prompts = [f"Prompt {i}" for i in range(args.prompts)]
+    single = run('un modèle', models(args.latency, args.fail_every)[0], prompts, args.concurrency)
+    router = ModelRouter(models(args.latency, args.fail_every))
+    routed = run('routeur', router, prompts, args.concurrency)
+    router.report()
+    print(f"Durée divisée par {single / max(routed, 1e-9):.1f}")
+
+
+if __name__ == '__main__':
+    main()
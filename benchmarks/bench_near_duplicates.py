@@ -0,0 +1,67 @@
+"""Benchmark de la détection des quasi-doublons : calcul des signatures et recherche dans l'index LSH.
+
+`--articles` textes synthétiques sont indexés, dont une part `--syndicated`
+de reprises légèrement modifiées d'un article précédent (comme une dépêche
+reprise par plusieurs sites). On mesure le débit des signatures MinHash, le
+nombre de comparaisons faites par l'index et les reprises reconnues.
+
+Usage : python benchmarks/bench_near_duplicates.py --articles 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, minhash_signature
+
+
+def make_articles(count, syndicated, words=600, seed=0):
+    """Textes aléatoires ; une part est une reprise d'un texte précédent avec quelques mots changés."""
+    rng = random.Random(seed)
+    vocabulary = [f"mot{i}" for i in range(20_000)]
+    articles, copies = [], 0
+    for i in range(count):
+        if articles and rng.random() < syndicated:
+            text = articles[rng.randrange(len(articles))][1].split()
+            for _ in range(len(text) // 100):
+                text[rng.randrange(len(text))] = rng.choice(vocabulary)
+            copies += 1
+        else:
+            text = [rng.choice(vocabulary) for _ in range(words)]
+        articles.append((f"https://site{i % 50}.example/article-{i}", ' '.join(text)))
+    return articles, copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la détection des quasi-doublons")
+    parser.add_argument('--articles', type=int, default=2000, help="Nombre d'articles indexés")
+    parser.add_argument('--syndicated', type=float, default=0.2, help="Part de reprises d'un article précédent")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Seuil de similarité")
+    args = parser.parse_args()
+
+    articles, copies = make_articles(args.articles, args.syndicated)
+
+    start = time.perf_counter()
+    signatures = [minhash_signature(text) for _, text in articles]
+    elapsed = time.perf_counter() - start
+    print(f"Signatures : {len(articles)} en {elapsed:.1f}s ({len(articles) / elapsed:.0f}/s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = NearDuplicateIndex('bench', os.path.join(directory, 'near.sqlite3'), args.threshold)
+        start = time.perf_counter()
+        for (url, _), signature in zip(articles, signatures):
+            if index.claim(url, signature) is None:
+                index.record(url, url + '.mdx')
+        elapsed = time.perf_counter() - start
+        print(f"Index      : {len(articles)} recherches en {elapsed:.2f}s, {index.comparisons} comparaison(s) "
+              f"({index.comparisons / len(articles):.1f} par article, {index.rows} ligne(s) par bande)")
+        print(f"Reprises   : {index.skipped} reconnue(s) sur {copies} générée(s)")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark des parseurs HTML sur les pages enregistrées de benchmarks/fixtures.
+
+Mesure le débit (pages/s) de chaque parseur disponible, construction de l'arbre
+seule puis extraction complète, et vérifie que tous les parseurs donnent
+exactement les mêmes résultats d'extraction que `html.parser`.
+
+Usage : python benchmarks/bench_parse.py --rounds 20
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.extraction import (extract_article_links, extract_article_text, extract_main_content,
+                               extract_main_image, extract_product_image, extract_title)
+from scrapx.parsing import FALLBACK_PARSER, available_parsers, make_soup
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE_URL = 'https://www.gamerzone.example/'
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def extract_all(html, parser):
+    """Tout ce que les deux scripts extraient d'une page (un arbre par script, l'extraction le modifie)."""
+    links = sorted(extract_article_links(make_soup(html, parser), FIXTURE_URL))
+    soup = make_soup(html, parser)
+    blog = (extract_article_text(soup), extract_main_image(soup))
+    soup = make_soup(html, parser)
+    fiche = (extract_title(soup), extract_main_content(soup), extract_product_image(soup))
+    return links, blog, fiche
+
+
+def throughput(pages, rounds, func):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages.values():
+            func(html)
+    elapsed = time.perf_counter() - start
+    return rounds * len(pages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des parseurs HTML (lxml, html.parser)')
+    parser.add_argument('--rounds', type=int, default=20, help='Nombre de passages sur le corpus')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Dossier des pages HTML enregistrées')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        sys.exit(f"Aucune page .html dans {args.fixtures}")
+    size = sum(len(html) for html in pages.values())
+    print(f"Corpus : {len(pages)} pages, {size / 1024:.0f} Ko | passages : {args.rounds}")
+
+    reference = {name: extract_all(html, FALLBACK_PARSER) for name, html in pages.items()}
+    parse_rates = {}
+    for name in available_parsers():
+        mismatches = [page for page, html in pages.items() if extract_all(html, name) != reference[page]]
+        parse_rates[name] = throughput(pages, args.rounds, lambda html: make_soup(html, name))
+        # extract_all construit trois arbres par page, comme les deux scripts réunis
+        extract_rate = throughput(pages, args.rounds, lambda html: extract_all(html, name))
+        print(f"{name:12s} : arbre {parse_rates[name]:7.1f} pages/s | extraction complète {extract_rate:7.1f} pages/s | "
+              f"résultats {'identiques' if not mismatches else 'DIFFÉRENTS : ' + ', '.join(mismatches)}")
+
+    fastest = max(parse_rates, key=parse_rates.get)
+    if fastest != FALLBACK_PARSER:
+        print(f"Gain de {fastest} sur {FALLBACK_PARSER} : x{parse_rates[fastest] / parse_rates[FALLBACK_PARSER]:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark de l'étage de parsing : débit selon le nombre de processus du pool.
+
+Les pages de benchmarks/fixtures sont soumises en boucle au pool, comme le fait
+l'étage de parsing du pipeline. Le débit doit croître à peu près linéairement
+avec le nombre de processus, jusqu'au nombre de cœurs.
+
+Usage : python benchmarks/bench_parse_pool.py --pages 600 --processes 0 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parse import FIXTURES_DIR, load_fixtures
+from scrapx.extraction import parse_article_page, parse_product_page
+from scrapx.parse_pool import ParsePool, default_processes
+from scrapx.parsing import resolve_parser
+
+
+async def parse_all(pool, pages, parser):
+    semaphore = asyncio.Semaphore(pool.workers * 2)
+
+    async def parse(html):
+        async with semaphore:
+            return await pool.run(parse_product_page, html, parser)
+
+    return await asyncio.gather(*(parse(html) for html in pages))
+
+
+def run(processes, pages, parser):
+    pool = ParsePool(processes)
+    # Démarrage des processus hors chronomètre
+    asyncio.run(parse_all(pool, pages[:pool.workers], parser))
+    start = time.perf_counter()
+    records = asyncio.run(parse_all(pool, pages, parser))
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return len(pages) / elapsed, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pool de processus de l'étage de parsing")
+    parser.add_argument('--pages', type=int, default=600, help='Nombre de pages à parser')
+    parser.add_argument('--processes', type=int, nargs='+', default=None,
+                        help='Tailles de pool à comparer (0 = threads du processus principal)')
+    parser.add_argument('--parser', default='auto', help='Parseur HTML (auto, lxml, html.parser)')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Dossier des pages HTML enregistrées')
+    args = parser.parse_args()
+
+    corpus = list(load_fixtures(args.fixtures).values())
+    if not corpus:
+        sys.exit(f"Aucune page .html dans {args.fixtures}")
+    pages = [corpus[i % len(corpus)] for i in range(args.pages)]
+    html_parser = resolve_parser(args.parser)
+    cores = default_processes()
+    sizes = args.processes or sorted({0, 2, cores} | ({cores // 2} if cores >= 4 else set()))
+
+    print(f"Pages : {args.pages} | parseur : {html_parser} | cœurs disponibles : {cores}")
+    baseline = None
+    records = []
+    for processes in sizes:
+        rate, records = run(processes, pages, html_parser)
+        baseline = baseline or rate
+        # Avec 0 ou 1 processus, le parsing se fait dans des threads : la taille demandée distingue les lignes
+        label = f"{processes} processus" if processes > 1 else f"{processes} processus (threads)"
+        print(f"{label:24s} : {rate:7.1f} pages/s (x{rate / baseline:.1f})")
+
+    html_bytes = sum(len(html) for html in pages) / len(pages)
+    record_bytes = sum(len(pickle.dumps(record)) for record in records) / len(records)
+    article_bytes = sum(len(pickle.dumps(parse_article_page(html, html_parser))) for html in corpus) / len(corpus)
+    print(f"Transféré par page : {html_bytes / 1024:.1f} Ko de HTML à l'aller, "
+          f"{record_bytes / 1024:.1f} Ko (fiche) / {article_bytes / 1024:.1f} Ko (article) au retour")
+
+
+if __name__ == '__main__':
+    main()
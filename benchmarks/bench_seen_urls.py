@@ -0,0 +1,70 @@
+"""Benchmark de l'ensemble des URLs déjà vues : mémoire et débit, filtre de Bloom contre `set` de chaînes.
+
+`--urls` URLs sont enregistrées dans un `SeenUrls` temporaire, puis autant
+d'URLs nouvelles sont testées (cas courant : le filtre répond sans accès
+disque) ainsi qu'un échantillon d'URLs connues (confirmées dans SQLite).
+La mémoire est comparée à celle d'un `set` Python des mêmes URLs.
+
+Usage : python benchmarks/bench_seen_urls.py --urls 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapx.seen_urls import SeenUrls
+
+
+def make_urls(count, offset=0):
+    return (f"https://www.blog{i % 1000}.example/{2020 + i % 5}/article-{i}/?utm_source=rss"
+            for i in range(offset, offset + count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'ensemble des URLs déjà vues")
+    parser.add_argument('--urls', type=int, default=1_000_000, help="Nombre d'URLs enregistrées")
+    parser.add_argument('--sample', type=int, default=10_000, help="Nombre d'URLs connues re-testées")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'seen.sqlite3')
+
+        tracemalloc.start()
+        seen = SeenUrls(path, capacity=args.urls)
+        start = time.perf_counter()
+        seen.add(make_urls(args.urls))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Ajout        : {args.urls} URLs en {elapsed:.1f}s ({args.urls / elapsed:.0f}/s) | "
+              f"filtre {len(seen.bloom.bits) / 1024 / 1024:.1f} Mo, pic mémoire {peak / 1024 / 1024:.1f} Mo")
+
+        start = time.perf_counter()
+        fresh = seen.unseen(make_urls(args.urls, offset=args.urls))
+        elapsed = time.perf_counter() - start
+        print(f"URLs neuves  : {len(fresh)}/{args.urls} non vues en {elapsed:.1f}s ({args.urls / elapsed:.0f}/s), "
+              f"{seen.disk_lookups} vérification(s) sur disque (faux positifs du filtre)")
+
+        lookups = seen.disk_lookups
+        start = time.perf_counter()
+        known = sum(1 for url in make_urls(args.sample) if url in seen)
+        elapsed = time.perf_counter() - start
+        print(f"URLs connues : {known}/{args.sample} reconnues en {elapsed:.2f}s, "
+              f"{seen.disk_lookups - lookups} vérification(s) sur disque")
+        seen.close()
+        print(f"Sur disque   : {os.path.getsize(path) / 1024 / 1024:.1f} Mo (SQLite) + "
+              f"{os.path.getsize(seen.bloom_path) / 1024 / 1024:.1f} Mo (filtre)")
+
+    tracemalloc.start()
+    strings = set(make_urls(args.urls))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"set Python   : {len(strings)} chaînes, {current / 1024 / 1024:.1f} Mo en mémoire")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark des listes de sélecteurs : un `select_one` par sélecteur contre un seul parcours.
+
+Sur les pages de `benchmarks/fixtures/`, l'extraction complète des deux
+scripts (liens, pagination, texte, titre, images) est faite avec l'ancienne
+méthode (un parcours de l'arbre par sélecteur, reproduite ici) puis avec les
+`SelectorPlan` de `scrapx.extraction`. Les arbres sont construits hors
+chronomètre : seule l'extraction est mesurée. Les deux méthodes doivent
+donner exactement les mêmes résultats.
+
+Usage : python benchmarks/bench_selectors.py --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urldefrag, urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parse import FIXTURE_URL, FIXTURES_DIR, load_fixtures
+from scrapx import extraction
+from scrapx.extraction import (ARTICLE_CONTENT_SELECTORS, ARTICLE_IMAGE_SELECTORS, DEFAULT_IMAGE, LINK_SELECTORS,
+                               MAIN_CONTENT_SELECTORS, PAGINATION_PATTERN, PAGINATION_SELECTORS,
+                               PRODUCT_IMAGE_SELECTORS, TITLE_SELECTORS, is_article_link)
+from scrapx.parsing import available_parsers, make_soup
+
+
+def first_matches(soup, selectors):
+    """Un parcours complet par sélecteur, comme avant les SelectorPlan."""
+    for selector in selectors:
+        yield soup.select_one(selector)
+
+
+def image_url(soup, element, product):
+    url = element.get('content') if element.name == 'meta' else (
+        (element.get('data-src') or element.get('src')) if product else element.get('src'))
+    if url and product:
+        url = url.split('?')[0]
+    if url and not url.startswith(('http://', 'https://')):
+        base_url = soup.find('base', href=True)
+        if base_url:
+            url = urljoin(base_url['href'], url)
+    return url
+
+
+def reference_extraction(new_soup):
+    """L'extraction d'avant, sélecteur par sélecteur (mêmes étapes que `plan_extraction`)."""
+    soup = new_soup()
+    base_domain = urlparse(FIXTURE_URL).netloc
+    links = set()
+    for selector in LINK_SELECTORS:
+        for link in soup.select(selector):
+            if link.get('href') and urlparse(urljoin(FIXTURE_URL, link['href'])).netloc == base_domain:
+                links.add(urljoin(FIXTURE_URL, link['href']))
+    candidates = [element.get('href') for selector in PAGINATION_SELECTORS for element in soup.select(selector)]
+    candidates += [link['href'] for link in soup.find_all('a', href=True) if PAGINATION_PATTERN.search(link['href'])]
+    pages = []
+    for href in candidates:
+        if href:
+            full_url = urldefrag(urljoin(FIXTURE_URL, href))[0]
+            if urlparse(full_url).netloc == base_domain and full_url != FIXTURE_URL and full_url not in pages:
+                pages.append(full_url)
+    listing = (sorted(link for link in links if is_article_link(link)), pages)
+
+    soup = new_soup()
+    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', '.sidebar', '.advertisement']):
+        element.decompose()
+    content_element = None
+    for element in first_matches(soup, ARTICLE_CONTENT_SELECTORS):
+        if element:
+            content_element = element
+            if len(element.get_text(strip=True)) > 200:
+                break
+    else:
+        content_element = soup.find('body') or content_element
+    text = content_element.get_text(strip=True) if content_element else ""
+    image = next((url for element in first_matches(soup, ARTICLE_IMAGE_SELECTORS) if element
+                  for url in [image_url(soup, element, False)] if url), DEFAULT_IMAGE)
+    blog = (text, image)
+
+    soup = new_soup()
+    title = next((element.get_text().strip() for element in first_matches(soup, TITLE_SELECTORS)
+                  if element and element.get_text().strip()), "Titre non trouvé")
+    for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']):
+        element.decompose()
+    main = next((element for element in first_matches(soup, MAIN_CONTENT_SELECTORS) if element), None)
+    main = main or soup.find('body') or soup
+    image = next((url for element in first_matches(soup, PRODUCT_IMAGE_SELECTORS) if element
+                  for url in [image_url(soup, element, True)] if url), DEFAULT_IMAGE)
+    fiche = (title, main.get_text(separator=' ', strip=True), image)
+    return listing, blog, fiche
+
+
+def plan_extraction(new_soup):
+    soup = new_soup()
+    listing = (sorted(extraction.extract_article_links(soup, FIXTURE_URL)),
+               extraction.extract_pagination_links(soup, FIXTURE_URL))
+    soup = new_soup()
+    blog = (extraction.extract_article_text(soup), extraction.extract_main_image(soup))
+    soup = new_soup()
+    fiche = (extraction.extract_title(soup), extraction.extract_main_content(soup),
+             extraction.extract_product_image(soup))
+    return listing, blog, fiche
+
+
+def timed(extract, html, parser, rounds):
+    """Durée de l'extraction seule : les arbres (trois par passage) sont construits avant."""
+    trees = iter([make_soup(html, parser) for _ in range(rounds * 3)])
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract(trees.__next__)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des listes de sélecteurs (un parcours de l'arbre)")
+    parser.add_argument('--rounds', type=int, default=20, help='Nombre de passages par page')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Dossier des pages HTML enregistrées')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        sys.exit(f"Aucune page .html dans {args.fixtures}")
+    for html_parser in available_parsers():
+        print(f"Parseur : {html_parser}")
+        total_before = total_after = 0.0
+        for name, html in pages.items():
+            new_soup = lambda: make_soup(html, html_parser)  # noqa: E731
+            if reference_extraction(new_soup) != plan_extraction(new_soup):
+                sys.exit(f"❌ {name} : résultats différents avec {html_parser}")
+            before = timed(reference_extraction, html, html_parser, args.rounds)
+            after = timed(plan_extraction, html, html_parser, args.rounds)
+            total_before += before
+            total_after += after
+            print(f"  {name:<24} {before * 1000:6.2f} ms → {after * 1000:6.2f} ms par page")
+        print(f"  Total : {total_before * 1000:.2f} ms → {total_after * 1000:.2f} ms "
+              f"(x{total_before / max(total_after, 1e-9):.1f}), résultats identiques")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark de la lecture des sitemaps : mémoire et durée, lecture en flux contre arbre complet.
+
+Un sitemap de `--urls` entrées est servi par le serveur local puis lu de
+deux façons, téléchargement compris : en flux (`iter_entries` sur les
+morceaux de `AsyncFetcher.iter_body`, entrées libérées au fil de l'eau) et
+d'un bloc (`AsyncFetcher.get` puis `ElementTree.fromstring`, arbre complet).
+Durée et pic de mémoire couvrent le téléchargement et l'analyse.
+
+Enfin, `SiteDiscovery` découvre les articles du site local (robots.txt puis
+sitemap) avec les limites par défaut : le sitemap dépasse SCRAPX_MAX_BODY_MB
+dès 100 000 URLs, il doit pourtant être lu en entier (SCRAPX_MAX_SITEMAP_MB).
+
+Usage : python benchmarks/bench_sitemap.py --urls 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_server import LocalServer, _Handler
+from scrapx.discovery import SiteDiscovery, iter_entries
+from scrapx.fetcher import AsyncFetcher, max_body_from_env
+from scrapx.http_client import create_session
+
+
+def make_sitemap(count, base='https://blog.example'):
+    entries = ''.join(f'<url><loc>{base}/2024/{i % 12 + 1:02d}/article-{i}/</loc>'
+                      f'<lastmod>2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T08:00:00+00:00</lastmod>'
+                      f'<changefreq>monthly</changefreq></url>' for i in range(count))
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + entries + '</urlset>').encode()
+
+
+class _SitemapHandler(_Handler):
+
+    def do_GET(self):
+        if self.path.startswith('/robots.txt'):
+            body, content_type = b"Sitemap: /sitemap.xml\n", 'text/plain'
+        elif self.path.startswith('/sitemap.xml'):
+            body, content_type = self.server.sitemap, 'application/xml'
+        else:
+            return super().do_GET()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def measure(func, url):
+    """Durée (sans tracemalloc, qui ralentit chaque allocation) puis pic de mémoire, sur deux lectures."""
+    results = []
+    for traced in (False, True):
+        # Sans limite de taille : seule la façon de lire le document change
+        fetcher = AsyncFetcher(create_session(1), 1, max_body=0)
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        count = func(fetcher, url)
+        results.append(time.perf_counter() - start)
+        if traced:
+            results.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        fetcher.close()
+    elapsed, _, peak = results
+    return count, elapsed, peak
+
+
+def streaming(fetcher, url):
+    return sum(1 for kind, fields in iter_entries(fetcher.iter_body(url)) if kind == 'url' and fields.get('loc'))
+
+
+def full_tree(fetcher, url):
+    root = ET.fromstring(fetcher.get(url).content)
+    # Mêmes champs que `iter_entries`, pour comparer à travail égal
+    entries = ({child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in element} for element in root)
+    return sum(1 for fields in entries if fields.get('loc'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la lecture des sitemaps')
+    parser.add_argument('--urls', type=int, default=100_000, help="Nombre d'entrées du sitemap")
+    args = parser.parse_args()
+
+    with LocalServer(handler=_SitemapHandler, etags=False) as server:
+        server.httpd.sitemap = make_sitemap(args.urls, server.base_url)
+        url = f"{server.base_url}/sitemap.xml"
+        print(f"Sitemap : {args.urls} entrées, {len(server.httpd.sitemap) / 1024 / 1024:.1f} Mo")
+        for label, func in (('Lecture en flux', streaming), ('Arbre complet', full_tree)):
+            count, elapsed, peak = measure(func, url)
+            print(f"{label:16s} : {count} URLs en {elapsed:.2f}s (téléchargement compris) | "
+                  f"pic mémoire {peak / 1024 / 1024:.1f} Mo")
+
+        # Limites par défaut, comme dans scriptblog.py
+        fetcher = AsyncFetcher(create_session(1), 1)
+        discovery = SiteDiscovery(fetcher)
+        start = time.perf_counter()
+        links = discovery.discover(f"{server.base_url}/")
+        elapsed = time.perf_counter() - start
+        fetcher.close()
+        print(f"Découverte       : {len(links)} articles en {elapsed:.2f}s | limite des pages "
+              f"{max_body_from_env() / 1024 / 1024:.0f} Mo, des sitemaps {discovery.max_document / 1024 / 1024:.0f} Mo "
+              f"| {discovery.rejected} document(s) refusé(s)")
+
+
+if __name__ == '__main__':
+    main()
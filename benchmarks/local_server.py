@@ -0,0 +1,114 @@
+"""Serveur HTTP local servant de doublure aux sites scrapés dans les benchmarks."""
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PARAGRAPH = (
+    "<p>Le nouveau moniteur offre une dalle de 27 pouces, un taux de rafraîchissement "
+    "de 165 Hz et un temps de réponse de 1 ms, idéal pour les joueurs exigeants.</p>\n"
+)
+
+
+def make_article_html(index: int, paragraphs: int = 40) -> bytes:
+    """Construit une page d'article factice, proche de celles qu'on scrape."""
+    body = PARAGRAPH * paragraphs
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Article de test {index}</title>"
+        f'<meta property="og:image" content="https://example.com/images/{index}.jpg">'
+        "</head><body><header><nav><a href='/'>Accueil</a></nav></header>"
+        f"<article><h1>Article de test {index}</h1>{body}</article>"
+        "<footer>Pied de page</footer></body></html>"
+    ).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, une connexion
+    # réutilisée attendrait l'ACK différé du client (~40 ms) à chaque réponse
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Nouvelle connexion : coût d'établissement simulé (poignée de main TLS)
+        super().setup()
+        self.server.connections += 1
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        server.hits += 1
+        body = make_article_html(zlib.crc32(self.path.encode()) % 10000, server.paragraphs)
+        etag = f'"{zlib.crc32(body):08x}"'
+        if server.etags and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if server.etags:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+        server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Le fetcher coupe volontairement les réponses refusées (type, taille) : pas de trace
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class LocalServer:
+    """Lance un `ThreadingHTTPServer` sur un port libre, dans un thread de fond."""
+
+    def __init__(self, latency: float = 0.0, paragraphs: int = 40, handler=_Handler, port: int = 0,
+                 etags: bool = True, handshake: float = 0.0):
+        self.httpd = _Server(('127.0.0.1', port), handler)
+        self.httpd.latency = latency
+        self.httpd.paragraphs = paragraphs
+        self.httpd.etags = etags
+        self.httpd.handshake = handshake
+        self.httpd.hits = 0
+        self.httpd.connections = 0
+        self.httpd.bytes_sent = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def hits(self) -> int:
+        return self.httpd.hits
+
+    @property
+    def connections(self) -> int:
+        return self.httpd.connections
+
+    @property
+    def bytes_sent(self) -> int:
+        return self.httpd.bytes_sent
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
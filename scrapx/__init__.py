@@ -0,0 +1 @@
+"""Briques partagées par scriptblog.py et scriptfiche.py."""
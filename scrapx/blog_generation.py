@@ -0,0 +1,574 @@
+"""Génération des articles de blog par Gemini.
+
+Par défaut, un seul appel produit l'article entier sous forme de réponse
+structurée (JSON conforme à `ARTICLE_SCHEMA` : titre, extrait, tags, corps) ;
+le slug et l'URL canonique sont calculés ensuite à partir du titre, et le
+frontmatter MDX est écrit ici plutôt que par le modèle. L'ancien mode en deux
+appels (titre seul, puis article) reste disponible avec
+SCRAPX_BLOG_GENERATION=two-step.
+
+`BlogArticleGenerator.stream` produit le même document fragment par fragment,
+au fil de la réponse de Gemini : le nettoyage (blocs ```, frontmatter) ou le
+décodage du JSON se font au fur et à mesure, sans attendre la réponse entière.
+"""
+import json
+import re
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from scrapx.condense import DEFAULT_TITLE_CONTENT_TOKENS, condense, content_budget_from_env
+from scrapx.config import env_int, env_str
+from scrapx.gemini import GeminiDispatcher
+
+SINGLE_CALL = 'single'
+TWO_STEP = 'two-step'
+GENERATION_MODES = (SINGLE_CALL, TWO_STEP)
+
+CANONICAL_BASE = "https://www.jeupix.com/blog"
+# Image par défaut si aucune image n'est trouvée
+DEFAULT_IMAGE = "https://images.unsplash.com/photo-1611224923853-80b023f02d71?ixlib=rb-4.0.3&auto=format&fit=crop&w=2070&q=80"
+
+ARTICLE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'excerpt': {'type': 'string'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'body': {'type': 'string'},
+    },
+    'required': ['title', 'excerpt', 'tags', 'body'],
+}
+ARTICLE_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': ARTICLE_SCHEMA,
+}
+
+# Ligne de bloc ``` retirée des réponses MDX
+FENCE_LINE = re.compile(r'```(?:markdown|yaml)?\s*', re.IGNORECASE)
+# Lignes (ou caractères JSON) retenues au plus en attendant la fin du frontmatter
+HEAD_MAX_LINES = 60
+HEAD_MAX_CHARS = 4000
+# Clé `body` de la réponse JSON, suivie du guillemet ouvrant de sa valeur
+BODY_KEY = re.compile(r'(?<!\\)"body"\s*:\s*"')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+def slugify(text: str) -> str:
+    """Convertit un texte en slug."""
+    # Convertir en minuscules
+    text = text.lower()
+    # Remplacer les caractères accentués
+    text = re.sub(r'[àáâãäçèéêëìíîïñòóôõöùúûüýÿ]', 
+                 lambda m: 'aaaaaceeeeiiiinooooouuuuyy'['àáâãäçèéêëìíîïñòóôõöùúûüýÿ'.index(m.group())], 
+                 text)
+    # Remplacer tout ce qui n'est pas alphanumérique par des tirets
+    text = re.sub(r'[^a-z0-9]+', '-', text)
+    # Supprimer les tirets en début et fin
+    text = text.strip('-')
+    # Réduire les tirets multiples
+    text = re.sub(r'-+', '-', text)
+    return text
+
+
+def clean_markdown_response(text: str) -> str:
+    """Nettoie une réponse MDX brute : blocs ```, préfixe `yaml`, date, délimiteurs du frontmatter."""
+    # 1. Initial global fence removal (case-insensitive for keywords)
+    text = re.sub(r'^```(?:markdown|yaml)?\s*\n', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'\n```\s*$', '', text, flags=re.MULTILINE)
+
+    # 2. Strip leading/trailing whitespace from the whole string
+    text = text.strip()
+
+    # 3. Handle specific "yaml" or "```yaml" prefixes on the first line
+    lines = text.splitlines()
+
+    if not lines:
+        return "---\n---" # Return minimal valid MDX for empty input
+
+    # 4. Ensure dates are in YYYY-MM-DD format
+    date_pattern = r'publishDate:\s*([^\n]+)'
+    date_match = re.search(date_pattern, text)
+    if date_match:
+        current_date = date_match.group(1).strip()
+        try:
+            # Try to parse the date in various formats
+            for fmt in ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']:
+                try:
+                    parsed_date = datetime.strptime(current_date, fmt)
+                    break
+                except ValueError:
+                    continue
+            # Format the date as YYYY-MM-DD
+            formatted_date = parsed_date.strftime('%Y-%m-%d')
+            text = re.sub(date_pattern, f'publishDate: {formatted_date}', text)
+        except:
+            # If date parsing fails, use current date
+            text = re.sub(date_pattern, f'publishDate: {datetime.now().strftime("%Y-%m-%d")}', text)
+
+    first_line_stripped_lower = lines[0].strip().lower()
+
+    # Check if the first line is one of the unwanted standalone prefixes
+    is_prefix_to_remove = False
+    if first_line_stripped_lower == "yaml":
+        is_prefix_to_remove = True
+    elif first_line_stripped_lower.startswith("```yaml") or first_line_stripped_lower.startswith("``` yaml"):
+        # Check if it's just the fence keyword and not content starting with ```yaml
+        temp_check = first_line_stripped_lower.replace("```yaml", "").replace("``` yaml", "").replace("`", "").strip()
+        if not temp_check:
+            is_prefix_to_remove = True
+
+    if is_prefix_to_remove:
+        if len(lines) > 1:
+            text = "\n".join(lines[1:]) # Remove the prefix line
+        else:
+            # Only the prefix was present
+            return "---\n---" # Return minimal valid MDX
+
+    # 5. Strip leading/trailing whitespace again in case prefix removal left some
+    text = text.strip()
+
+    # 6. Ensure the text starts with "---". If not, prepend it.
+    if not text.startswith("---"):
+        # If text is now empty (e.g., it was only "yaml" and got stripped),
+        # ensure we don't just prepend "---" to an empty string without a newline.
+        if not text:
+            return "---\n---" # Minimal valid MDX for originally empty or prefix-only content
+        text = "---\n" + text
+
+    # If the text was just "---" (e.g. from prepending to empty), ensure a closing "---".
+    # Or if the original text was just "---"
+    if text.strip() == "---":
+        text = "---\n---"
+
+    return text
+
+class MarkdownStreamCleaner:
+    """Équivalent incrémental de `clean_markdown_response`, pour une réponse reçue par fragments.
+
+    Les premières lignes sont retenues jusqu'à la fin du frontmatter, puis
+    nettoyées par `clean_markdown_response` ; la suite est transmise ligne par
+    ligne, sans les lignes de bloc ``` ni les lignes vides finales.
+    """
+
+    def __init__(self):
+        self._partial = ''                    # ligne en cours de réception
+        self._head: Optional[List[str]] = []  # None une fois le frontmatter transmis
+        self._delimiters = 0
+        self._blanks: List[str] = []          # lignes vides pas encore transmises
+        self._after_fence = False
+        self._spaces = ''
+
+    def feed(self, chunk: str) -> str:
+        """Texte nettoyé transmissible après réception de `chunk`."""
+        lines = (self._partial + chunk).split('\n')
+        self._partial = lines.pop()
+        return ''.join(self._line(line) for line in lines)
+
+    def close(self) -> str:
+        """Fin de la réponse : dernière ligne et frontmatter encore retenus."""
+        text = self._line(self._partial)
+        self._partial = ''
+        if self._head is not None:
+            text += self._flush_head()
+        return text
+
+    def _line(self, line: str) -> str:
+        if self._head is not None:
+            self._head.append(line)
+            if line.strip() == '---':
+                self._delimiters += 1
+            if self._delimiters >= 2 or len(self._head) >= HEAD_MAX_LINES:
+                return self._flush_head()
+            return ''
+
+        if FENCE_LINE.fullmatch(line):
+            # Comme dans `clean_markdown_response`, les lignes vides qui suivent un bloc ``` disparaissent avec lui
+            self._after_fence = True
+            return ''
+        if not line.strip():
+            if not self._after_fence:
+                self._blanks.append(line)
+            return ''
+        self._after_fence = False
+        # Les espaces de fin de ligne ne sont transmis qu'avec la ligne suivante (ceux de la dernière sont retirés)
+        stripped = line.rstrip()
+        text = self._spaces + ''.join('\n' + blank for blank in self._blanks) + '\n' + stripped
+        self._spaces = line[len(stripped):]
+        self._blanks = []
+        return text
+
+    def _flush_head(self) -> str:
+        head = clean_markdown_response('\n'.join(self._head))
+        self._head = None
+        return head
+
+
+def decode_json_string_prefix(raw: str) -> Tuple[str, int, bool]:
+    """Décode le début de `raw`, contenu d'une chaîne JSON privé de son guillemet ouvrant.
+
+    Retourne le texte décodé, le nombre de caractères consommés et si la chaîne
+    est terminée ; une séquence d'échappement coupée entre deux fragments reste
+    à consommer.
+    """
+    index = 0
+    while True:
+        match = _STRING_SPECIAL.search(raw, index)
+        if not match:
+            index = len(raw)
+            break
+        index = match.start()
+        if raw[index] == '"':
+            return json.loads('"' + raw[:index] + '"'), index + 1, True
+        # Échappement : \x, \uXXXX, ou paire de substitution \uXXXX\uXXXX
+        length = 2
+        if raw[index + 1:index + 2] == 'u':
+            length = 6
+            if len(raw) >= index + 6 and 0xD800 <= int(raw[index + 2:index + 6], 16) <= 0xDBFF:
+                length = 12
+        if len(raw) < index + length:
+            break
+        index += length
+    return json.loads('"' + raw[:index] + '"'), index, False
+
+
+class ArticleStreamDecoder:
+    """Rendu MDX incrémental d'une réponse JSON (`ARTICLE_SCHEMA`) reçue par fragments.
+
+    Dès que les champs qui précèdent `body` sont complets, le frontmatter est
+    transmis, puis le corps au fil de son décodage. Si `body` n'arrive pas après
+    les autres champs, l'article n'est rendu qu'une fois la réponse complète.
+    """
+
+    def __init__(self, image_url: Optional[str] = None):
+        self.image_url = image_url or DEFAULT_IMAGE
+        self._buffer = ''
+        self._state = 'head'   # head → body → tail, ou buffer si le corps ne peut pas être suivi
+        self._started = False
+        self._spaces = ''      # espaces en fin de corps, transmis seulement si du texte suit
+
+    def feed(self, chunk: str) -> str:
+        """Texte MDX transmissible après réception de `chunk`."""
+        self._buffer += chunk
+        if self._state == 'head':
+            return self._read_head()
+        if self._state == 'body':
+            return self._read_body()
+        return ''
+
+    def close(self) -> str:
+        """Fin de la réponse ; lève ValueError si elle est inexploitable."""
+        if self._state in ('head', 'buffer'):
+            article = parse_article_response(self._buffer)
+            if not article:
+                raise ValueError("Réponse JSON de Gemini inexploitable")
+            return render_article(article, self.image_url, f"{CANONICAL_BASE}/{slugify(article['title'])}")
+        tail = re.sub(r'\s*```$', '', self._buffer.strip())
+        if self._state == 'body' or not self._started or not tail.endswith('}'):
+            raise ValueError("Réponse JSON de Gemini inexploitable")
+        return '\n'
+
+    def _read_head(self) -> str:
+        match = BODY_KEY.search(self._buffer)
+        if not match:
+            if len(self._buffer) > HEAD_MAX_CHARS:
+                self._state = 'buffer'
+            return ''
+        head = re.sub(r'^```(?:json)?\s*', '', self._buffer[:match.start()].strip(), flags=re.IGNORECASE)
+        try:
+            data = json.loads(head.rstrip().rstrip(',') + '}')
+        except ValueError:
+            data = None
+        article = article_fields(data, with_body=False) if isinstance(data, dict) else None
+        if not article:
+            self._state = 'buffer'
+            return ''
+        self._state = 'body'
+        self._buffer = self._buffer[match.end():]
+        canonical_url = f"{CANONICAL_BASE}/{slugify(article['title'])}"
+        return render_frontmatter(article, self.image_url, canonical_url) + self._read_body()
+
+    def _read_body(self) -> str:
+        text, consumed, closed = decode_json_string_prefix(self._buffer)
+        self._buffer = self._buffer[consumed:]
+        if closed:
+            self._state = 'tail'
+        text = self._spaces + text
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        stripped = text.rstrip()
+        self._spaces = text[len(stripped):]
+        return stripped
+
+
+def build_article_prompt(content: str) -> str:
+    """Prompt de l'appel unique : l'article entier, sous forme de champs JSON.
+
+    `content` est le texte source déjà condensé (voir `scrapx.condense`).
+    """
+    return f"""
+Transforme le contenu fourni en un article de blog professionnel, unique et engageant.
+Réponds UNIQUEMENT avec un objet JSON contenant les champs suivants :
+
+- `title` : un titre SEO optimisé, percutant, sans guillemets ni apostrophes autour.
+- `excerpt` : un extrait court (1-2 phrases), cohérent avec l'introduction de l'article.
+- `tags` : une liste de 3 tags pertinents (en français ou anglais), chacun une chaîne simple.
+- `body` : le corps de l'article en Markdown compatible MDX.
+
+INSTRUCTIONS POUR `body` :
+
+*   **Réécriture Complète:** REFORMULE et RÉÉCRIS intégralement le contenu source pour créer un NOUVEL article de blog. Ne te contente pas de résumer ou de modifier légèrement.
+*   **Titre H1:** Commence par un titre principal (H1, formaté avec `#`). Ce titre H1 peut être différent de `title`.
+*   **Style Narratif et Structuré:** Utilise des titres et sous-titres (`##`, `###`), des paragraphes bien formés, des listes à puces ou numérotées si approprié, du **gras** ou de l'*italique* pour les points clés, et des citations (`> texte cité`) si pertinent.
+*   **Longueur:** L'article doit faire au minimum 800 mots.
+*   **Syntaxe MDX Valide:** Échappe correctement les caractères spéciaux comme `{'{'}`, `{'}'}`, `<` et `>` s'ils doivent apparaître littéralement dans le texte.
+*   **Pas de frontmatter:** `body` ne contient ni bloc YAML `---`, ni balises ```.
+
+QUALITÉ & STYLE : français soutenu, professionnel et engageant ; l'article doit être unique, informatif et apporter une réelle valeur ajoutée au lecteur.
+
+Contenu à transformer:
+{content}
+"""
+
+
+def yaml_quote(value: str) -> str:
+    """Chaîne YAML entre apostrophes simples (les apostrophes internes sont doublées)."""
+    return "'" + ' '.join(value.split()).replace("'", "''") + "'"
+
+
+def parse_article_response(text: str) -> Optional[dict]:
+    """Champs de l'article d'une réponse JSON ; None si elle est inexploitable."""
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', (text or '').strip(), flags=re.IGNORECASE)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return article_fields(data)
+
+
+def article_fields(data: dict, with_body: bool = True) -> Optional[dict]:
+    """Champs normalisés de l'article décrit par `data` ; None si le titre (ou le corps) manque."""
+    title = data.get('title')
+    if not isinstance(title, str) or not title.strip():
+        return None
+    excerpt = data.get('excerpt') if isinstance(data.get('excerpt'), str) else ''
+    tags = data.get('tags') if isinstance(data.get('tags'), list) else []
+    article = {'title': title.strip(), 'excerpt': excerpt.strip(),
+               'tags': [tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()]}
+    if with_body:
+        body = data.get('body')
+        if not isinstance(body, str) or not body.strip():
+            return None
+        article['body'] = body.strip()
+    return article
+
+
+def render_article(article: dict, image_url: str, canonical_url: str, publish_date: Optional[str] = None) -> str:
+    """Document MDX (frontmatter YAML puis corps) à partir des champs de l'article."""
+    return render_frontmatter(article, image_url, canonical_url, publish_date) + article['body'] + '\n'
+
+
+def render_frontmatter(article: dict, image_url: str, canonical_url: str, publish_date: Optional[str] = None) -> str:
+    """Frontmatter YAML de l'article, suivi de la ligne vide qui précède le corps."""
+    publish_date = publish_date or datetime.now().strftime('%Y-%m-%d')
+    lines = [
+        '---',
+        f"publishDate: {publish_date}",
+        f"title: {yaml_quote(article['title'])}",
+        f"excerpt: {yaml_quote(article['excerpt'])}",
+        f"image: {yaml_quote(image_url)}",
+        'tags:',
+        *(f"  - {yaml_quote(tag)}" for tag in article['tags']),
+        'metadata:',
+        f"  canonical: {yaml_quote(canonical_url)}",
+        'draft: false',
+        '---',
+        '',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class BlogArticleGenerator:
+
+    def __init__(self, dispatcher: GeminiDispatcher, mode: str = SINGLE_CALL, content_tokens: Optional[int] = None,
+                 title_content_tokens: int = DEFAULT_TITLE_CONTENT_TOKENS):
+        self.dispatcher = dispatcher
+        self.mode = mode
+        # Budgets de tokens du texte source dans les prompts
+        self.content_tokens = content_tokens or content_budget_from_env()
+        self.title_content_tokens = title_content_tokens
+
+    @classmethod
+    def from_env(cls, dispatcher: GeminiDispatcher) -> 'BlogArticleGenerator':
+        """Générateur dans le mode choisi par SCRAPX_BLOG_GENERATION (`single` ou `two-step`),
+        avec les budgets SCRAPX_CONTENT_TOKENS et SCRAPX_TITLE_CONTENT_TOKENS."""
+        mode = env_str('SCRAPX_BLOG_GENERATION', SINGLE_CALL).lower()
+        if mode not in GENERATION_MODES:
+            print(f"⚠️ Mode de génération inconnu ({mode!r}), utilisation de {SINGLE_CALL}")
+            mode = SINGLE_CALL
+        return cls(dispatcher, mode, content_budget_from_env(),
+                   max(1, env_int('SCRAPX_TITLE_CONTENT_TOKENS', DEFAULT_TITLE_CONTENT_TOKENS)))
+
+    def generate(self, content: str, image_url: Optional[str] = None,
+                 paragraphs: Optional[Sequence[str]] = None) -> Optional[str]:
+        """Article MDX complet réécrit à partir de `content`, ou None en cas d'échec.
+
+        Le texte envoyé à Gemini est condensé dans le budget de tokens, à partir
+        des blocs `paragraphs` de la page s'ils sont fournis.
+        """
+        source = paragraphs or content
+        if self.mode == TWO_STEP:
+            return self._generate_two_step(condense(source, self.content_tokens),
+                                           condense(source, self.title_content_tokens), image_url)
+        return self._generate_single_call(condense(source, self.content_tokens), image_url)
+
+    def stream(self, content: str, image_url: Optional[str] = None,
+               paragraphs: Optional[Sequence[str]] = None) -> Iterator[str]:
+        """Même article que `generate`, fragment par fragment au fil de la réponse de Gemini.
+
+        Lève une exception si la génération échoue ou si la réponse est inexploitable.
+        """
+        source = paragraphs or content
+        if self.mode == TWO_STEP:
+            prompt = self._two_step_prompt(condense(source, self.content_tokens),
+                                           condense(source, self.title_content_tokens), image_url)
+            if not prompt:
+                raise ValueError("Aucun titre exploitable dans la réponse Gemini")
+            decoder, kwargs = MarkdownStreamCleaner(), {}
+        else:
+            prompt = build_article_prompt(condense(source, self.content_tokens))
+            decoder, kwargs = ArticleStreamDecoder(image_url), {'generation_config': ARTICLE_GENERATION_CONFIG}
+
+        for chunk in self.dispatcher.stream(prompt, **kwargs):
+            text = decoder.feed(chunk)
+            if text:
+                yield text
+        try:
+            text = decoder.close()
+        except ValueError:
+            # Réponse inexploitable : ne pas la resservir depuis le cache au prochain essai
+            self.dispatcher.discard(prompt, **kwargs)
+            raise
+        if text:
+            yield text
+
+    def _generate_single_call(self, content: str, image_url: Optional[str]) -> Optional[str]:
+        prompt = build_article_prompt(content)
+        try:
+            response = self.dispatcher.generate(prompt, generation_config=ARTICLE_GENERATION_CONFIG)
+        except Exception as e:
+            print(f"Erreur avec l'API Gemini: {e}")
+            return None
+        if not response or not response.text:
+            return None
+
+        article = parse_article_response(response.text)
+        if not article:
+            # Réponse inexploitable : ne pas la resservir depuis le cache au prochain essai
+            self.dispatcher.discard(prompt, generation_config=ARTICLE_GENERATION_CONFIG)
+            return None
+        # Le slug et l'URL canonique découlent du titre généré
+        canonical_url = f"{CANONICAL_BASE}/{slugify(article['title'])}"
+        return render_article(article, image_url or DEFAULT_IMAGE, canonical_url)
+
+    def _generate_two_step(self, content: str, title_content: str, image_url: Optional[str]) -> Optional[str]:
+        """Ancien mode : un appel pour le titre, puis un second pour l'article complet."""
+        try:
+            prompt = self._two_step_prompt(content, title_content, image_url)
+            if not prompt:
+                return None
+
+            response = self.dispatcher.generate(prompt)
+            if not response or not response.text:
+                return None
+                
+            # Nettoyer la réponse
+            cleaned_content = clean_markdown_response(response.text)
+            return cleaned_content
+            
+        except Exception as e:
+            print(f"Erreur avec l'API Gemini: {e}")
+            return None
+
+    def _two_step_prompt(self, content: str, title_content: str, image_url: Optional[str]) -> Optional[str]:
+        """Prompt de l'article du mode en deux appels, une fois son titre généré ; None sans titre exploitable."""
+        default_image = DEFAULT_IMAGE
+        
+        # Générer d'abord un titre temporaire pour pouvoir créer l'URL canonique
+        temp_prompt = f"""
+Génère uniquement un titre SEO optimisé pour cet article. Format attendu:
+'Titre entre apostrophes simples'
+
+Contenu à titrer:
+{title_content}
+"""
+        temp_response = self.dispatcher.generate(temp_prompt)
+        if not temp_response or not temp_response.text:
+            return None
+        
+        # Extraire le titre et le slugifier
+        title_match = re.search(r"'([^']+)'", temp_response.text)
+        if not title_match:
+            # Réponse inexploitable : ne pas la resservir depuis le cache au prochain essai
+            self.dispatcher.discard(temp_prompt)
+            return None
+        
+        title = title_match.group(1)
+        slug = slugify(title)
+        canonical_url = f"{CANONICAL_BASE}/{slug}"
+        
+        prompt = f"""
+Transforme le contenu fourni en un article de blog professionnel, unique et engageant, au format MDX.
+Respecte SCRUPULEUSEMENT la structure YAML frontmatter et les instructions de formatage ci-dessous.
+
+---
+publishDate: {datetime.now().strftime('%Y-%m-%d')}
+title: '{title}'
+excerpt: "Extrait de l''article généré par l''IA (1-2 phrases)"
+image: '{image_url if image_url else default_image}'
+tags:
+  - tag1
+  - tag2
+  - tag3
+metadata:
+  canonical: '{canonical_url}'
+draft: false
+---
+
+# Titre Principal de l'Article (H1)
+
+[CORPS DE L'ARTICLE EN MARKDOWN BIEN STRUCTURÉ ET NARRATIF ICI]
+
+INSTRUCTIONS SPÉCIFIQUES:
+
+1.  **Frontmatter (YAML) - Respecte cet ordre et ce format EXACTEMENT:**
+    *   `publishDate`: Doit être au format `YYYY-MM-DD` (ex: 2024-01-02).
+    *   `title`: Utilise le titre généré précédemment.
+    *   `excerpt`: Génère un extrait court (1-2 phrases), percutant et cohérent avec l'introduction. Mêmes règles de formatage que pour `title`.
+    *   `image`: Utilise l'URL d'image fournie (`{image_url if image_url else default_image}`). Doit être une chaîne entre apostrophes simples.
+    *   `tags`: Fournis une liste de 3 tags pertinents (en français ou anglais). Chaque tag doit être une chaîne simple (pas besoin d'apostrophes autour de chaque tag individuel dans la liste YAML, mais la liste elle-même est sous `tags:`).
+    *   `metadata.canonical`: Utilise l'URL canonique générée (`{canonical_url}`). Doit être une chaîne (apostrophes simples si elle contient des caractères spéciaux YAML).
+    *   `draft`: Toujours `false`.
+
+2.  **Contenu de l'Article (MDX Body):**
+    *   **Réécriture Complète:** REFORMULE et RÉÉCRIS intégralement le contenu source pour créer un NOUVEL article de blog. Ne te contente pas de résumer ou de modifier légèrement.
+    *   **Titre H1:** Commence le corps de l'article par un titre principal (H1, formaté avec `#`). Ce titre H1 peut être différent du `title` du frontmatter.
+    *   **Style Narratif et Structuré:** Rédige le corps de l'article en Markdown simple et narratif. Utilise des titres et sous-titres (`##`, `###`) pour structurer le contenu, des paragraphes bien formés, des listes à puces (`- item`) ou numérotées (`1. item`) si approprié, du texte en gras (`**gras**`) ou italique (`*italique*`) pour mettre en évidence des points clés, et des citations (`> texte cité`) si pertinent. Le contenu doit être fluide, lisible et engageant.
+    *   **Longueur:** L'article doit faire au minimum 800 mots.
+    *   **Syntaxe MDX Valide:** Assure-toi que tout le contenu généré est compatible MDX. Échappe correctement les caractères spéciaux comme `{'{'}`, `{'}'}`, `<` et `>` s'ils doivent apparaître littéralement dans le texte et ne font pas partie d'une syntaxe MDX/HTML valide.
+
+3.  **Qualité & Style Linguistique:**
+    *   Rédige en français soutenu, professionnel et engageant.
+    *   L'article doit être unique, informatif et apporter une réelle valeur ajoutée au lecteur.
+
+4.  **Format de Sortie:**
+    *   Réponds UNIQUEMENT avec le frontmatter YAML suivi du contenu MDX.
+    *   NE PAS inclure de balises ```markdown ou ``` au début ou à la fin de ta réponse.
+    *   Ta réponse doit être uniquement le document MDX complet, en commençant par `---` pour le frontmatter et se terminant après le contenu principal de l'article. N'inclus aucun commentaire, note, explication ou texte superflu en dehors du contenu de l'article lui-même.
+
+Contenu à transformer:
+{content}
+"""
+        return prompt
@@ -0,0 +1,113 @@
+"""Condensation du texte source avant de l'envoyer à Gemini.
+
+Au lieu de couper le texte au 4000e caractère (et de perdre par exemple le
+tableau de caractéristiques en fin de test), le texte est découpé en blocs
+(paragraphes, lignes de tableau, éléments de liste), débarrassé des mentions
+parasites (cookies, partage, newsletter...) et des lignes répétées, puis les
+blocs les plus informatifs sont retenus dans un budget de tokens et remis
+dans l'ordre du document. Un texte qui tient dans le budget est envoyé en
+entier.
+"""
+import math
+import re
+from typing import List, Optional, Sequence, Union
+
+from scrapx.config import env_int
+from scrapx.gemini import estimate_tokens
+
+# Budget par défaut : l'équivalent des anciens [:4000] et [:1000] caractères
+DEFAULT_CONTENT_TOKENS = 1000
+DEFAULT_TITLE_CONTENT_TOKENS = 250
+
+# Blocs courts typiques des en-têtes, pieds de page et encarts
+BOILERPLATE = re.compile(
+    r"cookie|newsletter|abonnez|inscrivez|partager|partagez|suivez[- ]nous|lire aussi|à lire|voir aussi"
+    r"|sur le même sujet|commentaire|publicité|sponsoris|tous droits réservés|mentions légales"
+    r"|politique de confidentialité|share|follow us|subscribe|read more|related|advertisement"
+    r"|all rights reserved|©",
+    re.IGNORECASE)
+BOILERPLATE_MAX_CHARS = 160
+
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def content_budget_from_env() -> int:
+    """Budget de tokens du contenu source d'un prompt (SCRAPX_CONTENT_TOKENS)."""
+    return max(1, env_int('SCRAPX_CONTENT_TOKENS', DEFAULT_CONTENT_TOKENS))
+
+
+def split_blocks(text: str) -> List[str]:
+    """Blocs d'un texte brut : ses lignes, ou ses phrases s'il tient sur une seule ligne."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return lines
+    return _SENTENCE_END.split(text.strip())
+
+
+def clean_blocks(blocks: Sequence[str]) -> List[str]:
+    """Blocs sans espaces superflus, sans mentions parasites et sans répétitions."""
+    seen = set()
+    cleaned = []
+    for block in blocks:
+        block = ' '.join(block.split())
+        if not block:
+            continue
+        key = block.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(block) <= BOILERPLATE_MAX_CHARS and BOILERPLATE.search(block):
+            continue
+        cleaned.append(block)
+    return cleaned
+
+
+def _score(block: str, position: int, frequencies: dict) -> float:
+    """Information par token : mots rares dans la page, chiffres (caractéristiques), début du texte."""
+    words = [word.casefold() for word in _WORD.findall(block)]
+    if not words:
+        return 0.0
+    rarity = sum(1 / frequencies[word] for word in set(words))
+    digits = len(_NUMBER.findall(block))
+    lead = 1.5 if position < 2 else 1.0
+    return lead * (rarity + 0.5 * digits) / math.sqrt(estimate_tokens(block))
+
+
+def _truncate(block: str, budget: int) -> str:
+    """Début de `block` tenant dans `budget` tokens, coupé en fin de phrase si possible."""
+    text = block[:budget * 4]
+    end = max(text.rfind('. '), text.rfind('! '), text.rfind('? '))
+    return text[:end + 1] if end > len(text) // 2 else text
+
+
+def condense(content: Union[str, Sequence[str]], budget: Optional[int] = None) -> str:
+    """Texte à envoyer à Gemini : les blocs les plus informatifs de `content` dans `budget` tokens.
+
+    `content` est un texte brut ou la liste de ses blocs (paragraphes).
+    """
+    budget = budget or content_budget_from_env()
+    blocks = clean_blocks(split_blocks(content) if isinstance(content, str) else content)
+    if not blocks:
+        return ''
+    if estimate_tokens('\n'.join(blocks)) <= budget:
+        return '\n'.join(blocks)
+
+    frequencies: dict = {}
+    for block in blocks:
+        for word in set(word.casefold() for word in _WORD.findall(block)):
+            frequencies[word] = frequencies.get(word, 0) + 1
+    ranked = sorted(range(len(blocks)), key=lambda i: _score(blocks[i], i, frequencies), reverse=True)
+
+    chosen = set()
+    remaining = budget
+    for index in ranked:
+        cost = estimate_tokens(blocks[index]) + 1
+        if cost <= remaining:
+            chosen.add(index)
+            remaining -= cost
+    if not chosen:
+        # Un seul bloc plus long que le budget : on garde son début
+        return _truncate(blocks[ranked[0]], budget)
+    return '\n'.join(blocks[index] for index in sorted(chosen))
@@ -0,0 +1,35 @@
+"""Lecture des réglages optionnels depuis l'environnement (.env)."""
+import os
+from typing import Optional
+
+
+def env_int(name: str, default: int) -> int:
+    """Retourne la variable d'environnement `name` convertie en entier."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"⚠️ Valeur invalide pour {name} ({value!r}), utilisation de {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Retourne la variable d'environnement `name` convertie en flottant."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"⚠️ Valeur invalide pour {name} ({value!r}), utilisation de {default}")
+        return default
+
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Retourne la variable d'environnement `name` (ou `default` si vide)."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip()
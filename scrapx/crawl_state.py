@@ -0,0 +1,104 @@
+"""État persistant du crawl : empreinte du contenu extrait et fichier produit, par URL.
+
+Une URL dont le texte extrait n'a pas changé depuis le passage précédent (et
+dont le fichier généré existe toujours) n'est pas renvoyée à Gemini ; si le
+texte a changé, l'article est régénéré à la place de l'ancien fichier.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from scrapx.config import env_str
+
+DEFAULT_STATE_PATH = os.path.join('.cache', 'crawl_state.sqlite3')
+
+
+def content_hash(*parts: Optional[str]) -> str:
+    """Empreinte SHA-256 des champs extraits d'une page."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class CrawlState:
+
+    def __init__(self, scope: str, path: str = DEFAULT_STATE_PATH):
+        # Chaque script a son propre espace : une même URL peut produire un article et une fiche
+        self.scope = scope
+        self.path = path
+        self.unchanged = 0
+        self.changed = 0
+        self.new = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                scope TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                output_path TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (scope, url)
+            )
+        """)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls, scope: str) -> Optional['CrawlState']:
+        """État configuré par SCRAPX_CRAWL_STATE (chemin, ou `off` pour tout régénérer)."""
+        path = env_str('SCRAPX_CRAWL_STATE', DEFAULT_STATE_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(scope, path)
+
+    def check(self, url: str, digest: str):
+        """Compare `digest` au passage précédent.
+
+        Retourne `(inchangé, chemin_du_fichier_précédent)` ; une URL est inchangée
+        si son empreinte est identique et que son fichier existe encore.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, output_path FROM urls WHERE scope = ? AND url = ?",
+                (self.scope, url)).fetchone()
+        if row is None:
+            with self._lock:
+                self.new += 1
+            return False, None
+
+        previous_hash, output_path = row
+        if output_path and not os.path.exists(output_path):
+            output_path = None
+        unchanged = previous_hash == digest and output_path is not None
+        with self._lock:
+            if unchanged:
+                self.unchanged += 1
+            else:
+                self.changed += 1
+        return unchanged, output_path
+
+    def record(self, url: str, digest: str, output_path: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (scope, url, content_hash, output_path, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.scope, url, digest, output_path, time.time()))
+            self._db.commit()
+
+    def report(self):
+        print(f"\n♻️ Crawl incrémental : {self.unchanged} URL(s) inchangée(s) (génération évitée), "
+              f"{self.changed} modifiée(s) régénérée(s), {self.new} nouvelle(s)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
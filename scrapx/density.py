@@ -0,0 +1,181 @@
+"""Extraction du contenu principal par densité de texte, à la manière de Readability.
+
+La cascade de sélecteurs (`article`, `.content`, `main`...) prend le premier
+conteneur assez long, et à défaut tout le `<body>` : menus, encarts « À lire
+aussi » et commentaires partent alors dans le prompt. Ici, chaque bloc de texte
+(paragraphe, cellule...) d'au moins `MIN_BLOCK_CHARS` caractères apporte des
+points à son parent et, de moins en moins, à ses ancêtres : le conteneur
+retenu est celui qui cumule le plus de texte en paragraphes, pondéré par sa
+part de texte hors liens (`1 - densité de liens`) et par ses classes et id
+(`content`, `article`... contre `comment`, `sidebar`, `related`...).
+
+Les longueurs de texte et de texte de liens de tous les éléments sont
+calculées en un seul parcours de l'arbre. SCRAPX_CONTENT_EXTRACTOR choisit le
+moteur des deux scripts : `cascade` (par défaut) ou `density`.
+"""
+import re
+from typing import Collection, Dict, List, Optional
+
+from bs4 import NavigableString, Tag
+
+from scrapx.config import env_str
+
+CASCADE = 'cascade'
+DENSITY = 'density'
+EXTRACTORS = (CASCADE, DENSITY)
+
+# Blocs qui apportent des points à leurs ancêtres
+SCORED_TAGS = frozenset(['p', 'pre', 'td', 'blockquote'])
+MIN_BLOCK_CHARS = 25
+# Ancêtres crédités par bloc, et diviseur des points pour chacun (parent, grand-parent...)
+ANCESTOR_DIVIDERS = (1, 2, 6)
+
+# Frères du conteneur retenu ajoutés au contenu (en-tête d'article, puces d'un produit...)
+SIBLING_SCORE_RATIO = 0.2
+MIN_SIBLING_SCORE = 10
+MIN_SIBLING_CHARS = 80
+MAX_SIBLING_LINK_DENSITY = 0.25
+
+# Points de départ d'un conteneur selon sa balise
+TAG_WEIGHTS = {
+    'div': 5, 'article': 5, 'main': 5, 'section': 3,
+    'pre': 3, 'td': 3, 'blockquote': 3,
+    'address': -3, 'ol': -3, 'ul': -3, 'dl': -3, 'dd': -3, 'dt': -3, 'li': -3, 'form': -3,
+    'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5, 'th': -5,
+}
+CLASS_WEIGHT = 25
+POSITIVE = re.compile(r"article|body|content|entry|hentry|main|page|post|text|blog|story|product|descri",
+                      re.IGNORECASE)
+NEGATIVE = re.compile(r"comment|reviews|customer|meta|foot|masthead|promo|related|read-also|scroll|share|social|sidebar"
+                      r"|sponsor|taboola|outbrain|shopping|tags|tool|widget|banner|breadcrumb|menu|nav|newsletter"
+                      r"|cookie|popup|trending|advert|^ad-|-ad$",
+                      re.IGNORECASE)
+
+
+def extractor_from_env() -> str:
+    """Moteur d'extraction du contenu configuré par SCRAPX_CONTENT_EXTRACTOR (`cascade` par défaut)."""
+    name = env_str('SCRAPX_CONTENT_EXTRACTOR', CASCADE).strip().lower()
+    if name in EXTRACTORS:
+        return name
+    print(f"⚠️ Moteur d'extraction {name!r} inconnu, utilisation de {CASCADE!r}")
+    return CASCADE
+
+
+def class_weight(element) -> int:
+    """Bonus ou malus selon les classes et l'id de l'élément."""
+    weight = 0
+    for value in (' '.join(element.get('class') or ()), element.get('id') or ''):
+        if not isinstance(value, str) or not value:
+            continue
+        if NEGATIVE.search(value):
+            weight -= CLASS_WEIGHT
+        if POSITIVE.search(value):
+            weight += CLASS_WEIGHT
+    return weight
+
+
+def _text_stats(soup, remove: Collection[str] = ()):
+    """Longueurs de texte et de texte de liens par élément, blocs notés et éléments de `remove`, en un parcours.
+
+    Les longueurs sont celles de `get_text(strip=True)` une fois les éléments
+    de `remove` retirés. Chaque texte est compté pour son parent, puis les
+    totaux remontent des éléments les plus profonds vers la racine ; tout le
+    texte d'un `<a>` est du texte de liens.
+    """
+    text: Dict[int, int] = {}
+    links: Dict[int, int] = {}
+    commas: Dict[int, int] = {}
+    blocks: List[Tag] = []
+    tags: List[Tag] = []
+    removed: List[Tag] = []
+    for node in soup.descendants:
+        if type(node) is NavigableString:
+            length = len(node.strip())
+            if length:
+                key = id(node.parent)
+                text[key] = text.get(key, 0) + length
+                count = node.count(',')
+                if count:
+                    commas[key] = commas.get(key, 0) + count
+        elif isinstance(node, Tag):
+            tags.append(node)
+            if node.name in SCORED_TAGS:
+                blocks.append(node)
+            if node.name in remove:
+                removed.append(node)
+    # Ordre inverse du document : les descendants d'un élément passent avant lui
+    for tag in reversed(tags):
+        key, parent = id(tag), id(tag.parent)
+        if key not in text or tag.name in remove:
+            continue
+        if tag.name == 'a':
+            links[key] = text[key]
+        text[parent] = text.get(parent, 0) + text[key]
+        if key in links:
+            links[parent] = links.get(parent, 0) + links[key]
+        if key in commas:
+            commas[parent] = commas.get(parent, 0) + commas[key]
+    return text, links, commas, blocks, removed
+
+
+def density_content_element(soup, remove: Collection[str] = (), min_length: int = 0) -> Optional[Tag]:
+    """Conteneur du texte principal selon la densité de texte (None si aucun ne dépasse `min_length`).
+
+    Les éléments dont la balise est dans `remove` (scripts, navigation...) sont
+    retirés de l'arbre, repérés pendant le même parcours. Les frères du
+    conteneur qui font aussi partie du contenu sont regroupés avec lui dans un
+    nouveau `div`, inséré à sa place dans l'arbre.
+    """
+    remove = frozenset(remove)
+    text, links, commas, blocks, removed = _text_stats(soup, remove)
+    for element in removed:
+        element.decompose()
+    scores: Dict[int, float] = {}
+    candidates: Dict[int, Tag] = {}
+    for block in blocks:
+        length = text.get(id(block), 0)
+        if block.decomposed or length < MIN_BLOCK_CHARS:
+            continue
+        # Un point par bloc, un par virgule, jusqu'à trois pour la longueur
+        points = 1 + commas.get(id(block), 0) + min(length // 100, 3)
+        ancestor = block.parent
+        for divider in ANCESTOR_DIVIDERS:
+            if ancestor is None or ancestor.name == '[document]':
+                break
+            key = id(ancestor)
+            if key not in candidates:
+                candidates[key] = ancestor
+                scores[key] = TAG_WEIGHTS.get(ancestor.name, 0) + class_weight(ancestor)
+            scores[key] += points / divider
+            ancestor = ancestor.parent
+
+    def link_density(key):
+        return links.get(key, 0) / max(text.get(key, 0), 1)
+
+    final = {key: scores[key] * (1 - link_density(key)) for key in candidates}
+    best = max((key for key in candidates if text.get(key, 0) > min_length),
+               key=final.__getitem__, default=None)
+    if best is None:
+        return None
+    element = candidates[best]
+    parent = element.parent
+    if parent is None or parent.name in ('[document]', 'html'):
+        return element
+
+    # Frères bien notés, ou assez longs et pauvres en liens (titre et chapô, puces d'un produit)
+    threshold = max(MIN_SIBLING_SCORE, final[best] * SIBLING_SCORE_RATIO)
+    kept = []
+    for sibling in parent.find_all(recursive=False):
+        key = id(sibling)
+        if sibling is element or final.get(key, 0) >= threshold or (
+                text.get(key, 0) >= MIN_SIBLING_CHARS and link_density(key) < MAX_SIBLING_LINK_DENSITY
+                and class_weight(sibling) >= 0):
+            kept.append(sibling)
+    if len(kept) == 1:
+        return element
+    # Regroupés sur place dans un `div` : le reste de l'extraction voit toujours toute la page
+    wrapper = soup.new_tag('div')
+    kept[0].insert_before(wrapper)
+    for sibling in kept:
+        wrapper.append(sibling)
+    return wrapper
@@ -0,0 +1,274 @@
+"""Découverte des articles d'un site par ses sitemaps et ses flux RSS/Atom.
+
+Les sitemaps sont lus depuis les lignes `Sitemap:` du robots.txt (ou
+`/sitemap.xml` à défaut), index de sitemaps compris ; les flux sont ceux
+déclarés par la page du blog (`<link rel="alternate" type="application/rss+xml">`).
+Les documents XML sont analysés au fil du téléchargement : chaque morceau
+reçu est donné à un `XMLPullParser` et chaque entrée est libérée dès qu'elle
+est lue. Un sitemap de 100 000 URLs n'est donc jamais gardé en entier, ni
+comme document téléchargé ni comme arbre. Avec `since`, les URLs (et les sitemaps d'un
+index) dont le `lastmod` est plus ancien sont ignorés.
+
+Les sitemaps dépassent souvent SCRAPX_MAX_BODY_MB (un sitemap de 100 000 URLs
+fait plus de 13 Mo) : lus en flux, ils ont leur propre limite,
+SCRAPX_MAX_SITEMAP_MB. Chaque document refusé ou en échec est signalé et
+compté dans le bilan de la découverte.
+"""
+import itertools
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from scrapx.config import env_float
+from scrapx.extraction import is_article_link
+from scrapx.fetcher import CHUNK_SIZE, AsyncFetcher, RejectedResponse
+from scrapx.parsing import FALLBACK_PARSER
+from scrapx.urls import canonicalize_url
+
+# Nombre maximal de documents sitemap lus par site (un index peut en lister des centaines)
+DEFAULT_MAX_SITEMAPS = 50
+# Taille maximale d'un sitemap ou d'un flux (lus en flux, la mémoire n'en dépend pas)
+DEFAULT_MAX_SITEMAP_MB = 100
+
+# Éléments XML qui décrivent une entrée : sitemap, index de sitemaps, RSS, Atom
+ENTRY_TAGS = ('url', 'sitemap', 'item', 'entry')
+DATE_FIELDS = ('lastmod', 'updated', 'published', 'pubdate', 'date')
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+
+
+# Quelques balises répétées des centaines de milliers de fois dans un gros sitemap
+@lru_cache(maxsize=256)
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def max_document_from_env() -> int:
+    """Taille maximale (octets) d'un sitemap ou d'un flux, SCRAPX_MAX_SITEMAP_MB Mo ; 0 = sans limite."""
+    return max(0, int(env_float('SCRAPX_MAX_SITEMAP_MB', DEFAULT_MAX_SITEMAP_MB) * 1024 * 1024))
+
+
+def parse_date(text: Optional[str]) -> Optional[datetime]:
+    """Date W3C (sitemaps, Atom) ou RFC 822 (RSS), ramenée en UTC ; None si illisible."""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _decompressed(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Morceaux de `chunks`, décompressés au fil de l'eau pour les .xml.gz servis sans Content-Encoding."""
+    chunks = iter(chunks)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= 2:
+            break
+    if head[:2] != b'\x1f\x8b':
+        yield head
+        yield from chunks
+        return
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in itertools.chain([head], chunks):
+        # Sortie bornée par appel : un morceau très compressé ne se déploie pas d'un coup
+        while chunk and not decompressor.eof:
+            yield decompressor.decompress(chunk, CHUNK_SIZE)
+            chunk = decompressor.unconsumed_tail
+
+
+def _entry_fields(element: ET.Element) -> Dict[str, str]:
+    fields: Dict[str, str] = {}
+    for child in element:
+        child_name = _local_name(child.tag)
+        if child_name == 'link' and child.get('href'):
+            # Atom : le lien de l'article est le `rel="alternate"` (ou sans `rel`)
+            if child.get('rel', 'alternate') == 'alternate':
+                fields.setdefault('link', child.get('href'))
+        elif child.text and child_name not in fields:
+            fields[child_name] = child.text.strip()
+    return fields
+
+
+def iter_entries(content: Union[bytes, Iterable[bytes]]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Parcourt un sitemap ou un flux en flux ; produit `(type, champs)` pour chaque entrée.
+
+    `content` est le document entier ou, pour l'analyser pendant le
+    téléchargement, ses morceaux dans l'ordre (`AsyncFetcher.iter_body`).
+    `type` vaut `url`, `sitemap` (entrée d'un index), `item` (RSS) ou `entry`
+    (Atom) ; `champs` associe le nom local de chaque sous-élément à son texte
+    (à l'attribut `href` pour les liens Atom).
+    """
+    if isinstance(content, bytes):
+        # Donné d'un bloc, le parseur construirait tous les éléments avant qu'on puisse les libérer
+        data = content
+        content = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    parents: List[ET.Element] = []
+
+    def entries():
+        for event, element in parser.read_events():
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            name = _local_name(element.tag)
+            if name not in ENTRY_TAGS:
+                continue
+            yield name, _entry_fields(element)
+
+            # L'entrée est lue : on la détache pour que l'arbre ne grossisse pas
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+    try:
+        for chunk in _decompressed(content):
+            parser.feed(chunk)
+            yield from entries()
+        parser.close()
+        yield from entries()
+    except (ET.ParseError, zlib.error) as e:
+        print(f"⚠️ Document XML illisible ou tronqué : {e}")
+
+
+class SiteDiscovery:
+
+    def __init__(self, fetcher: AsyncFetcher, html_parser: str = FALLBACK_PARSER,
+                 max_sitemaps: int = DEFAULT_MAX_SITEMAPS, max_document: Optional[int] = None):
+        self.fetcher = fetcher
+        self.html_parser = html_parser
+        self.max_sitemaps = max_sitemaps
+        self.max_document = max_document_from_env() if max_document is None else max_document
+
+        # Statistiques
+        self.documents = 0
+        self.entries = 0
+        self.too_old = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def _skip(self, url: str, error: requests.RequestException):
+        """Signale et compte un document de découverte abandonné."""
+        if isinstance(error, RejectedResponse):
+            self.rejected += 1
+        else:
+            self.failed += 1
+        print(f"⚠️ Découverte : {url} ignoré ({error})")
+
+    def _get(self, url: str) -> Optional[bytes]:
+        try:
+            return self.fetcher.get(url).content
+        except requests.RequestException as e:
+            self._skip(url, e)
+            return None
+
+    def sitemap_urls(self, site_url: str) -> List[str]:
+        """Sitemaps déclarés dans le robots.txt du site, ou `/sitemap.xml` à défaut."""
+        parsed = urlparse(site_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        sitemaps = []
+        robots = self._get(f"{root}/robots.txt")
+        for line in (robots or b'').decode('utf-8', errors='replace').splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(urljoin(root, value.strip()))
+        return sitemaps or [f"{root}/sitemap.xml"]
+
+    def feed_urls(self, page_url: str, html: Optional[bytes] = None) -> List[str]:
+        """Flux RSS/Atom déclarés dans l'en-tête de la page."""
+        if html is None:
+            html = self._get(page_url)
+        if not html:
+            return []
+        # Seules les balises <link> sont construites, pas l'arbre de la page
+        links = BeautifulSoup(html, self.html_parser, parse_only=SoupStrainer('link'))
+        return [urljoin(page_url, link['href']) for link in links.find_all('link', href=True)
+                if 'alternate' in (link.get('rel') or []) and link.get('type', '').lower() in FEED_TYPES]
+
+    def _read(self, url: str, since: Optional[datetime], found: Dict[str, Tuple[str, Optional[datetime]]],
+              pending: List[str], accept: Callable[[str], bool]):
+        try:
+            # Les entrées sont traitées pendant le téléchargement du document
+            for kind, fields in iter_entries(self.fetcher.iter_body(url, self.max_document)):
+                self.entries += 1
+                location = fields.get('loc') or fields.get('link')
+                if not location:
+                    continue
+                modified = next((parse_date(fields[name]) for name in DATE_FIELDS if name in fields), None)
+                if since and modified and modified < since:
+                    self.too_old += 1
+                    continue
+                if kind == 'sitemap':
+                    pending.append(urljoin(url, location))
+                    continue
+                location = urljoin(url, location)
+                if not accept(location) or not is_article_link(location):
+                    continue
+                key = canonicalize_url(location)
+                first, latest = found.get(key, (location, None))
+                if modified and (latest is None or modified > latest):
+                    latest = modified
+                found[key] = (first, latest)
+        except requests.RequestException as e:
+            # Les entrées lues avant l'abandon sont gardées, comme pour un document tronqué
+            self._skip(url, e)
+            return
+        self.documents += 1
+
+    def discover(self, page_url: str, since: Optional[datetime] = None) -> List[str]:
+        """URLs d'articles de la section `page_url`, les plus récentes d'abord.
+
+        Les flux de la page sont pris tels quels (hors pages de liste) ; dans les
+        sitemaps, qui couvrent tout le site, seules les URLs situées sous le
+        chemin de `page_url` sont gardées.
+        """
+        if since and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        parsed = urlparse(page_url)
+        prefix = parsed.path if parsed.path.endswith('/') else parsed.path.rsplit('/', 1)[0] + '/'
+
+        def on_site(url: str) -> bool:
+            return urlparse(url).netloc == parsed.netloc and url.rstrip('/') != page_url.rstrip('/')
+
+        def in_section(url: str) -> bool:
+            return on_site(url) and urlparse(url).path.startswith(prefix)
+
+        # Forme canonique -> (première URL rencontrée, date de modification la plus récente)
+        found: Dict[str, Tuple[str, Optional[datetime]]] = {}
+        for feed in self.feed_urls(page_url):
+            self._read(feed, since, found, [], on_site)
+
+        pending = self.sitemap_urls(page_url)
+        seen = set()
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap = pending.pop(0)
+            if sitemap in seen:
+                continue
+            seen.add(sitemap)
+            self._read(sitemap, since, found, pending, in_section)
+
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        entries = sorted(found.values(), key=lambda entry: entry[1] or oldest, reverse=True)
+        return [url for url, _ in entries]
+
+    def report(self):
+        print(f"\n🗺️ Découverte : {self.documents} sitemap(s)/flux lu(s), {self.entries} entrée(s), "
+              f"{self.too_old} ignorée(s) car antérieure(s) à la date limite")
+        if self.rejected or self.failed:
+            print(f"🚫 Découverte : {self.rejected} document(s) refusé(s) (type de contenu ou taille), "
+                  f"{self.failed} en échec")
@@ -0,0 +1,381 @@
+"""Extraction du contenu des pages, commune aux deux scripts.
+
+Les fonctions `extract_*` prennent un arbre BeautifulSoup, quel que soit le
+parseur qui l'a construit (voir `scrapx.parsing`). Celles qui retirent les
+éléments parasites (scripts, navigation...) modifient l'arbre reçu.
+
+Les fonctions `parse_*` partent des octets bruts de la page et retournent un
+petit dictionnaire (ou un `ProductArticle`) : elles peuvent tourner dans un
+autre processus (voir `scrapx.parse_pool`).
+"""
+import re
+from typing import Any, Callable, List, Optional, Union
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from scrapx.density import CASCADE, DENSITY, density_content_element
+from scrapx.extraction_profiles import NO_MATCH, ExtractionProfile
+from scrapx.parsing import make_soup
+from scrapx.selector_plan import SelectorPlan
+
+# Image par défaut si aucune image n'est trouvée
+DEFAULT_IMAGE = "https://images.unsplash.com/photo-1611224923853-80b023f02d71?ixlib=rb-4.0.3&auto=format&fit=crop&w=2070&q=80"
+
+# Différents sélecteurs pour détecter les liens d'articles
+LINK_SELECTORS = [
+    'a[href*="/blog/"]',
+    'a[href*="/article/"]',
+    'a[href*="/post/"]',
+    'article a',
+    '.post-title a',
+    '.entry-title a',
+    'h2 a',
+    'h3 a',
+    '.blog-post a',
+    '.article-link',
+    'a[href*="/20"]',
+    'a[href*="/marques/"]',
+]
+
+LINK_EXCLUDE_PATTERNS = [
+    r'/page/',
+    r'/category/',
+    r'/tag/',
+    r'/author/',
+    r'/search/',
+    r'#',
+    r'\?',
+    r'/feed',
+    r'/rss',
+]
+
+# Liens vers la page suivante d'une liste d'articles
+PAGINATION_SELECTORS = [
+    'link[rel="next"]',
+    'a[rel="next"]',
+    '.pagination a',
+    '.nav-links a',
+    'a.page-numbers',
+    '.pager a',
+    'a.next',
+]
+
+# Pas de `?p=N` : c'est le permalien d'un article WordPress, pas une page de liste
+PAGINATION_PATTERN = re.compile(r'/page/\d+/?$|[?&](?:page|paged)=\d+', re.IGNORECASE)
+
+ARTICLE_CONTENT_SELECTORS = [
+    'article',
+    '.post-content',
+    '.entry-content',
+    '.article-content',
+    '.blog-post',
+    '.content',
+    'main',
+    '.post-body',
+    '[role="main"]'
+]
+# Texte en dessous duquel le conteneur d'un article ne suffit pas
+ARTICLE_MIN_CHARS = 200
+# Éléments retirés avant de chercher le texte principal
+ARTICLE_NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside', '.sidebar', '.advertisement']
+
+# Sélecteurs communs pour les images principales d'articles
+ARTICLE_IMAGE_SELECTORS = [
+    'meta[property="og:image"]',  # Open Graph image
+    'meta[name="twitter:image"]',  # Twitter Card image
+    '.article-featured-image img',  # Classes communes pour les images à la une
+    '.post-thumbnail img',
+    '.entry-featured-image img',
+    'article img:first-of-type',  # Première image dans l'article
+    '.wp-post-image',  # Image à la une WordPress
+    'article .image-principale',
+    '[itemprop="image"]'
+]
+
+TITLE_SELECTORS = ['h1', 'title', '.article-title', '.post-title', '#title']
+
+# Éléments qui forment un bloc de texte (paragraphe, ligne de tableau...) pour `extract_blocks`
+BLOCK_TAGS = ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'blockquote', 'pre', 'dt', 'dd', 'figcaption']
+
+MAIN_CONTENT_SELECTORS = [
+    'article', '.article-content', '.post-content', '.entry-content',
+    '.content', 'main', '#content', '.article-body', '.post-body'
+]
+MAIN_CONTENT_NOISE_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']
+
+# Sélecteurs spécifiques aux images de produits
+PRODUCT_IMAGE_SELECTORS = [
+    # Sélecteurs Open Graph et Twitter
+    'meta[property="og:image"]',
+    'meta[name="twitter:image"]',
+    # Sélecteurs spécifiques aux sites e-commerce
+    '#landingImage',  # Amazon
+    '#main-image',    # Commun
+    '.product-image-main img',
+    '.product-featured-image',
+    '.gallery-image--default',
+    '[data-main-image]',
+    # Sélecteurs génériques pour images de produits
+    '.product-image img',
+    '.primary-image',
+    '.main-product-image',
+    # Fallback sur première image pertinente
+    'img[itemprop="image"]',
+    '.product img:first-of-type'
+]
+
+# Chaque liste est évaluée en un seul parcours de l'arbre (voir `scrapx.selector_plan`)
+LINK_PLAN = SelectorPlan(LINK_SELECTORS)
+PAGINATION_PLAN = SelectorPlan(PAGINATION_SELECTORS)
+ARTICLE_CONTENT_PLAN = SelectorPlan(ARTICLE_CONTENT_SELECTORS)
+ARTICLE_IMAGE_PLAN = SelectorPlan(ARTICLE_IMAGE_SELECTORS)
+TITLE_PLAN = SelectorPlan(TITLE_SELECTORS)
+MAIN_CONTENT_PLAN = SelectorPlan(MAIN_CONTENT_SELECTORS)
+PRODUCT_IMAGE_PLAN = SelectorPlan(PRODUCT_IMAGE_SELECTORS)
+
+
+def extract_article_links(soup, blog_url: str) -> List[str]:
+    """Liens d'articles du même site trouvés sur une page de blog (pages de liste exclues)."""
+    article_links = set()
+    base_domain = urlparse(blog_url).netloc
+
+    for link in LINK_PLAN.select(soup):
+        href = link.get('href')
+        if href:
+            full_url = urljoin(blog_url, href)
+            if urlparse(full_url).netloc == base_domain:
+                article_links.add(full_url)
+
+    return [link for link in article_links if is_article_link(link)]
+
+
+def extract_pagination_links(soup, page_url: str) -> List[str]:
+    """Pages suivantes d'une liste d'articles (même hôte), dans l'ordre du document."""
+    base_domain = urlparse(page_url).netloc
+    candidates = [element.get('href') for element in PAGINATION_PLAN.select_each(soup)]
+    candidates += [link['href'] for link in soup.find_all('a', href=True) if PAGINATION_PATTERN.search(link['href'])]
+
+    pages = []
+    for href in candidates:
+        if not href:
+            continue
+        full_url = urldefrag(urljoin(page_url, href))[0]
+        if urlparse(full_url).netloc == base_domain and full_url != page_url and full_url not in pages:
+            pages.append(full_url)
+    return pages
+
+
+def is_article_link(url: str) -> bool:
+    """Faux pour les pages de liste, de flux ou de recherche (catégories, tags, pagination...)."""
+    return not any(re.search(pattern, url, re.IGNORECASE) for pattern in LINK_EXCLUDE_PATTERNS)
+
+
+def first_accepted(soup, plan: SelectorPlan, field: str, accept: Callable[[Any], Any],
+                   profile: Optional[ExtractionProfile] = None):
+    """Première valeur non nulle de `accept(élément)` en suivant la cascade `plan`.
+
+    Avec le profil du domaine, le sélecteur qui a gagné sur les pages
+    précédentes est essayé seul d'abord ; la cascade complète n'est parcourue
+    que s'il ne trouve plus rien, et son gagnant est noté dans le profil. Si le
+    profil sait qu'aucun sélecteur ne trouve ce champ sur le site, la cascade
+    est sautée.
+    """
+    learned = profile.learned.get(field) if profile else None
+    if learned == NO_MATCH:
+        profile.hit()
+        return None
+    if learned in plan.selectors:
+        element = soup.select_one(learned)
+        value = accept(element) if element is not None else None
+        if value is not None:
+            profile.hit()
+            return value
+    found = False
+    for selector, element in zip(plan.selectors, plan.first_matches(soup)):
+        if element is not None:
+            found = True
+            value = accept(element)
+            if value is not None:
+                if profile:
+                    profile.miss(field, selector)
+                return value
+    if profile:
+        # Des éléments refusés (texte trop court...) peuvent convenir sur la page suivante
+        profile.miss(field, None if found else NO_MATCH)
+    return None
+
+
+def article_content_element(soup, profile: Optional[ExtractionProfile] = None, extractor: str = CASCADE):
+    """Élément qui contient le texte principal d'un article de blog (None si la page est vide).
+
+    Avec `extractor='density'`, le conteneur est choisi par densité de texte
+    (voir `scrapx.density`) ; la cascade de sélecteurs ne sert que s'il ne
+    trouve pas assez de texte.
+    """
+    if extractor == DENSITY:
+        element = density_content_element(soup, ARTICLE_NOISE_TAGS, min_length=ARTICLE_MIN_CHARS)
+        if element is not None:
+            return element
+    for element in soup(ARTICLE_NOISE_TAGS):
+        element.decompose()
+
+    found = []
+
+    def accept(element):
+        found.append(element)
+        return element if len(element.get_text(strip=True)) > ARTICLE_MIN_CHARS else None  # Contenu suffisant
+
+    # À défaut de contenu suffisant : le corps de la page, sinon le dernier candidat trouvé
+    return (first_accepted(soup, ARTICLE_CONTENT_PLAN, 'content', accept, profile)
+            or soup.find('body') or (found[-1] if found else None))
+
+
+def extract_article_text(soup, extractor: str = CASCADE) -> str:
+    """Texte principal d'un article de blog."""
+    element = article_content_element(soup, extractor=extractor)
+    return element.get_text(strip=True) if element else ""
+
+
+def extract_blocks(element) -> List[str]:
+    """Blocs de texte d'un élément, dans l'ordre du document : paragraphes, titres,
+    éléments de liste, lignes de tableau (cellules séparées par `|`)...
+
+    Sans balise de bloc (texte directement dans des `div`), les lignes du texte.
+    """
+    if element is None:
+        return []
+    blocks = []
+    for block in element.find_all(BLOCK_TAGS):
+        # Un bloc qui en contient d'autres (li > p) est représenté par ceux-ci
+        if block.find(BLOCK_TAGS):
+            continue
+        text = block.get_text(separator=' | ' if block.name == 'tr' else ' ', strip=True)
+        if text:
+            blocks.append(text)
+    return blocks or element.get_text(separator='\n', strip=True).splitlines()
+
+
+def _absolute_image_url(soup, image_url: str) -> str:
+    # S'assurer que l'URL est absolue
+    if not image_url.startswith(('http://', 'https://')):
+        base_url = soup.find('base', href=True)
+        if base_url:
+            image_url = urljoin(base_url['href'], image_url)
+    return image_url
+
+
+def extract_main_image(soup, profile: Optional[ExtractionProfile] = None) -> Optional[str]:
+    """Extrait l'URL de l'image principale de l'article."""
+    def accept(element):
+        # Selon le type d'élément, extraire l'URL
+        image_url = element.get('content') if element.name == 'meta' else element.get('src')
+        return _absolute_image_url(soup, image_url) if image_url else None
+
+    image_url = first_accepted(soup, ARTICLE_IMAGE_PLAN, 'image', accept, profile)
+    return DEFAULT_IMAGE if image_url is None else image_url
+
+
+def extract_title(soup, profile: Optional[ExtractionProfile] = None) -> str:
+    return (first_accepted(soup, TITLE_PLAN, 'title', lambda element: element.get_text().strip() or None, profile)
+            or "Titre non trouvé")
+
+
+def main_content_element(soup, profile: Optional[ExtractionProfile] = None, extractor: str = CASCADE):
+    """Élément qui contient le texte principal d'une page produit ou d'un test."""
+    if extractor == DENSITY:
+        element = density_content_element(soup, MAIN_CONTENT_NOISE_TAGS)
+        if element is not None:
+            return element
+    for element in soup(MAIN_CONTENT_NOISE_TAGS):
+        element.decompose()
+
+    return first_accepted(soup, MAIN_CONTENT_PLAN, 'content', lambda element: element, profile) \
+        or soup.find('body') or soup
+
+
+def extract_main_content(soup, extractor: str = CASCADE) -> str:
+    """Texte principal d'une page produit ou d'un test."""
+    return main_content_element(soup, extractor=extractor).get_text(separator=' ', strip=True)
+
+
+def extract_product_image(soup, profile: Optional[ExtractionProfile] = None) -> str:
+    """Extrait l'URL de l'image principale du produit."""
+    def accept(element):
+        # Extraire l'URL selon le type d'élément
+        if element.name == 'meta':
+            image_url = element.get('content')
+        else:
+            # Chercher d'abord data-src pour les images lazy-loaded
+            image_url = element.get('data-src') or element.get('src')
+        # Nettoyer l'URL (retirer les paramètres)
+        return _absolute_image_url(soup, image_url.split('?')[0]) if image_url else None
+
+    image_url = first_accepted(soup, PRODUCT_IMAGE_PLAN, 'image', accept, profile)
+    return DEFAULT_IMAGE if image_url is None else image_url
+
+
+def parse_article_page(html: Union[bytes, str], parser: str, profile: Optional[ExtractionProfile] = None,
+                       extractor: str = CASCADE) -> dict:
+    """Texte (brut et en blocs) et image principale d'un article de blog.
+
+    Avec le profil d'extraction du domaine, celui-ci est renvoyé (clé
+    `profile`) avec ce que la page a appris.
+    """
+    soup = make_soup(html, parser)
+    element = article_content_element(soup, profile, extractor)
+    content = element.get_text(strip=True) if element else ""
+    if len(content) <= 100:
+        record = {'content': None, 'paragraphs': [], 'image_url': extract_main_image(soup, profile)}
+    else:
+        record = {
+            'content': content,
+            'paragraphs': extract_blocks(element),
+            'image_url': extract_main_image(soup, profile),
+        }
+    if profile is not None:
+        record['profile'] = profile
+    return record
+
+
+class ProductArticle:
+    """Article source d'une fiche produit : uniquement les champs utiles en aval.
+
+    Ni l'arbre ni le HTML re-sérialisé ne sont conservés (voir
+    `scrapx.raw_html_store` pour garder les pages brutes). `__slots__` évite un
+    dictionnaire par instance ; l'objet reste picklable pour le pool de parsing.
+    """
+    __slots__ = ('url', 'title', 'content', 'paragraphs', 'image_url',
+                 'content_hash', 'unchanged', 'duplicate_of', 'output_path', 'product_sheet', 'profile')
+
+    def __init__(self, url: str, title: str, content: str, paragraphs: List[str], image_url: str):
+        self.url = url
+        self.title = title
+        self.content = content
+        self.paragraphs = paragraphs
+        self.image_url = image_url
+        # Renseignés par le pipeline (état du crawl, génération)
+        self.content_hash: Optional[str] = None
+        self.unchanged = False
+        # URL de l'article dont celui-ci est un quasi-doublon (fiche existante réutilisée)
+        self.duplicate_of: Optional[str] = None
+        self.output_path: Optional[str] = None
+        self.product_sheet: Optional[str] = None
+        # Profil d'extraction du domaine, au retour du pool de parsing
+        self.profile: Optional[ExtractionProfile] = None
+
+
+def parse_product_page(html: Union[bytes, str], parser: str, url: str = '',
+                       profile: Optional[ExtractionProfile] = None, extractor: str = CASCADE) -> ProductArticle:
+    """Titre, texte et image d'une page produit ou d'un test."""
+    soup = make_soup(html, parser)
+    # Le contenu d'abord, comme ProductScraper.parse_article : il retire l'en-tête et la navigation
+    element = main_content_element(soup, profile, extractor)
+    article = ProductArticle(url, extract_title(soup, profile), element.get_text(separator=' ', strip=True),
+                             extract_blocks(element), extract_product_image(soup, profile))
+    article.profile = profile
+    return article
+
+
+def parse_listing_page(html: Union[bytes, str], url: str, parser: str) -> dict:
+    """Liens d'articles et pages suivantes d'une page de blog."""
+    soup = make_soup(html, parser)
+    return {'links': extract_article_links(soup, url), 'pagination': extract_pagination_links(soup, url)}
@@ -0,0 +1,156 @@
+"""Profils d'extraction appris par domaine.
+
+Sur un même site, c'est presque toujours le même sélecteur de la cascade qui
+trouve le contenu, le titre ou l'image. Le profil d'un domaine retient, pour
+chaque champ, le sélecteur qui a gagné : les pages suivantes l'essaient seul
+d'abord et ne parcourent la cascade complète que s'il ne trouve plus rien ; le
+profil est alors corrigé avec le nouveau gagnant. Quand aucun sélecteur de la
+cascade ne trouve rien sur le site, cela aussi est retenu (`NO_MATCH`) : les
+pages suivantes passent directement à la solution de repli.
+
+Un site peut changer de gabarit sans que le sélecteur appris cesse de
+trouver quelque chose (un sélecteur plus prioritaire trouverait alors mieux) :
+une page sur `RECHECK_EVERY` d'un domaine reparcourt donc la cascade complète
+pour tous les champs. Et dès qu'un sélecteur appris échoue, les `NO_MATCH` du
+domaine sont oubliés. Les profils sont conservés dans
+`.cache/extraction_profiles.sqlite3`.
+
+Le parsing tourne dans d'autres processus (voir `scrapx.parse_pool`) : le
+profil du domaine voyage avec la page sous forme d'`ExtractionProfile`, revient
+avec le résultat de l'extraction, et c'est le processus principal qui
+l'enregistre (`ExtractionProfiles.update`).
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from scrapx.config import env_str
+
+DEFAULT_PROFILES_PATH = os.path.join('.cache', 'extraction_profiles.sqlite3')
+# Aucun sélecteur de la cascade ne trouve ce champ sur le site
+NO_MATCH = ''
+# Une page sur N d'un domaine ignore son profil et reparcourt toute la cascade
+RECHECK_EVERY = 50
+
+
+class ExtractionProfile:
+    """Sélecteurs appris d'un domaine (`learned`) et gagnants de la page en cours (`won`)."""
+
+    def __init__(self, learned: Optional[Dict[str, str]] = None):
+        self.learned = dict(learned or {})
+        # champ -> sélecteur gagnant de la cascade, ou NO_MATCH si elle n'a rien trouvé
+        self.won: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        """Le sélecteur appris a suffi."""
+        self.hits += 1
+
+    def miss(self, field: str, selector: Optional[str]):
+        """La cascade complète a été parcourue ; `selector` l'a emporté (NO_MATCH : aucun
+        sélecteur ne trouve rien, None : rien à retenir)."""
+        self.misses += 1
+        if selector is not None:
+            self.won[field] = selector
+
+
+def domain_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class ExtractionProfiles:
+
+    def __init__(self, scope: str, path: str = DEFAULT_PROFILES_PATH):
+        # Chaque script a ses propres cascades de sélecteurs
+        self.scope = scope
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._profiles: Dict[str, Dict[str, str]] = {}
+        self._pages: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                scope TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                field TEXT NOT NULL,
+                selector TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (scope, domain, field)
+            )
+        """)
+        self._db.commit()
+
+        for domain, field, selector in self._db.execute(
+                "SELECT domain, field, selector FROM profiles WHERE scope = ?", (scope,)):
+            self._profiles.setdefault(domain, {})[field] = selector
+
+    @classmethod
+    def from_env(cls, scope: str) -> Optional['ExtractionProfiles']:
+        """Profils configurés par SCRAPX_EXTRACTION_PROFILES (chemin, ou `off` pour toujours tout essayer)."""
+        path = env_str('SCRAPX_EXTRACTION_PROFILES', DEFAULT_PROFILES_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(scope, path)
+
+    def profile_for(self, url: str) -> ExtractionProfile:
+        domain = domain_of(url)
+        with self._lock:
+            self._pages[domain] = self._pages.get(domain, 0) + 1
+            if self._pages[domain] % RECHECK_EVERY == 0:
+                return ExtractionProfile()
+            return ExtractionProfile(self._profiles.get(domain))
+
+    def update(self, url: str, profile: Optional[ExtractionProfile]):
+        """Enregistre ce que l'extraction d'une page du domaine a appris."""
+        if profile is None:
+            return
+        domain = domain_of(url)
+        with self._lock:
+            self.hits += profile.hits
+            self.misses += profile.misses
+            learned = self._profiles.setdefault(domain, {})
+            changed = redesigned = False
+            for field, selector in profile.won.items():
+                previous = learned.get(field)
+                if selector == previous:
+                    continue
+                if previous is not None:
+                    self.invalidated += 1
+                    # Sélecteur appris en échec : le gabarit du site a sans doute changé
+                    redesigned = redesigned or (previous != NO_MATCH and field in profile.learned)
+                changed = True
+                learned[field] = selector
+                self._db.execute(
+                    "INSERT OR REPLACE INTO profiles (scope, domain, field, selector, updated) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.scope, domain, field, selector, time.time()))
+            if redesigned:
+                for field in [field for field, selector in learned.items()
+                              if selector == NO_MATCH and field not in profile.won]:
+                    del learned[field]
+                    self._db.execute("DELETE FROM profiles WHERE scope = ? AND domain = ? AND field = ?",
+                                     (self.scope, domain, field))
+            if changed:
+                self._db.commit()
+
+    def report(self):
+        total = self.hits + self.misses
+        if total:
+            print(f"🧭 Profils d'extraction : {self.hits}/{total} champ(s) trouvé(s) par le sélecteur appris du "
+                  f"site, {self.misses} cascade(s) complète(s), {self.invalidated} profil(s) corrigé(s)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
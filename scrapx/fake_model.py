@@ -0,0 +1,101 @@
+"""Modèle Gemini factice pour les benchmarks : réponses préparées et latence réglable.
+
+Il expose la même méthode `generate_content` que `genai.GenerativeModel`, ce
+qui permet de faire tourner le répartiteur et les scripts sans clé API ni
+réseau. Avec `stream=True`, la réponse arrive par fragments de `chunk_size`
+caractères, la latence étant répartie entre les fragments.
+"""
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Union
+
+from scrapx.gemini import estimate_tokens
+
+
+class FakeAPIError(Exception):
+    """Erreur de l'API factice, avec le même attribut `code` que google.api_core."""
+
+    def __init__(self, code: int, message: str = "Erreur simulée"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeResponse:
+
+    def __init__(self, text: str, prompt: str = ""):
+        self.text = text
+        prompt_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+
+class FakeStreamResponse(FakeResponse):
+    """Réponse en streaming : itérable de fragments exposant chacun `.text`."""
+
+    def __init__(self, text: str, prompt: str = "", chunk_size: int = 200, latency: float = 0.0):
+        super().__init__(text, prompt)
+        self._chunks = [text[i:i + chunk_size] for i in range(0, len(text), max(1, chunk_size))] or ['']
+        self._delay = latency / len(self._chunks)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self._delay:
+                time.sleep(self._delay)
+            yield SimpleNamespace(text=chunk)
+
+
+class FakeGenerativeModel:
+
+    def __init__(self, responses: Union[str, List[str], Callable[[str], str]] = "Réponse factice",
+                 latency: float = 0.0, model_name: str = 'fake-model', fail_every: int = 0,
+                 error_code: int = 429, chunk_size: int = 200):
+        """
+        `responses` : texte fixe, liste parcourue en boucle, ou fonction `prompt -> texte`.
+        `fail_every` : si > 0, un appel sur `fail_every` lève une `FakeAPIError(error_code)`.
+        `chunk_size` : taille (en caractères) des fragments d'une réponse en streaming.
+        """
+        if callable(responses):
+            self._respond = responses
+        elif isinstance(responses, str):
+            self._respond = lambda prompt: responses
+        else:
+            cycle = itertools.cycle(responses)
+            self._respond = lambda prompt: next(cycle)
+
+        self.model_name = model_name
+        self.latency = latency
+        self.fail_every = fail_every
+        self.error_code = error_code
+        self.chunk_size = chunk_size
+
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency and not stream:
+                time.sleep(self.latency)
+            if self.fail_every and call_number % self.fail_every == 0:
+                raise FakeAPIError(self.error_code)
+            if stream:
+                # La latence est subie pendant l'itération, fragment par fragment
+                return FakeStreamResponse(self._respond(prompt), prompt, self.chunk_size, self.latency)
+            return FakeResponse(self._respond(prompt), prompt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
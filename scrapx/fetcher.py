@@ -0,0 +1,227 @@
+"""Récupération HTTP concurrente (asyncio) partagée par les deux scripts.
+
+Les requêtes restent faites avec `requests` (même session, mêmes en-têtes,
+connexions réutilisées, voir `scrapx.http_client`), mais elles tournent dans
+un pool de threads piloté par asyncio : plusieurs
+pages sont téléchargées en parallèle, dans la limite d'une concurrence
+globale, et chaque page est rendue dès qu'elle arrive. Un
+`PolitenessScheduler` optionnel espace les requêtes vers un même hôte, et un
+`HttpCache` optionnel revalide les pages déjà vues au lieu de les
+re-télécharger.
+
+Le corps des réponses est lu par morceaux : une URL dont le Content-Type
+n'est pas une page (PDF, image, vidéo...) est refusée dès les en-têtes, et le
+téléchargement s'arrête au-delà de SCRAPX_MAX_BODY_MB Mo (décompressés), ce
+qui borne la mémoire de chaque téléchargement en cours.
+"""
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional
+
+import requests
+
+from scrapx.config import env_float
+from scrapx.http_cache import HttpCache
+from scrapx.http_client import has_pools, mount_pools, report_dns_cache
+from scrapx.politeness import PolitenessScheduler, host_of, interleave_by_host
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10
+# Taille maximale d'un corps de réponse (les sitemaps lus en flux ont leur propre limite)
+DEFAULT_MAX_BODY_MB = 10
+CHUNK_SIZE = 64 * 1024
+
+# Types de contenu acceptés : pages HTML, XML (sitemaps, flux), texte et sitemaps compressés
+ACCEPTED_CONTENT_TYPE = re.compile(
+    r"text/.*|application/(xhtml\+xml|xml|[\w.-]+\+xml|(x-)?gzip|octet-stream)", re.IGNORECASE)
+
+
+class RejectedResponse(requests.RequestException):
+    """Réponse abandonnée avant la fin : type de contenu refusé ou corps trop volumineux."""
+
+
+def max_body_from_env() -> int:
+    """Taille maximale (octets) d'un corps de réponse, SCRAPX_MAX_BODY_MB Mo ; 0 = sans limite."""
+    return max(0, int(env_float('SCRAPX_MAX_BODY_MB', DEFAULT_MAX_BODY_MB) * 1024 * 1024))
+
+
+def wire_size(response: requests.Response) -> Optional[int]:
+    """Octets du corps reçus sur le réseau (avant décompression gzip/br), None si inconnu."""
+    tell = getattr(response.raw, 'tell', None)
+    return tell() if callable(tell) else None
+
+
+@dataclass
+class FetchResult:
+    """Résultat du téléchargement d'une URL."""
+    url: str
+    status: Optional[int] = None
+    content: Optional[bytes] = None
+    error: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.content is not None
+
+
+class AsyncFetcher:
+
+    def __init__(self, session: requests.Session, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT, scheduler: Optional[PolitenessScheduler] = None,
+                 http_cache: Optional[HttpCache] = None, max_body: Optional[int] = None):
+        self.session = session
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.http_cache = http_cache
+        self.max_body = max_body_from_env() if max_body is None else max_body
+        self.rejected = 0
+
+        # Un pool de connexions assez grand pour ne pas brider la concurrence,
+        # sauf si la session a déjà été réglée (voir `scrapx.http_client`)
+        if not has_pools(self.session):
+            mount_pools(self.session, self.concurrency, self.concurrency)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fetch')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _request(self, url: str) -> FetchResult:
+        cached = self.http_cache.get(url) if self.http_cache else None
+        headers = cached.conditional_headers() if cached else None
+
+        with self.session.get(url, timeout=self.timeout, headers=headers, stream=True) as response:
+            if response.status_code == 304 and cached:
+                return FetchResult(url=url, status=304, content=self.http_cache.not_modified(url, cached),
+                                   from_cache=True)
+            response.raise_for_status()
+            content = self._read_body(response)
+
+        if self.http_cache:
+            self.http_cache.store(url, content, response.headers.get('ETag'),
+                                  response.headers.get('Last-Modified'), wire_size(response))
+        return FetchResult(url=url, status=response.status_code, content=content)
+
+    def _reject(self, message: str):
+        self.rejected += 1
+        raise RejectedResponse(message)
+
+    def _iter_chunks(self, response: requests.Response, max_body: int) -> Iterator[bytes]:
+        """Corps de `response` par morceaux ; lève `RejectedResponse` s'il n'est pas acceptable."""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+        if content_type and not ACCEPTED_CONTENT_TYPE.fullmatch(content_type):
+            self._reject(f"Type de contenu refusé ({content_type})")
+
+        # Taille annoncée (compressée) : refus avant toute lecture
+        length = response.headers.get('Content-Length', '')
+        if max_body and length.isdigit() and int(length) > max_body:
+            self._reject(f"Réponse trop volumineuse ({int(length) // 1024} Ko annoncés)")
+
+        size = 0
+        # Les morceaux sont décompressés au fil de la lecture : la limite porte sur le contenu décodé
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if max_body and size > max_body:
+                self._reject(f"Réponse trop volumineuse (plus de {max_body // 1024} Ko)")
+            yield chunk
+
+    def _read_body(self, response: requests.Response) -> bytes:
+        """Corps complet de `response`, dans la limite de `max_body`."""
+        body = bytearray()
+        for chunk in self._iter_chunks(response, self.max_body):
+            body += chunk
+        return bytes(body)
+
+    def get(self, url: str) -> FetchResult:
+        """Requête GET bloquante ; lève une `requests.RequestException` en cas d'échec."""
+        if self.scheduler:
+            time.sleep(self.scheduler.reserve(url))
+        return self._request(url)
+
+    def iter_body(self, url: str, max_body: Optional[int] = None) -> Iterator[bytes]:
+        """Corps de `url` morceau par morceau, au fil du téléchargement (GET bloquant).
+
+        Pour les documents lus en flux (sitemaps, flux RSS) : le corps n'est
+        jamais gardé en entier, il ne passe donc pas par le cache HTTP. La
+        connexion est rendue au pool dès que le générateur est épuisé ou fermé.
+        """
+        if self.scheduler:
+            time.sleep(self.scheduler.reserve(url))
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from self._iter_chunks(response, self.max_body if max_body is None else max_body)
+
+    def _bind_loop(self):
+        # Sémaphore et verrous sont liés à la boucle asyncio courante (un asyncio.run par lot)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._host_locks = {}
+            self._loop = loop
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        self._bind_loop()
+        return self._semaphore
+
+    async def _acquire_slot(self, url: str):
+        """Attend que l'hôte de `url` soit libre puis prend un créneau de concurrence."""
+        semaphore = self._get_semaphore()
+        if not self.scheduler:
+            await semaphore.acquire()
+            return
+
+        # Lecture du robots.txt (bloquante, une seule fois par hôte)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.scheduler.crawl_delay, url)
+
+        # Une seule tâche par hôte attend son tour : les autres hôtes ne sont pas bloqués
+        host_lock = self._host_locks.setdefault(host_of(url), asyncio.Lock())
+        async with host_lock:
+            while True:
+                # Le créneau de l'hôte n'est réservé qu'une fois la place de concurrence obtenue,
+                # pour que le délai soit compté à partir du départ réel de la requête
+                await semaphore.acquire()
+                wait = self.scheduler.try_reserve(url)
+                if wait <= 0:
+                    return
+                semaphore.release()
+                await asyncio.sleep(wait)
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Télécharge une URL sans bloquer la boucle ; les erreurs sont rendues dans le résultat."""
+        loop = asyncio.get_running_loop()
+        await self._acquire_slot(url)
+        try:
+            return await loop.run_in_executor(self._executor, self._request, url)
+        except requests.RequestException as e:
+            return FetchResult(url=url, error=str(e))
+        finally:
+            self._semaphore.release()
+
+    async def fetch_iter(self, urls: Iterable[str]) -> AsyncIterator[FetchResult]:
+        """Télécharge toutes les URLs en parallèle et les rend dans l'ordre d'arrivée."""
+        tasks = [asyncio.ensure_future(self.fetch(url)) for url in interleave_by_host(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def report(self):
+        if self.rejected:
+            print(f"🚫 {self.rejected} réponse(s) abandonnée(s) (type de contenu refusé ou trop volumineuse)")
+        if self.http_cache:
+            self.http_cache.report()
+        report_dns_cache()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        if self.http_cache:
+            self.http_cache.close()
@@ -0,0 +1,163 @@
+"""Exploration des pages de liste d'un blog : frontière de crawl et pagination.
+
+Partant de la page de blog, l'explorateur suit la pagination (`/page/2/`,
+`?page=3`, `rel="next"`...) et récolte les liens d'articles de chaque page.
+Les pages à visiter sont rangées dans une file de priorité (les moins
+profondes d'abord), chaque URL n'est visitée qu'une fois, et l'exploration
+d'un site s'arrête à sa profondeur maximale, à son budget de pages ou dès que
+son budget d'articles est atteint. Plusieurs pages sont téléchargées en
+parallèle via l'`AsyncFetcher` (politesse par hôte comprise) et parsées dans
+le `ParsePool`.
+"""
+import asyncio
+import heapq
+import itertools
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from scrapx.extraction import parse_listing_page
+from scrapx.fetcher import AsyncFetcher
+from scrapx.parse_pool import ParsePool
+from scrapx.parsing import FALLBACK_PARSER
+from scrapx.politeness import host_of
+from scrapx.urls import canonicalize_url
+
+DEFAULT_MAX_DEPTH = 20
+DEFAULT_MAX_PAGES_PER_SITE = 100
+
+
+class CrawlFrontier:
+    """File de priorité des pages à visiter, sans doublons, bornée par site et en profondeur."""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, max_pages_per_site: int = DEFAULT_MAX_PAGES_PER_SITE):
+        self.max_depth = max_depth
+        self.max_pages_per_site = max_pages_per_site
+        self._heap: List[Tuple[int, int, str, int]] = []
+        self._order = itertools.count()
+        self._seen = set()
+        self._pages_per_site: Counter = Counter()
+
+        # Statistiques
+        self.duplicates = 0
+        self.too_deep = 0
+        self.over_budget = 0
+
+    def add(self, url: str, depth: int = 0, priority: Optional[int] = None) -> bool:
+        """Ajoute une page à visiter ; retourne False si elle est déjà connue ou hors limites."""
+        key = canonicalize_url(url)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        if depth > self.max_depth:
+            self.too_deep += 1
+            return False
+        host = host_of(url)
+        if self._pages_per_site[host] >= self.max_pages_per_site:
+            self.over_budget += 1
+            return False
+
+        self._seen.add(key)
+        self._pages_per_site[host] += 1
+        # À priorité égale, premier ajouté, premier visité
+        heapq.heappush(self._heap, (depth if priority is None else priority, next(self._order), url, depth))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """Page la plus prioritaire et sa profondeur."""
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class ListingCrawler:
+
+    def __init__(self, fetcher: AsyncFetcher, parse_pool: ParsePool, html_parser: str = FALLBACK_PARSER,
+                 max_depth: int = DEFAULT_MAX_DEPTH, max_pages_per_site: int = DEFAULT_MAX_PAGES_PER_SITE):
+        self.fetcher = fetcher
+        self.parse_pool = parse_pool
+        self.html_parser = html_parser
+        self.max_depth = max_depth
+        self.max_pages_per_site = max_pages_per_site
+
+        # Statistiques de la session
+        self.pages = 0
+        self.failed = 0
+        self.articles = 0
+        self.duplicates = 0
+        self.skipped = 0
+
+    async def _visit(self, url: str) -> Optional[dict]:
+        page = await self.fetcher.fetch(url)
+        if not page.ok:
+            print(f"⚠️ Page de liste inaccessible {url}: {page.error}")
+            return None
+        return await self.parse_pool.run(parse_listing_page, page.content, url, self.html_parser)
+
+    async def crawl(self, seeds: Iterable[str], max_articles_per_site: Optional[int] = None,
+                    skip: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Visite les pages de liste à partir de `seeds` ; retourne les liens d'articles dans l'ordre de découverte.
+
+        Les articles pour lesquels `skip(url)` est vrai (déjà traités, par exemple)
+        ne sont ni retournés ni comptés dans le budget du site.
+        """
+        frontier = CrawlFrontier(self.max_depth, self.max_pages_per_site)
+        for seed in seeds:
+            frontier.add(seed)
+
+        # Forme canonique -> première URL rencontrée
+        articles: Dict[str, str] = {}
+        per_site: Counter = Counter()
+
+        def site_full(url: str) -> bool:
+            return max_articles_per_site is not None and per_site[host_of(url)] >= max_articles_per_site
+
+        in_flight: Dict[asyncio.Future, Tuple[str, int]] = {}
+        while frontier or in_flight:
+            while frontier and len(in_flight) < self.fetcher.concurrency:
+                url, depth = frontier.pop()
+                if not site_full(url):
+                    in_flight[asyncio.ensure_future(self._visit(url))] = (url, depth)
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, depth = in_flight.pop(task)
+                try:
+                    record = task.result()
+                except Exception as e:
+                    print(f"⚠️ Page de liste illisible {url}: {e}")
+                    record = None
+                if record is None:
+                    self.failed += 1
+                    continue
+                self.pages += 1
+
+                for link in record['links']:
+                    key = canonicalize_url(link)
+                    if key in articles:
+                        self.duplicates += 1
+                    elif skip and skip(link):
+                        self.skipped += 1
+                    elif not site_full(link):
+                        articles[key] = link
+                        per_site[host_of(link)] += 1
+                if not site_full(url):
+                    for next_page in record['pagination']:
+                        frontier.add(next_page, depth + 1)
+
+        self.duplicates += frontier.duplicates
+        self.articles += len(articles)
+        return list(articles.values())
+
+    def harvest(self, seeds: Iterable[str], max_articles_per_site: Optional[int] = None,
+                skip: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Version synchrone de `crawl`."""
+        return asyncio.run(self.crawl(seeds, max_articles_per_site, skip))
+
+    def report(self):
+        print(f"\n🕸️ Exploration : {self.pages} page(s) de liste visitée(s), {self.failed} en échec, "
+              f"{self.articles} article(s) trouvé(s), {self.duplicates} doublon(s) et "
+              f"{self.skipped} article(s) déjà traité(s) ignorés")
@@ -0,0 +1,303 @@
+"""Répartiteur d'appels Gemini : concurrence, quotas RPM/TPM et backoff adaptatif.
+
+Tous les appels `generate_content` des deux scripts passent par un
+`GeminiDispatcher` partagé. Il peut être appelé depuis plusieurs threads à la
+fois (les workers de l'étage de génération) et garantit que :
+- le nombre de requêtes en vol ne dépasse pas `max_concurrency` ;
+- les requêtes par minute et les tokens par minute respectent le budget
+  configuré, via deux seaux à jetons (token buckets) ;
+- une réponse 429/503 déclenche un nouvel essai avec backoff exponentiel, et
+  ralentit temporairement le débit autorisé (puis il remonte progressivement).
+Avec un `LLMCache`, un prompt déjà envoyé au même modèle est servi depuis le
+disque sans appel à l'API. `stream` transmet la réponse fragment par fragment
+au lieu d'attendre qu'elle soit complète.
+"""
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+from scrapx.config import env_float, env_int
+from scrapx.llm_cache import CachedResponse, LLMCache
+
+DEFAULT_RPM = 15
+DEFAULT_TPM = 1_000_000
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+# Tokens de sortie attendus par réponse, pour réserver le budget TPM avant l'appel
+DEFAULT_OUTPUT_TOKENS = 1500
+
+RETRYABLE_STATUS = {429, 503}
+
+# Le seau autorise une rafale de quelques secondes de budget, pas d'une minute entière,
+# pour ne pas dépasser le quota sur une fenêtre glissante
+BURST_SECONDS = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens (≈ 4 caractères par token)."""
+    return max(1, len(text) // 4)
+
+
+def chunk_text(chunk) -> str:
+    """Texte d'un fragment de réponse en streaming ('' pour un fragment sans texte, comme le dernier)."""
+    try:
+        return chunk.text or ''
+    except ValueError:
+        return ''
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """Code HTTP porté par une exception de l'API (google.api_core ou modèle factice)."""
+    for attribute in ('code', 'status_code'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return int(value)
+    return None
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe, rempli à `per_minute` jetons par minute."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute * burst_seconds / 60.0)
+        self.tokens = self.capacity
+        self.factor = 1.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Jetons par seconde, après ralentissement adaptatif."""
+        return self.per_minute * self.factor / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """Prend `amount` jetons, en attendant si besoin ; retourne le temps attendu (s)."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def adjust(self, amount: float):
+        """Corrige le solde après coup (positif = rendre des jetons, négatif = en reprendre)."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def set_factor(self, factor: float):
+        with self._lock:
+            self._refill()
+            self.factor = factor
+
+
+class GeminiDispatcher:
+
+    def __init__(self, model, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_backoff: float = 2.0, max_backoff: float = 60.0,
+                 output_tokens: int = DEFAULT_OUTPUT_TOKENS, cache: Optional[LLMCache] = None):
+        self.model = model
+        self.cache = cache
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.output_tokens = output_tokens
+
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._rate_factor = 1.0
+
+        # Statistiques de la session
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.tokens_used = 0
+        self.quota_wait = 0.0
+        self.api_time = 0.0
+
+    @classmethod
+    def from_env(cls, model) -> 'GeminiDispatcher':
+        """Crée un répartiteur à partir de GEMINI_RPM, GEMINI_TPM et GEMINI_MAX_CONCURRENCY."""
+        return cls(
+            model,
+            rpm=env_float('GEMINI_RPM', DEFAULT_RPM),
+            tpm=env_float('GEMINI_TPM', DEFAULT_TPM),
+            max_concurrency=env_int('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY),
+            max_retries=env_int('GEMINI_MAX_RETRIES', DEFAULT_MAX_RETRIES),
+            cache=LLMCache.from_env(),
+        )
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.model, 'model_name', type(self.model).__name__)
+
+    def _set_rate_factor(self, factor: float):
+        self._rate_factor = factor
+        self.requests_bucket.set_factor(factor)
+        self.tokens_bucket.set_factor(factor)
+
+    def _on_throttled(self):
+        # Décroissance multiplicative du débit autorisé...
+        with self._lock:
+            self.throttled += 1
+            self._set_rate_factor(max(0.1, self._rate_factor * 0.5))
+
+    def _on_success(self, response, reserved_tokens: int):
+        # ... et remontée additive à chaque succès
+        with self._lock:
+            self.calls += 1
+            if self._rate_factor < 1.0:
+                self._set_rate_factor(min(1.0, self._rate_factor + 0.05))
+
+        usage = getattr(response, 'usage_metadata', None)
+        used = getattr(usage, 'total_token_count', None) if usage else None
+        if isinstance(used, int) and used > 0:
+            self.tokens_bucket.adjust(reserved_tokens - used)
+        else:
+            used = reserved_tokens
+        with self._lock:
+            self.tokens_used += used
+
+    def generate(self, prompt: str, **kwargs):
+        """Équivalent de `model.generate_content(prompt)` respectant quotas et concurrence."""
+        if self.cache:
+            cached_text = self.cache.get(self.model_name, prompt, kwargs)
+            if cached_text is not None:
+                return CachedResponse(cached_text)
+
+        response = self._call(prompt, **kwargs)
+        if self.cache and response is not None and getattr(response, 'text', None):
+            self.cache.put(self.model_name, prompt, response.text, kwargs)
+        return response
+
+    def discard(self, prompt: str, **kwargs):
+        """Retire du cache la réponse à `prompt`, quand l'appelant n'a pas pu l'exploiter."""
+        if self.cache:
+            self.cache.invalidate(self.model_name, prompt, kwargs)
+
+    def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Texte de la réponse à `prompt`, fragment par fragment, au fil de la génération.
+
+        Mêmes quotas, concurrence et cache que `generate`. Une erreur 429/503
+        n'est réessayée que tant qu'aucun fragment n'a été transmis.
+        """
+        if self.cache:
+            cached_text = self.cache.get(self.model_name, prompt, kwargs)
+            if cached_text is not None:
+                yield cached_text
+                return
+
+        chunks = []
+        for text in self._stream_call(prompt, **kwargs):
+            if self.cache:
+                chunks.append(text)
+            yield text
+        if self.cache and chunks:
+            self.cache.put(self.model_name, prompt, ''.join(chunks), kwargs)
+
+    def _acquire(self, reserved_tokens: int):
+        """Attend une place dans les quotas RPM et TPM."""
+        waited = self.requests_bucket.acquire(1)
+        waited += self.tokens_bucket.acquire(reserved_tokens)
+        with self._lock:
+            self.quota_wait += waited
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Délai avant le prochain essai après `error` ; relève l'erreur si elle n'est pas réessayable."""
+        status = error_status(error)
+        if status not in RETRYABLE_STATUS or attempt == self.max_retries:
+            with self._lock:
+                self.failures += 1
+            raise error
+
+        self._on_throttled()
+        delay = min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        with self._lock:
+            self.retries += 1
+        print(f"⏳ Gemini a répondu {status}, nouvel essai dans {delay:.1f}s "
+              f"(tentative {attempt + 2}/{self.max_retries + 1})")
+        return delay
+
+    def _call(self, prompt: str, **kwargs):
+        reserved_tokens = estimate_tokens(prompt) + self.output_tokens
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(reserved_tokens)
+
+            with self._slots:
+                start = time.perf_counter()
+                try:
+                    response = self.model.generate_content(prompt, **kwargs)
+                    error = None
+                except Exception as e:
+                    error = e
+                finally:
+                    with self._lock:
+                        self.api_time += time.perf_counter() - start
+
+            if error is None:
+                self._on_success(response, reserved_tokens)
+                return response
+
+            time.sleep(self._retry_delay(error, attempt))
+
+    def _stream_call(self, prompt: str, **kwargs) -> Iterator[str]:
+        reserved_tokens = estimate_tokens(prompt) + self.output_tokens
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(reserved_tokens)
+
+            started = False
+            with self._slots:
+                start = time.perf_counter()
+                try:
+                    response = self.model.generate_content(prompt, stream=True, **kwargs)
+                    for chunk in response:
+                        text = chunk_text(chunk)
+                        if text:
+                            started = True
+                            yield text
+                    error = None
+                except Exception as e:
+                    error = e
+                finally:
+                    with self._lock:
+                        self.api_time += time.perf_counter() - start
+
+            if error is None:
+                self._on_success(response, reserved_tokens)
+                return
+            if started:
+                # Une partie de la réponse est déjà transmise : impossible de la reprendre
+                with self._lock:
+                    self.failures += 1
+                raise error
+
+            time.sleep(self._retry_delay(error, attempt))
+
+    def report(self):
+        """Affiche le bilan des appels Gemini de la session."""
+        print(f"\n🤖 Appels Gemini : {self.calls} réussi(s), {self.failures} échec(s), "
+              f"{self.retries} nouvel(s) essai(s) dont {self.throttled} limitation(s) 429/503")
+        print(f"   Tokens consommés : ~{self.tokens_used} | attente quota : {self.quota_wait:.1f}s | "
+              f"temps API cumulé : {self.api_time:.1f}s")
+        if self.cache:
+            print(f"   Cache des réponses : {self.cache.hits} hit(s) / {self.cache.hits + self.cache.misses} "
+                  f"({self.cache.hit_rate:.0%})")
@@ -0,0 +1,123 @@
+"""Cache HTTP persistant avec revalidation ETag / Last-Modified.
+
+Le corps de chaque réponse portant un `ETag` ou un `Last-Modified` est stocké
+compressé (zlib). Au passage suivant, la requête est envoyée avec
+`If-None-Match` / `If-Modified-Since` : si le serveur répond 304, le corps
+stocké est réutilisé sans être re-téléchargé.
+
+Les octets comptés dans le bilan sont ceux reçus sur le réseau (corps
+compressé s'il a été servi en gzip/br), pas la taille décodée des pages.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+from scrapx.config import env_str
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'http_cache.sqlite3')
+
+
+class CachedPage:
+    """Entrée du cache : corps décompressé, validateurs et taille reçue sur le réseau."""
+
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str],
+                 size: Optional[int] = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = len(body) if size is None else size
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.revalidated = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                stored REAL NOT NULL,
+                size INTEGER
+            )
+        """)
+        # Cache créé avant le suivi de la taille reçue : ces pages comptent pour leur taille décodée
+        if 'size' not in {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}:
+            self._db.execute("ALTER TABLE pages ADD COLUMN size INTEGER")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional['HttpCache']:
+        """Cache configuré par SCRAPX_HTTP_CACHE (chemin, ou `off` pour le désactiver)."""
+        path = env_str('SCRAPX_HTTP_CACHE', DEFAULT_CACHE_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(path)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, size FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return CachedPage(zlib.decompress(row[0]), row[1], row[2], row[3])
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str],
+              size: Optional[int] = None):
+        """Enregistre le corps d'une réponse 200 ; sans validateur, elle ne pourrait pas être revalidée.
+
+        `size` est le nombre d'octets reçus sur le réseau (taille décodée du corps à défaut).
+        """
+        size = len(body) if size is None else size
+        with self._lock:
+            self.bytes_downloaded += size
+            if not etag and not last_modified:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (url, etag, last_modified, body, stored, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, zlib.compress(body, 6), time.time(), size))
+            self._db.commit()
+
+    def not_modified(self, url: str, page: CachedPage) -> bytes:
+        """Réponse 304 : le corps stocké est réutilisé tel quel."""
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += page.size
+            self._db.execute("UPDATE pages SET stored = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return page.body
+
+    def report(self):
+        total = self.bytes_downloaded + self.bytes_saved
+        share = self.bytes_saved / total if total else 0.0
+        print(f"\n🗄️ Cache HTTP : {self.revalidated} page(s) inchangée(s) (304), "
+              f"{self.bytes_downloaded / 1024:.0f} Ko reçus, "
+              f"{self.bytes_saved / 1024:.0f} Ko de transfert économisés ({share:.0%})")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,151 @@
+"""Client HTTP partagé par les deux scripts : session `requests` réglable.
+
+Toutes les requêtes (pages, sitemaps, robots.txt) passent par une même
+`requests.Session` dont les connexions sont réutilisées (keep-alive) :
+télécharger une liste d'URLs d'un même site n'ouvre qu'une poignée de
+connexions TCP/TLS au lieu d'une par page. La session créée ici règle :
+- la taille des pools : SCRAPX_HTTP_POOL_PER_HOST connexions gardées ouvertes
+  par hôte, pour SCRAPX_HTTP_POOL_HOSTS hôtes au plus ;
+- le keep-alive TCP sur les connexions inactives du pool ;
+- la compression : gzip et deflate, plus brotli/zstd si urllib3 sait les
+  décoder (paquets `brotli` / `zstandard` installés) ;
+- sur demande, un cache des résolutions DNS (SCRAPX_DNS_CACHE_TTL secondes,
+  0 par défaut = désactivé). Il remplace `socket.getaddrinfo` pour tout le
+  processus, y compris le client de l'API Gemini : il n'est donc pas activé
+  par défaut ;
+- HTTP/2 si SCRAPX_HTTP2=on, urllib3 ≥ 2.3 et le paquet `h2` sont présents
+  (support expérimental d'urllib3, négocié par ALPN en HTTPS uniquement).
+"""
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.request import ACCEPT_ENCODING
+
+from scrapx.config import env_float, env_int, env_str
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/91.0.4472.124 Safari/537.36')
+DEFAULT_POOL_HOSTS = 32
+DEFAULT_DNS_TTL = 300.0
+# Cache DNS désactivé sauf si SCRAPX_DNS_CACHE_TTL le demande
+DEFAULT_DNS_TTL_FROM_ENV = 0.0
+
+# Keep-alive TCP : sondes après 60 s d'inactivité (options absentes sur certains systèmes)
+KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4))
+    if hasattr(socket, name)
+]
+
+
+class PooledAdapter(HTTPAdapter):
+    """Adaptateur `requests` dont les connexions gardent le keep-alive TCP actif."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', HTTPConnection.default_socket_options + KEEPALIVE_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def mount_pools(session: requests.Session, per_host: int, hosts: int = DEFAULT_POOL_HOSTS):
+    """Monte sur `session` des pools de `per_host` connexions pour `hosts` hôtes au plus."""
+    adapter = PooledAdapter(pool_connections=max(1, hosts), pool_maxsize=max(1, per_host))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def has_pools(session: requests.Session) -> bool:
+    return isinstance(session.get_adapter('https://'), PooledAdapter)
+
+
+class DnsCache:
+    """Cache des résultats de `socket.getaddrinfo`, valables `ttl` secondes, pour tout le processus."""
+
+    def __init__(self, ttl: float = DEFAULT_DNS_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple, Tuple[float, list]] = {}
+        self._lock = threading.Lock()
+        self._getaddrinfo = None
+
+    def install(self):
+        if self._getaddrinfo is None:
+            self._getaddrinfo = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        if self._getaddrinfo is not None:
+            socket.getaddrinfo = self._getaddrinfo
+            self._getaddrinfo = None
+
+    def getaddrinfo(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+        # Les échecs de résolution ne sont pas mis en cache
+        result = self._getaddrinfo(*args, **kwargs)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (now + self.ttl, result)
+        return result
+
+
+_dns_cache: Optional[DnsCache] = None
+
+
+def install_dns_cache(ttl: float = DEFAULT_DNS_TTL) -> DnsCache:
+    """Installe (une seule fois par processus) le cache DNS."""
+    global _dns_cache
+    if _dns_cache is None:
+        _dns_cache = DnsCache(ttl)
+        _dns_cache.install()
+    return _dns_cache
+
+
+def enable_http2() -> bool:
+    """Active HTTP/2 dans urllib3 si c'est possible ; retourne False sinon."""
+    try:
+        import h2  # noqa: F401
+        from urllib3.http2 import inject_into_urllib3
+    except ImportError:
+        return False
+    inject_into_urllib3()
+    return True
+
+
+def create_session(per_host: int, hosts: int = DEFAULT_POOL_HOSTS,
+                   headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Session `requests` avec pools de connexions, keep-alive et compression."""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING.replace(',', ', ')})
+    if headers:
+        session.headers.update(headers)
+    mount_pools(session, per_host, hosts)
+    return session
+
+
+def session_from_env(concurrency: int, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Session configurée par SCRAPX_HTTP_POOL_PER_HOST (par défaut `concurrency`), SCRAPX_HTTP_POOL_HOSTS,
+    SCRAPX_DNS_CACHE_TTL (cache DNS de tout le processus, désactivé par défaut) et SCRAPX_HTTP2."""
+    ttl = env_float('SCRAPX_DNS_CACHE_TTL', DEFAULT_DNS_TTL_FROM_ENV)
+    if ttl > 0:
+        install_dns_cache(ttl)
+    if env_str('SCRAPX_HTTP2', 'off').lower() not in ('off', 'false', '0', 'none') and not enable_http2():
+        print("⚠️ HTTP/2 indisponible (urllib3 >= 2.3 et le paquet h2 sont nécessaires), utilisation d'HTTP/1.1")
+    return create_session(env_int('SCRAPX_HTTP_POOL_PER_HOST', concurrency),
+                          env_int('SCRAPX_HTTP_POOL_HOSTS', DEFAULT_POOL_HOSTS), headers)
+
+
+def report_dns_cache():
+    """Affiche le bilan du cache DNS, s'il est installé."""
+    if _dns_cache and (_dns_cache.hits or _dns_cache.misses):
+        print(f"🌐 Cache DNS : {_dns_cache.hits} hit(s), {_dns_cache.misses} résolution(s)")
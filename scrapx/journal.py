@@ -0,0 +1,179 @@
+"""Journal d'exécution pour reprendre un long traitement par lot là où il s'est arrêté.
+
+Chaque URL d'un lot a une ligne dans le journal, mise à jour (transaction
+SQLite validée sur disque) à chaque étage franchi : `pending`, `fetched`,
+`generated`, `saved` ou `failed`. Une exécution interrompue reste ouverte :
+avec `--resume`, la suivante reprend le même lot et ne traite que les URLs
+non sauvegardées. Les URLs en échec sont réessayées dans une file dédiée,
+dans la limite de `max_attempts` tentatives chacune.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from scrapx.config import env_int, env_str
+
+DEFAULT_JOURNAL_PATH = os.path.join('.cache', 'journal.sqlite3')
+DEFAULT_MAX_ATTEMPTS = 3
+
+PENDING = 'pending'
+FETCHED = 'fetched'
+GENERATED = 'generated'
+SAVED = 'saved'
+FAILED = 'failed'
+
+
+class RunJournal:
+
+    def __init__(self, scope: str, path: str = DEFAULT_JOURNAL_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.scope = scope
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.run_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Chaque changement d'état doit survivre à un arrêt brutal
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scope TEXT NOT NULL,
+                started REAL NOT NULL,
+                finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                run_id INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                output_path TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (run_id, url)
+            );
+        """)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls, scope: str) -> Optional['RunJournal']:
+        """Journal configuré par SCRAPX_JOURNAL (chemin, ou `off`) et SCRAPX_MAX_ATTEMPTS."""
+        path = env_str('SCRAPX_JOURNAL', DEFAULT_JOURNAL_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(scope, path, max_attempts=env_int('SCRAPX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+
+    def open_run(self, resume: bool = False) -> bool:
+        """Ouvre un lot ; avec `resume`, reprend le dernier lot inachevé. Retourne True en cas de reprise."""
+        with self._lock:
+            if resume:
+                row = self._db.execute(
+                    "SELECT id FROM runs WHERE scope = ? AND finished IS NULL ORDER BY id DESC LIMIT 1",
+                    (self.scope,)).fetchone()
+                if row:
+                    self.run_id = row[0]
+                    return True
+            with self._db:
+                cursor = self._db.execute("INSERT INTO runs (scope, started) VALUES (?, ?)",
+                                          (self.scope, time.time()))
+            self.run_id = cursor.lastrowid
+            return False
+
+    def add(self, urls: Iterable[str]):
+        """Ajoute des URLs au lot courant (celles déjà présentes gardent leur état)."""
+        now = time.time()
+        with self._lock, self._db:
+            position = self._db.execute("SELECT COALESCE(MAX(position), -1) FROM entries WHERE run_id = ?",
+                                        (self.run_id,)).fetchone()[0]
+            for url in urls:
+                position += 1
+                self._db.execute(
+                    "INSERT OR IGNORE INTO entries (run_id, url, position, status, updated) VALUES (?, ?, ?, ?, ?)",
+                    (self.run_id, url, position, PENDING, now))
+
+    def entries(self, urls: Iterable[str]) -> Dict[str, dict]:
+        """État courant des URLs demandées."""
+        wanted = set(urls)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, status, attempts, error, output_path FROM entries WHERE run_id = ?",
+                (self.run_id,)).fetchall()
+        return {url: {'status': status, 'attempts': attempts, 'error': error, 'output_path': output_path}
+                for url, status, attempts, error, output_path in rows if url in wanted}
+
+    def todo(self, urls: Iterable[str]) -> List[str]:
+        """URLs non sauvegardées qui ont encore droit à une tentative, dans l'ordre donné."""
+        urls = list(urls)
+        entries = self.entries(urls)
+        return [url for url in urls
+                if url in entries and entries[url]['status'] != SAVED
+                and entries[url]['attempts'] < self.max_attempts]
+
+    def begin_attempt(self, url: str):
+        self._update(url, PENDING, increment=True)
+
+    def mark(self, url: str, status: str, error: Optional[str] = None, output_path: Optional[str] = None):
+        self._update(url, status, error=error, output_path=output_path)
+
+    def _update(self, url: str, status: str, error: Optional[str] = None, output_path: Optional[str] = None,
+                increment: bool = False):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET status = ?, error = ?, output_path = COALESCE(?, output_path), "
+                "attempts = attempts + ?, updated = ? WHERE run_id = ? AND url = ?",
+                (status, error, output_path, 1 if increment else 0, time.time(), self.run_id, url))
+
+    def finish(self):
+        """Clôt le lot : une reprise ultérieure en démarrera un nouveau."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def report(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM entries WHERE run_id = ? GROUP BY status",
+                (self.run_id,)).fetchall()
+            exhausted = self._db.execute(
+                "SELECT COUNT(*) FROM entries WHERE run_id = ? AND status != ? AND attempts >= ?",
+                (self.run_id, SAVED, self.max_attempts)).fetchone()[0]
+        counts = ', '.join(f"{status}: {count}" for status, count in sorted(rows))
+        print(f"\n📒 Journal du lot #{self.run_id} : {counts or 'vide'}")
+        if exhausted:
+            print(f"   ⚠️ {exhausted} URL(s) abandonnée(s) après {self.max_attempts} tentative(s)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def run_with_retries(journal: RunJournal, urls: List[str], run_batch: Callable[[List[str]], List[Any]]) -> List[Any]:
+    """Traite les URLs non encore sauvegardées du lot, puis réessaie celles en échec.
+
+    `run_batch` reçoit une liste d'URLs et retourne les sorties du pipeline ;
+    chaque passage consomme une tentative par URL, la file de reprise s'arrête
+    donc d'elle-même au bout de `max_attempts` passages.
+    """
+    if journal.run_id is None:
+        journal.open_run()
+    journal.add(urls)
+
+    outputs: List[Any] = []
+    todo = journal.todo(urls)
+    if len(todo) < len(urls):
+        print(f"⏭️ {len(urls) - len(todo)} URL(s) déjà traitée(s) ou abandonnée(s) dans ce lot")
+
+    for attempt in range(journal.max_attempts):
+        if not todo:
+            break
+        if attempt:
+            print(f"\n🔁 File de reprise : {len(todo)} URL(s) en échec, passage {attempt + 1}/{journal.max_attempts}")
+        outputs.extend(run_batch(todo))
+        todo = journal.todo(urls)
+    return outputs
@@ -0,0 +1,138 @@
+"""Cache persistant des réponses Gemini, adressé par le contenu du prompt.
+
+La clé est un hash SHA-256 du nom du modèle, du prompt et des paramètres de
+génération : relancer un script sur des URLs déjà traitées renvoie la réponse
+stockée sans appel à l'API. Les entrées trop anciennes sont supprimées, et
+les moins récemment utilisées quand le cache dépasse sa taille maximale.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from scrapx.config import env_float, env_str
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'llm_cache.sqlite3')
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_MB = 500
+
+# Fréquence (en écritures) du contrôle de taille
+EVICT_EVERY = 50
+
+
+def cache_key(model_name: str, prompt: str, params: Optional[dict] = None) -> str:
+    payload = json.dumps([model_name, prompt, params or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """Réponse servie depuis le cache ; expose `.text` comme une réponse Gemini."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class LLMCache:
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 max_mb: float = DEFAULT_MAX_MB):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._db.commit()
+        self.evict()
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMCache']:
+        """Cache configuré par SCRAPX_LLM_CACHE (chemin, ou `off`), ..._MAX_AGE_DAYS et ..._MAX_MB."""
+        path = env_str('SCRAPX_LLM_CACHE', DEFAULT_CACHE_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(path,
+                   max_age_days=env_float('SCRAPX_LLM_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS),
+                   max_mb=env_float('SCRAPX_LLM_CACHE_MAX_MB', DEFAULT_MAX_MB))
+
+    def get(self, model_name: str, prompt: str, params: Optional[dict] = None) -> Optional[str]:
+        key = cache_key(model_name, prompt, params)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model_name: str, prompt: str, text: str, params: Optional[dict] = None):
+        key = cache_key(model_name, prompt, params)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, text, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, text, len(text.encode('utf-8')), now, now))
+            self._db.commit()
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def invalidate(self, model_name: str, prompt: str, params: Optional[dict] = None):
+        """Oublie une réponse (par exemple inexploitable) pour qu'un nouvel essai rappelle l'API."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (cache_key(model_name, prompt, params),))
+            self._db.commit()
+
+    def evict(self):
+        """Supprime les entrées expirées, puis les moins récemment lues au-delà de la taille maximale."""
+        with self._lock:
+            if self.max_age:
+                self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if self.max_bytes and total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                doomed = []
+                for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self._db.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,215 @@
+"""Routage des requêtes entre plusieurs modèles Gemini.
+
+Le `ModelRouter` s'utilise comme un modèle (`generate_content`) derrière le
+`GeminiDispatcher`. Pour chaque modèle configuré (GEMINI_MODELS), il suit une
+moyenne glissante de la latence et du taux d'erreur, et envoie chaque requête
+au modèle en bonne santé dont le temps de réponse attendu est le plus court.
+Un modèle qui répond 429/503 est mis de côté quelques secondes et la requête
+repart aussitôt vers le suivant ; l'erreur ne remonte au répartiteur (et à son
+backoff) que si tous les modèles la renvoient.
+
+Le nom exposé (`model_name`) reste celui du premier modèle configuré : les
+clés du cache des réponses ne dépendent pas du modèle qui a répondu.
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from scrapx.config import env_str
+from scrapx.gemini import RETRYABLE_STATUS, error_status
+
+DEFAULT_MODELS = 'gemini-2.0-flash'
+# Poids d'une nouvelle mesure dans les moyennes glissantes
+SMOOTHING = 0.2
+# Mise à l'écart après une erreur de quota (doublée à chaque récidive)
+DEFAULT_COOLDOWN = 30.0
+MAX_COOLDOWN = 300.0
+# Part des requêtes envoyées à un autre modèle que le meilleur, pour garder des mesures à jour
+EXPLORATION = 0.05
+
+# Prix indicatifs (USD par million de tokens, entrée / sortie) pour le bilan de coût
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-2.0-flash-lite': (0.075, 0.30),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-flash-8b': (0.0375, 0.15),
+    'gemini-1.5-pro': (1.25, 5.00),
+}
+
+
+def model_name_of(model) -> str:
+    """Nom court du modèle (sans `models/`), pour le bilan et les prix."""
+    return getattr(model, 'model_name', type(model).__name__).split('/')[-1]
+
+
+class ModelStats:
+    """Mesures d'un modèle : moyennes glissantes, mise à l'écart et cumuls de la session."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency: Optional[float] = None   # secondes par requête réussie
+        self.error_rate = 0.0
+        self.cooldown = 0.0
+        self.available_at = 0.0
+
+        self.calls = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.busy = 0.0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.available_at
+
+    @property
+    def expected_time(self) -> float:
+        """Temps de réponse attendu, en comptant les essais perdus sur erreur."""
+        return (self.latency or 0.0) / max(0.05, 1.0 - self.error_rate)
+
+    @property
+    def cost(self) -> Optional[float]:
+        prices = MODEL_PRICES.get(self.name)
+        if not prices:
+            return None
+        return (self.prompt_tokens * prices[0] + self.output_tokens * prices[1]) / 1_000_000
+
+    def record_success(self, elapsed: float, response):
+        self.calls += 1
+        self.busy += elapsed
+        self.latency = elapsed if self.latency is None else (1 - SMOOTHING) * self.latency + SMOOTHING * elapsed
+        self.error_rate *= 1 - SMOOTHING
+        self.cooldown = 0.0
+        usage = getattr(response, 'usage_metadata', None)
+        self.prompt_tokens += getattr(usage, 'prompt_token_count', 0) or 0
+        self.output_tokens += getattr(usage, 'candidates_token_count', 0) or 0
+
+    def record_error(self, elapsed: float, cooldown: float = 0.0):
+        """Erreur de l'API ; avec `cooldown`, le modèle est mis à l'écart (plus longtemps s'il récidive)."""
+        self.errors += 1
+        self.busy += elapsed
+        self.error_rate = (1 - SMOOTHING) * self.error_rate + SMOOTHING
+        if cooldown:
+            self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2 or cooldown)
+            self.available_at = time.monotonic() + self.cooldown
+
+
+class _StreamedResponse:
+    """Réponse en streaming dont la latence et les erreurs sont mesurées à la fin de l'itération."""
+
+    def __init__(self, response, router: 'ModelRouter', stats: ModelStats, start: float):
+        self._response = response
+        self._router = router
+        self._stats = stats
+        self._start = start
+
+    def __iter__(self):
+        try:
+            yield from self._response
+        except Exception as e:
+            self._router._record_error(self._stats, self._start, e)
+            raise
+        self._router._record_success(self._stats, self._start, self._response)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class ModelRouter:
+
+    def __init__(self, models: List, cooldown: float = DEFAULT_COOLDOWN, exploration: float = EXPLORATION):
+        if not models:
+            raise ValueError("Aucun modèle Gemini à router")
+        self.models = list(models)
+        self.stats = [ModelStats(model_name_of(model)) for model in self.models]
+        self.exploration = exploration
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, factory: Callable[[str], object]) -> 'ModelRouter':
+        """Routeur sur les modèles de GEMINI_MODELS (séparés par des virgules), créés par `factory(nom)`."""
+        models = []
+        for model_name in env_str('GEMINI_MODELS', DEFAULT_MODELS).split(','):
+            model_name = model_name.strip()
+            if not model_name:
+                continue
+            try:
+                models.append(factory(model_name))
+                print(f"✅ Modèle Gemini initialisé: {model_name}")
+            except Exception as e:
+                print(f"❌ Échec du modèle {model_name}: {e}")
+        if not models:
+            raise Exception("Aucun modèle Gemini disponible")
+        return cls(models)
+
+    @property
+    def model_name(self) -> str:
+        # Nom complet (`models/gemini-2.0-flash`), comme avant le routeur : il entre dans les clés du cache
+        return getattr(self.models[0], 'model_name', type(self.models[0]).__name__)
+
+    def _choose(self, excluded: set) -> int:
+        """Index du modèle à essayer : le plus rapide en bonne santé, sinon le premier à redevenir disponible."""
+        with self._lock:
+            candidates = [i for i in range(len(self.models)) if i not in excluded]
+            healthy = [i for i in candidates if self.stats[i].healthy]
+            if not healthy:
+                return min(candidates, key=lambda i: self.stats[i].available_at)
+            # Un modèle jamais mesuré n'est essayé qu'en exploration, ou s'il est le seul
+            measured = [i for i in healthy if self.stats[i].latency is not None] or healthy[:1]
+            if len(healthy) > 1 and random.random() < self.exploration:
+                return random.choice(healthy)
+            return min(measured, key=lambda i: self.stats[i].expected_time)
+
+    def _record_success(self, stats: ModelStats, start: float, response):
+        with self._lock:
+            stats.record_success(time.perf_counter() - start, response)
+
+    def _record_error(self, stats: ModelStats, start: float, error: Exception) -> bool:
+        """Enregistre l'erreur ; retourne True si c'est une erreur de quota (essayer un autre modèle)."""
+        quota = error_status(error) in RETRYABLE_STATUS
+        with self._lock:
+            stats.record_error(time.perf_counter() - start, self.cooldown if quota else 0.0)
+        return quota
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        """Même interface que `GenerativeModel.generate_content`, sur le meilleur modèle disponible."""
+        tried = set()
+        while True:
+            index = self._choose(tried)
+            tried.add(index)
+            stats = self.stats[index]
+            start = time.perf_counter()
+            try:
+                if stream:
+                    response = self.models[index].generate_content(prompt, stream=True, **kwargs)
+                else:
+                    response = self.models[index].generate_content(prompt, **kwargs)
+            except Exception as e:
+                if not self._record_error(stats, start, e) or len(tried) == len(self.models):
+                    raise
+                with self._lock:
+                    stats.fallbacks += 1
+                print(f"🔀 {stats.name} a répondu {error_status(e)}, bascule vers un autre modèle")
+                continue
+            if stream:
+                return _StreamedResponse(response, self, stats, start)
+            self._record_success(stats, start, response)
+            return response
+
+    def report(self):
+        """Affiche, pour chaque modèle, le volume traité, la latence, le débit et le coût estimé."""
+        print(f"\n🔀 Modèles Gemini ({len(self.models)}):")
+        total_cost = 0.0
+        for stats in self.stats:
+            tokens = stats.prompt_tokens + stats.output_tokens
+            throughput = stats.output_tokens / stats.busy if stats.busy else 0.0
+            latency = f"{stats.latency:.2f}s" if stats.latency is not None else "-"
+            cost = stats.cost
+            total_cost += cost or 0.0
+            print(f"   - {stats.name:<22} {stats.calls} requête(s) | {stats.errors} erreur(s), "
+                  f"{stats.fallbacks} bascule(s) | latence {latency} | {throughput:.0f} tokens/s | "
+                  f"~{tokens} tokens" + (f" | ~{cost:.4f} $" if cost is not None else ""))
+        print(f"   Coût estimé : ~{total_cost:.4f} $")
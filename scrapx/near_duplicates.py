@@ -0,0 +1,284 @@
+"""Détection des quasi-doublons de contenu avant tout appel Gemini.
+
+Une même dépêche reprise par plusieurs sites ne doit être réécrite qu'une
+fois. Le texte extrait est découpé en séquences de mots (shingles) et résumé
+par une signature MinHash ; la proportion de valeurs égales entre deux
+signatures estime la similarité de Jaccard des deux textes. Un index LSH
+(signatures découpées en bandes) retrouve les candidats sans comparer le
+texte à tout ce qui a déjà été traité ; seuls ces candidats sont comparés.
+
+Les signatures des articles sauvegardés sont conservées dans SQLite et
+rechargées à l'ouverture, ce qui permet de reconnaître un quasi-doublon
+d'un article traité lors d'un passage précédent.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from scrapx.config import env_float, env_str
+from scrapx.urls import canonicalize_url
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'near_duplicates.sqlite3')
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+# Format des signatures : les signatures d'un autre format ne sont pas comparables
+SIGNATURE_VERSION = 2
+_MASK = (1 << 64) - 1
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_rng = random.Random(0x5C2A9)
+# Cases consultées, dans l'ordre, pour remplir une case vide (tirage fixe : les signatures
+# enregistrées restent comparables d'un passage à l'autre)
+_PROBES = [[_rng.randrange(NUM_PERM) for _ in range(NUM_PERM)] for _ in range(NUM_PERM)]
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Séquences de `size` mots consécutifs du texte, en minuscules."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> bytes:
+    """Signature MinHash du texte (NUM_PERM entiers de 64 bits), un seul hachage par shingle.
+
+    Hachage à permutation unique (one permutation hashing) : les bits de poids
+    faible du hachage choisissent une case parmi NUM_PERM, le reste est la valeur
+    dont on garde le minimum par case. Une case vide reprend la valeur de la
+    première case remplie dans sa suite `_PROBES` (densification), ce qui garde
+    la précision de NUM_PERM permutations indépendantes pour un coût linéaire en
+    nombre de shingles. Définie au niveau du module pour pouvoir tourner dans le
+    `ParsePool`.
+    """
+    signature = [_MASK] * NUM_PERM
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        slot, value = h & (NUM_PERM - 1), h >> _BIN_BITS
+        if value < signature[slot]:
+            signature[slot] = value
+    filled = [value for value in signature if value != _MASK]
+    if filled and len(filled) < NUM_PERM:
+        signature = [value if value != _MASK else
+                     next((signature[probe] for probe in _PROBES[slot] if signature[probe] != _MASK), filled[0])
+                     for slot, value in enumerate(signature)]
+    return array('Q', signature).tobytes()
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Similarité de Jaccard estimée à partir de deux signatures."""
+    a, b = array('Q', first), array('Q', second)
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def lsh_rows(threshold: float, num_perm: int = NUM_PERM) -> int:
+    """Lignes par bande : le découpage le plus sélectif qui retrouve encore
+    99 % des paires de similarité `threshold` comme candidates."""
+    best = 1
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= 0.99:
+            best = rows
+    return best
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, scope: str, path: str = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD):
+        self.scope = scope
+        self.path = path
+        self.threshold = threshold
+        self.rows = lsh_rows(threshold)
+        self.skipped = 0
+        self.comparisons = 0
+        self._lock = threading.Lock()
+
+        # Clé canonique -> (URL, signature, fichier produit) ; fichier None tant que l'article n'est pas sauvegardé
+        self._documents: Dict[str, Tuple[str, bytes, Optional[str]]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        # Clé canonique d'une réservation -> fonctions à appeler quand elle est confirmée ou annulée
+        self._waiters: Dict[str, List[Callable[[Optional[str]], None]]] = defaultdict(list)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                output_path TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (scope, key)
+            )
+        """)
+        # Signatures d'un format précédent : incomparables, elles sont oubliées
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SIGNATURE_VERSION:
+            with self._db:
+                dropped = self._db.execute("DELETE FROM documents").rowcount
+                self._db.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+            if dropped:
+                print(f"⚠️ Quasi-doublons : {dropped} signature(s) d'un ancien format oubliée(s)")
+        self._db.commit()
+
+        for key, url, signature, output_path in self._db.execute(
+                "SELECT key, url, signature, output_path FROM documents WHERE scope = ?", (scope,)):
+            self._insert(key, url, signature, output_path)
+
+    @classmethod
+    def from_env(cls, scope: str) -> Optional['NearDuplicateIndex']:
+        """Index configuré par SCRAPX_NEAR_DUPLICATES (chemin, ou `off`) et SCRAPX_NEAR_DUPLICATE_THRESHOLD."""
+        path = env_str('SCRAPX_NEAR_DUPLICATES', DEFAULT_INDEX_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        threshold = env_float('SCRAPX_NEAR_DUPLICATE_THRESHOLD', DEFAULT_THRESHOLD)
+        if not 0 < threshold <= 1:
+            print(f"⚠️ Seuil de similarité invalide ({threshold}), utilisation de {DEFAULT_THRESHOLD}")
+            threshold = DEFAULT_THRESHOLD
+        return cls(scope, path, threshold)
+
+    def _bands(self, signature: bytes) -> List[Tuple[int, bytes]]:
+        width = self.rows * 8
+        return [(band, signature[band * width:(band + 1) * width]) for band in range(NUM_PERM // self.rows)]
+
+    def _insert(self, key: str, url: str, signature: bytes, output_path: Optional[str]):
+        self._remove(key)
+        self._documents[key] = (url, signature, output_path)
+        for band in self._bands(signature):
+            self._buckets[band].add(key)
+
+    def _remove(self, key: str):
+        previous = self._documents.pop(key, None)
+        if previous is None:
+            return
+        for band in self._bands(previous[1]):
+            self._buckets[band].discard(key)
+            if not self._buckets[band]:
+                del self._buckets[band]
+
+    def claim(self, url: str, signature: bytes) -> Optional[Tuple[str, Optional[str], float]]:
+        """Cherche un quasi-doublon de `url` ; sinon réserve sa place dans l'index.
+
+        Retourne `(URL d'origine, fichier produit ou None, similarité)` si un
+        contenu au moins aussi similaire que le seuil a déjà été traité (ou est en
+        cours de traitement dans ce lot), None si le contenu est nouveau. La
+        réservation rend visibles aux pages suivantes du lot les articles pas
+        encore sauvegardés ; elle est confirmée par `record` ou annulée par `release`.
+        Un original encore sans fichier peut échouer : le doublon doit attendre
+        son issue (`on_resolved`) avant d'être considéré comme traité.
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            candidates = set()
+            for band in self._bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+            candidates.discard(key)
+
+            best = None
+            for candidate in candidates:
+                self.comparisons += 1
+                original_url, original_signature, output_path = self._documents[candidate]
+                score = similarity(signature, original_signature)
+                if score >= self.threshold and (best is None or score > best[2]):
+                    best = (original_url, output_path, score)
+            if best:
+                if best[1] is not None:
+                    self.skipped += 1
+                return best
+
+            self._insert(key, url, signature, None)
+            return None
+
+    async def find_saved(self, url: str, signature: bytes) -> Optional[Tuple[str, str, float]]:
+        """Article sauvegardé dont `url` est un quasi-doublon `(URL d'origine, fichier, similarité)`, sinon None.
+
+        Comme `claim`, mais sans jamais rendre d'original encore sans fichier :
+        on attend son issue. S'il échoue, la recherche est refaite, et `url`
+        devient l'original (réservé, None) s'il n'en reste aucun.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            duplicate = self.claim(url, signature)
+            if duplicate is None or duplicate[1] is not None:
+                return duplicate
+            original_url, _, score = duplicate
+            print(f"⏳ Quasi-doublon de {original_url} (similarité {score:.0%}), en attente de son résultat: {url}")
+            resolved = loop.create_future()
+            self.on_resolved(original_url, lambda path: loop.call_soon_threadsafe(resolved.set_result, path))
+            output_path = await resolved
+            if output_path is not None:
+                return original_url, output_path, score
+            print(f"🔁 Original {original_url} en échec, reprise de {url}")
+
+    def on_resolved(self, url: str, callback: Callable[[Optional[str]], None]):
+        """Appelle `callback(fichier)` quand la réservation de `url` est confirmée, `callback(None)` si elle est annulée.
+
+        L'appel est immédiat si c'est déjà fait ; sinon il a lieu dans le thread
+        qui appelle `record` ou `release`.
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None and document[2] is None:
+                self._waiters[key].append(callback)
+                return
+        callback(document[2] if document else None)
+
+    def record(self, url: str, output_path: str):
+        """Confirme la réservation de `url` une fois son article sauvegardé."""
+        key = canonicalize_url(url)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                return
+            self._insert(key, document[0], document[1], output_path)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO documents (scope, key, url, signature, output_path, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.scope, key, document[0], document[1], output_path, time.time()))
+            waiters = self._waiters.pop(key, [])
+            self.skipped += len(waiters)
+        for callback in waiters:
+            callback(output_path)
+
+    def release(self, url: str):
+        """Annule la réservation de `url` (génération ou sauvegarde en échec)."""
+        key = canonicalize_url(url)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None or document[2] is not None:
+                return
+            self._remove(key)
+            # Un article régénéré garde la signature de sa version précédente
+            row = self._db.execute("SELECT url, signature, output_path FROM documents WHERE scope = ? AND key = ?",
+                                   (self.scope, key)).fetchone()
+            if row:
+                self._insert(key, *row)
+            waiters = self._waiters.pop(key, [])
+        # Les doublons en attente repartent de zéro : ils peuvent devenir l'original
+        for callback in waiters:
+            callback(None)
+
+    def report(self):
+        print(f"\n🧬 Quasi-doublons : {self.skipped} contenu(s) ignoré(s) (seuil {self.threshold:.0%}), "
+              f"{len(self._documents)} article(s) indexé(s), {self.comparisons} comparaison(s)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,75 @@
+"""Parsing HTML sur un pool de processus, pour occuper tous les cœurs.
+
+La construction de l'arbre et `get_text` sont limités par le CPU et, dans des
+threads, se partagent un seul cœur à cause du GIL. Le pool envoie à chaque
+processus les octets bruts de la page et ne récupère que l'enregistrement
+extrait (titre, texte, image, liens) : l'arbre BeautifulSoup reste dans le
+processus qui l'a construit et n'est jamais sérialisé.
+
+Les fonctions exécutées doivent être définies au niveau d'un module (voir
+`scrapx.extraction`). Avec un seul cœur, ou SCRAPX_PARSE_PROCESSES=0, le
+parsing se fait dans des threads du processus principal.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from scrapx.config import env_int
+
+# Workers de l'étage de parsing quand il tourne dans des threads
+THREAD_WORKERS = 2
+
+
+def default_processes() -> int:
+    """Nombre de cœurs utilisables par ce processus."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class ParsePool:
+
+    def __init__(self, processes: Optional[int] = None):
+        self.processes = default_processes() if processes is None else max(0, processes)
+        self._executor: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> 'ParsePool':
+        """Pool dimensionné par SCRAPX_PARSE_PROCESSES (défaut : nombre de cœurs, 0 = threads)."""
+        return cls(env_int('SCRAPX_PARSE_PROCESSES', default_processes()))
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.processes > 1
+
+    @property
+    def workers(self) -> int:
+        """Parsings à lancer en parallèle pour occuper le pool."""
+        return self.processes if self.uses_processes else THREAD_WORKERS
+
+    @property
+    def executor(self) -> Executor:
+        # Créé à la première utilisation : un lot entièrement inchangé ne lance aucun processus
+        if self._executor is None:
+            if self.uses_processes:
+                # `spawn` : pas de fork d'un processus qui a déjà des threads et des connexions ouvertes
+                self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix='parse')
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Exécute `func(*args)` dans le pool sans bloquer la boucle asyncio."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def call(self, func: Callable[..., Any], *args) -> Any:
+        """Version synchrone de `run`."""
+        return self.executor.submit(func, *args).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
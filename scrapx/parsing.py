@@ -0,0 +1,60 @@
+"""Choix du parseur HTML utilisé pour construire les arbres BeautifulSoup.
+
+`lxml` (extension C) construit l'arbre plusieurs fois plus vite que le parseur
+`html.parser` de la bibliothèque standard. Les sélecteurs CSS restant ceux de
+BeautifulSoup, le code d'extraction ne dépend pas du parseur choisi. Par
+défaut (`auto`), `lxml` est utilisé s'il est installé ; SCRAPX_HTML_PARSER
+permet d'imposer un parseur.
+
+Des parseurs comme selectolax construisent l'arbre bien plus vite encore, mais
+pas un arbre BeautifulSoup : toute l'extraction (sélecteurs soupsieve,
+`SelectorPlan`, densité de texte) serait à écrire une seconde fois. Seuls les
+parseurs que BeautifulSoup sait piloter sont donc proposés ici.
+"""
+from typing import List, Optional, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from scrapx.config import env_str
+
+AUTO = 'auto'
+# Par ordre de préférence
+PARSERS = ('lxml', 'html.parser')
+FALLBACK_PARSER = 'html.parser'
+
+_available: Optional[List[str]] = None
+
+
+def available_parsers() -> List[str]:
+    """Parseurs de PARSERS réellement utilisables dans cet environnement."""
+    global _available
+    if _available is None:
+        _available = []
+        for name in PARSERS:
+            try:
+                BeautifulSoup('<p></p>', name)
+            except FeatureNotFound:
+                continue
+            _available.append(name)
+    return _available
+
+
+def resolve_parser(name: Optional[str] = AUTO) -> str:
+    """Nom du parseur à utiliser pour `name` (`auto`, `lxml` ou `html.parser`)."""
+    name = (name or AUTO).strip().lower()
+    available = available_parsers()
+    if name == AUTO:
+        return available[0] if available else FALLBACK_PARSER
+    if name in available:
+        return name
+    print(f"⚠️ Parseur HTML {name!r} indisponible, utilisation de {FALLBACK_PARSER!r}")
+    return FALLBACK_PARSER
+
+
+def parser_from_env() -> str:
+    """Parseur configuré par SCRAPX_HTML_PARSER (`auto` par défaut)."""
+    return resolve_parser(env_str('SCRAPX_HTML_PARSER', AUTO))
+
+
+def make_soup(html: Union[bytes, str], parser: str = FALLBACK_PARSER) -> BeautifulSoup:
+    return BeautifulSoup(html, parser)
@@ -0,0 +1,188 @@
+"""Pipeline en étages (téléchargement → parsing → génération → écriture).
+
+Chaque étage a son propre nombre de workers et lit une file bornée remplie
+par l'étage précédent : le téléchargement de l'URL N+1 n'attend plus l'appel
+Gemini de l'URL N, et une file pleine freine naturellement l'étage amont
+(backpressure). Le temps passé par chaque étage est mesuré pour savoir où se
+trouve le goulot d'étranglement.
+
+Un étage peut aussi traiter ses éléments par lots (`batch_size` > 1) : chaque
+worker regroupe les éléments disponibles, en attendant au plus `batch_wait`
+secondes que le lot se remplisse, et `func` reçoit alors une liste.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from scrapx.config import env_int
+
+DEFAULT_QUEUE_SIZE = 16
+# Attente maximale (s) pour compléter un lot avant de le traiter incomplet
+DEFAULT_BATCH_WAIT = 1.0
+
+# Sentinelle de fin de flux entre deux étages
+_DONE = object()
+
+
+class Stage:
+    """Un étage du pipeline : `func(item)` retourne l'élément suivant, ou None pour l'abandonner.
+
+    Avec `batch_size` > 1, `func(items)` reçoit une liste et retourne la liste
+    des éléments suivants (les None sont abandonnés).
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                 executor: Optional[Executor] = None, batch_size: int = 1,
+                 batch_wait: float = DEFAULT_BATCH_WAIT):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.is_async = asyncio.iscoroutinefunction(func)
+        self.executor = executor
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait = batch_wait
+
+        # Statistiques
+        self.busy = 0.0      # temps cumulé passé dans func
+        self.blocked = 0.0   # temps cumulé à attendre une place dans la file suivante
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.batches = 0
+
+    async def call(self, item):
+        if self.is_async:
+            return await self.func(item)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.func, item)
+
+
+def workers_from_env(stage: str, default: int) -> int:
+    """Nombre de workers d'un étage, surchargeable par SCRAPX_<ÉTAGE>_WORKERS."""
+    return max(1, env_int(f"SCRAPX_{stage.upper()}_WORKERS", default))
+
+
+class Pipeline:
+
+    def __init__(self, stages: List[Stage], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.elapsed = 0.0
+
+    async def _next_batch(self, stage: Stage, inbox: asyncio.Queue) -> Tuple[List[Any], bool]:
+        """Prochain lot d'éléments de `inbox` ; le booléen indique que le flux est terminé."""
+        item = await inbox.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        deadline = time.perf_counter() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            try:
+                if inbox.empty():
+                    item = await asyncio.wait_for(inbox.get(), max(0.0, deadline - time.perf_counter()))
+                else:
+                    item = inbox.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue],
+                      results: list):
+        done = False
+        while not done:
+            if stage.batch_size > 1:
+                batch, done = await self._next_batch(stage, inbox)
+                if not batch:
+                    return
+            else:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                batch = [item]
+
+            start = time.perf_counter()
+            try:
+                if stage.batch_size > 1:
+                    outputs = list(await stage.call(batch) or [])
+                    stage.batches += 1
+                else:
+                    outputs = [await stage.call(batch[0])]
+            except Exception as e:
+                print(f"❌ Erreur dans l'étage {stage.name}: {e}")
+                stage.errors += 1
+                outputs = []
+            finally:
+                stage.busy += time.perf_counter() - start
+            stage.processed += len(batch)
+
+            outputs = [output for output in outputs if output is not None]
+            stage.dropped += len(batch) - len(outputs)
+            for output in outputs:
+                if outbox is None:
+                    results.append(output)
+                else:
+                    start = time.perf_counter()
+                    await outbox.put(output)
+                    stage.blocked += time.perf_counter() - start
+
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue],
+                         results: list):
+        # Un executor de threads dédié par étage synchrone, dimensionné sur ses workers
+        own_executor = None
+        if not stage.is_async and stage.executor is None:
+            own_executor = stage.executor = ThreadPoolExecutor(max_workers=stage.workers,
+                                                               thread_name_prefix=stage.name)
+        try:
+            await asyncio.gather(*(self._worker(stage, inbox, outbox, results)
+                                   for _ in range(stage.workers)))
+        finally:
+            if own_executor:
+                own_executor.shutdown(wait=False)
+                stage.executor = None
+
+        # Étage terminé : on prévient chaque worker de l'étage suivant
+        if outbox is not None:
+            next_stage = self.stages[self.stages.index(stage) + 1]
+            for _ in range(next_stage.workers):
+                await outbox.put(_DONE)
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """Fait passer `items` dans tous les étages ; retourne les sorties du dernier étage."""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+
+        async def feed():
+            for item in items:
+                await queues[0].put(item)
+            for _ in range(self.stages[0].workers):
+                await queues[0].put(_DONE)
+
+        start = time.perf_counter()
+        tasks = [feed()]
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            tasks.append(self._run_stage(stage, queues[index], outbox, results))
+        await asyncio.gather(*tasks)
+        self.elapsed = time.perf_counter() - start
+        return results
+
+    def report(self):
+        """Affiche l'utilisation de chaque étage et le goulot d'étranglement probable."""
+        if not self.elapsed:
+            return
+        print(f"\n📈 Utilisation des étages ({self.elapsed:.1f}s):")
+        utilizations = {}
+        for stage in self.stages:
+            capacity = stage.workers * self.elapsed
+            utilization = stage.busy / capacity if capacity else 0.0
+            blocked = stage.blocked / capacity if capacity else 0.0
+            utilizations[stage.name] = utilization
+            print(f"   - {stage.name:<10} {stage.workers:>3} worker(s) | occupé {utilization:6.1%} | "
+                  f"bloqué {blocked:6.1%} | traités {stage.processed} | abandonnés {stage.dropped} | "
+                  f"erreurs {stage.errors}" + (f" | lots {stage.batches}" if stage.batch_size > 1 else ""))
+        bottleneck = max(utilizations, key=utilizations.get)
+        print(f"   🐢 Goulot d'étranglement probable : {bottleneck}")
@@ -0,0 +1,108 @@
+"""Politesse de crawl par domaine : délais par hôte et `Crawl-delay` de robots.txt.
+
+Au lieu d'une pause fixe après chaque URL, chaque requête réserve un créneau
+sur son hôte : deux requêtes vers le même site sont espacées du délai de ce
+site, tandis que des requêtes vers des sites différents partent sans attendre.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+DEFAULT_CRAWL_DELAY = 1.0
+MAX_CRAWL_DELAY = 60.0
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """Réordonne les URLs en tourniquet par hôte (a1, b1, c1, a2, b2, ...)."""
+    by_host: "OrderedDict[str, List[str]]" = OrderedDict()
+    for url in urls:
+        by_host.setdefault(host_of(url), []).append(url)
+
+    queues = [list(reversed(host_urls)) for host_urls in by_host.values()]
+    interleaved = []
+    while queues:
+        for queue in queues:
+            interleaved.append(queue.pop())
+        queues = [queue for queue in queues if queue]
+    return interleaved
+
+
+class PolitenessScheduler:
+
+    def __init__(self, session: requests.Session, default_delay: float = DEFAULT_CRAWL_DELAY,
+                 respect_robots: bool = True, timeout: float = 5):
+        self.session = session
+        self.default_delay = max(0.0, default_delay)
+        self.respect_robots = respect_robots
+        self.timeout = timeout
+
+        self._delays: Dict[str, float] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
+
+    def _robots_delay(self, url: str) -> Optional[float]:
+        """Lit le `Crawl-delay` du robots.txt de l'hôte (None si absent ou illisible)."""
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            response = self.session.get(robots_url, timeout=self.timeout)
+            if response.status_code != 200:
+                return None
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay(self.session.headers.get('User-Agent', '*'))
+            return float(delay) if delay is not None else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def crawl_delay(self, url: str) -> float:
+        """Délai entre deux requêtes vers l'hôte de `url` (robots.txt en priorité)."""
+        host = host_of(url)
+        if host in self._delays:
+            return self._delays[host]
+
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+
+        # Un seul thread lit le robots.txt d'un hôte donné
+        with host_lock:
+            if host not in self._delays:
+                delay = self._robots_delay(url) if self.respect_robots else None
+                if delay is None:
+                    delay = self.default_delay
+                else:
+                    print(f"🤖 Crawl-delay de {delay:g}s respecté pour {host}")
+                self._delays[host] = min(max(delay, 0.0), MAX_CRAWL_DELAY)
+        return self._delays[host]
+
+    def try_reserve(self, url: str) -> float:
+        """Réserve l'hôte de `url` s'il est libre (retourne 0), sinon retourne l'attente restante (s)."""
+        delay = self.crawl_delay(url)
+        host = host_of(url)
+        with self._lock:
+            now = time.monotonic()
+            slot = self._next_slot.get(host, now)
+            if slot > now:
+                return slot - now
+            self._next_slot[host] = now + delay
+        return 0.0
+
+    def reserve(self, url: str) -> float:
+        """Réserve le prochain créneau sur l'hôte de `url` et retourne l'attente (s) avant la requête."""
+        delay = self.crawl_delay(url)
+        host = host_of(url)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + delay
+        return slot - now
@@ -0,0 +1,72 @@
+"""Conservation facultative des pages brutes, pour le débogage de l'extraction.
+
+Les enregistrements d'articles ne gardent que le texte extrait : garder en
+mémoire le HTML de chaque page d'un lot doublerait l'empreinte pour rien. Si
+SCRAPX_RAW_HTML désigne un dossier, les octets téléchargés y sont écrits
+compressés (gzip), un fichier `<empreinte de l'URL>.html.gz` par page, qu'on
+relit avec `zcat` ou `RawHtmlStore.load`.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from scrapx.config import env_str
+
+DEFAULT_STORE_PATH = os.path.join('.cache', 'raw_html')
+
+
+class RawHtmlStore:
+
+    def __init__(self, directory: str = DEFAULT_STORE_PATH, compresslevel: int = 6):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.saved = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional['RawHtmlStore']:
+        """Stockage configuré par SCRAPX_RAW_HTML (dossier, ou `off` par défaut pour ne rien garder)."""
+        path = env_str('SCRAPX_RAW_HTML', 'off')
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(path)
+
+    def path_for(self, url: str) -> str:
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.html.gz")
+
+    def save(self, url: str, html: bytes) -> str:
+        """Écrit la page compressée (fichier temporaire puis renommage) ; retourne son chemin."""
+        compressed = gzip.compress(html, compresslevel=self.compresslevel)
+        path = self.path_for(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self.saved += 1
+            self.bytes_raw += len(html)
+            self.bytes_stored += len(compressed)
+        return path
+
+    def load(self, url: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self.path_for(url), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def report(self):
+        if self.saved:
+            print(f"🗄️ Pages brutes conservées : {self.saved} dans {self.directory} "
+                  f"({self.bytes_raw / 1024:.0f} Ko compressés en {self.bytes_stored / 1024:.0f} Ko)")
@@ -0,0 +1,161 @@
+"""Ensemble persistant des URLs déjà traitées, compact en mémoire.
+
+Chaque URL est réduite à une empreinte de 16 octets de sa forme canonique
+(voir `scrapx.urls`). Les empreintes sont stockées dans une table SQLite et,
+en mémoire, dans un filtre de Bloom : une URL nouvelle (le cas le plus
+fréquent) est reconnue sans accès disque, une réponse positive du filtre est
+confirmée dans la table, qui est exacte. Dix millions d'URLs tiennent dans
+un filtre d'environ 12 Mo, au lieu de plus d'un Go de chaînes Python.
+
+Le filtre est enregistré à la fermeture et relu à l'ouverture suivante ; s'il
+manque (arrêt brutal), il est reconstruit depuis la table.
+
+L'ensemble ne filtre que les articles trouvés en explorant un blog (sitemaps,
+flux, pages de liste). Les URLs données directement (articles de
+`urlblog.txt`, `urlfiche.txt`) sont traitées à chaque passage : c'est le crawl
+incrémental (`scrapx.crawl_state`) qui évite de régénérer celles qui n'ont
+pas changé, et qui régénère celles qui ont changé.
+"""
+import math
+import os
+import sqlite3
+import struct
+import threading
+from typing import Iterable, List, Optional
+
+from scrapx.config import env_float, env_int, env_str
+from scrapx.urls import url_digest
+
+DEFAULT_SEEN_PATH = os.path.join('.cache', 'seen_urls.sqlite3')
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_ERROR_RATE = 0.01
+
+_HEADER = struct.Struct('<QIQ')  # bits, nombre de hachages, éléments
+
+
+class BloomFilter:
+    """Filtre de Bloom sur des empreintes d'au moins 16 octets (double hachage)."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes):
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    def save(self, path: str):
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(_HEADER.pack(self.size, self.hashes, self.count))
+            f.write(self.bits)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str, capacity: int, error_rate: float) -> Optional['BloomFilter']:
+        """Relit un filtre enregistré ; None s'il est absent ou dimensionné autrement."""
+        bloom = cls(capacity, error_rate)
+        try:
+            with open(path, 'rb') as f:
+                size, hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+                if (size, hashes) != (bloom.size, bloom.hashes):
+                    return None
+                bits = f.read()
+        except (OSError, struct.error):
+            return None
+        if len(bits) != len(bloom.bits):
+            return None
+        bloom.bits[:] = bits
+        bloom.count = count
+        return bloom
+
+
+class SeenUrls:
+
+    def __init__(self, path: str = DEFAULT_SEEN_PATH, capacity: int = DEFAULT_CAPACITY,
+                 error_rate: float = DEFAULT_ERROR_RATE):
+        self.path = path
+        self.bloom_path = os.path.splitext(path)[0] + '.bloom'
+        self.skipped = 0
+        self.added = 0
+        self.disk_lookups = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.commit()
+
+        self.bloom = BloomFilter.load(self.bloom_path, capacity, error_rate)
+        if self.bloom is None:
+            self.bloom = BloomFilter(capacity, error_rate)
+            for (digest,) in self._db.execute("SELECT digest FROM seen"):
+                self.bloom.add(digest)
+        # Tant que la session est ouverte, le filtre sur disque n'est plus à jour
+        if os.path.exists(self.bloom_path):
+            os.remove(self.bloom_path)
+
+    @classmethod
+    def from_env(cls) -> Optional['SeenUrls']:
+        """Ensemble configuré par SCRAPX_SEEN_URLS (chemin, ou `off`) et SCRAPX_SEEN_CAPACITY."""
+        path = env_str('SCRAPX_SEEN_URLS', DEFAULT_SEEN_PATH)
+        if path.lower() in ('off', 'false', '0', 'none'):
+            return None
+        return cls(path, capacity=env_int('SCRAPX_SEEN_CAPACITY', DEFAULT_CAPACITY),
+                   error_rate=env_float('SCRAPX_SEEN_ERROR_RATE', DEFAULT_ERROR_RATE))
+
+    def _contains(self, digest: bytes) -> bool:
+        if digest not in self.bloom:
+            return False
+        self.disk_lookups += 1
+        return self._db.execute("SELECT 1 FROM seen WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._contains(url_digest(url))
+
+    def unseen(self, urls: Iterable[str]) -> List[str]:
+        """URLs jamais vues, sans doublons (même forme canonique), dans l'ordre donné."""
+        fresh = []
+        batch = set()
+        with self._lock:
+            for url in urls:
+                digest = url_digest(url)
+                if digest in batch or self._contains(digest):
+                    self.skipped += 1
+                    continue
+                batch.add(digest)
+                fresh.append(url)
+        return fresh
+
+    def add(self, urls: Iterable[str]):
+        with self._lock, self._db:
+            for url in urls:
+                digest = url_digest(url)
+                if self._db.execute("INSERT OR IGNORE INTO seen (digest) VALUES (?)", (digest,)).rowcount:
+                    self.bloom.add(digest)
+                    self.added += 1
+
+    def report(self):
+        print(f"\n🔗 URLs déjà vues (exploration des blogs) : {self.skipped} ignorée(s), {self.added} ajoutée(s) "
+              f"({self.bloom.count} connue(s) au total, {self.disk_lookups} vérification(s) sur disque)")
+
+    def close(self):
+        with self._lock:
+            self.bloom.save(self.bloom_path)
+            self._db.close()
@@ -0,0 +1,154 @@
+"""Listes de sélecteurs CSS évaluées en un seul parcours de l'arbre.
+
+L'extraction essaie souvent une dizaine de sélecteurs par ordre de priorité
+(`soup.select_one(selector)` pour chacun jusqu'au premier trouvé) : autant de
+parcours complets de l'arbre, et chaque élément testé contre chaque sélecteur.
+Un `SelectorPlan` compile la liste une fois et range ses sélecteurs selon la
+partie la plus à droite de chacun (id, classe, attribut ou balise), comme le
+font les navigateurs : pendant l'unique parcours de l'arbre, un élément n'est
+confronté (par soupsieve, le moteur CSS de BeautifulSoup) qu'aux sélecteurs
+qui peuvent le désigner et dont les ancêtres requis (`.pagination` dans
+`.pagination a`) sont bien parmi les siens. Les résultats sont exactement ceux
+des appels `select_one` / `select` successifs.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import soupsieve
+from bs4 import Tag
+
+
+def _bucket(selector) -> Tuple[str, Optional[str]]:
+    """Clé de rangement d'un sélecteur soupsieve compilé (partie la plus à droite)."""
+    if selector.ids:
+        return 'id', selector.ids[0]
+    if selector.classes:
+        return 'class', selector.classes[0]
+    for attribute in selector.attributes:
+        # `[a!=b]` désigne aussi les éléments sans l'attribut
+        if not attribute.inverse and not attribute.prefix:
+            return 'attribute', attribute.attribute.lower()
+    if selector.tag is not None and selector.tag.name not in (None, '*') and not selector.tag.prefix:
+        return 'tag', selector.tag.name.lower()
+    return 'any', None
+
+
+def _ancestor_keys(selector) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Clés que doivent porter des ancêtres de l'élément (`.a > .b c` : `.a` et `.b`)."""
+    keys = []
+    relation = selector.relation
+    while len(relation) == 1 and relation[0].rel_type in (' ', '>'):
+        key = _bucket(relation[0])
+        if key[0] != 'any':
+            keys.append(key)
+        relation = relation[0].relation
+    return tuple(keys)
+
+
+def _element_keys(element) -> List[Tuple[str, Optional[str]]]:
+    keys = [('tag', element.name.lower())]
+    for name, value in element.attrs.items():
+        name = name.lower()
+        keys.append(('attribute', name))
+        if name == 'id' and isinstance(value, str):
+            keys.append(('id', value))
+        elif name == 'class':
+            keys.extend(('class', class_name) for class_name in (value.split() if isinstance(value, str) else value))
+    return keys
+
+
+class SelectorPlan:
+
+    def __init__(self, selectors: Sequence[str]):
+        self.selectors = list(selectors)
+        self._compiled = [soupsieve.compile(selector) for selector in self.selectors]
+        self._buckets: Dict[str, Dict[str, List[int]]] = {'id': {}, 'class': {}, 'attribute': {}, 'tag': {}}
+        self._anywhere: List[int] = []
+        # Ancêtres requis par sélecteur (aucun si la liste compilée a plusieurs alternatives)
+        self._required: List[Tuple[Tuple[str, Optional[str]], ...]] = []
+        for index, compiled in enumerate(self._compiled):
+            for selector in compiled.selectors:
+                kind, key = _bucket(selector)
+                indices = self._anywhere if kind == 'any' else self._buckets[kind].setdefault(key, [])
+                if index not in indices:
+                    indices.append(index)
+            self._required.append(_ancestor_keys(compiled.selectors[0]) if len(compiled.selectors) == 1 else ())
+        self._tracked = {key for keys in self._required for key in keys}
+
+    def _indices(self, keys, ancestors: Dict) -> List[int]:
+        """Sélecteurs susceptibles de désigner l'élément de clés `keys`, dans l'ordre de priorité."""
+        indices = set(self._anywhere)
+        for kind, key in keys:
+            indices.update(self._buckets[kind].get(key, ()))
+        return [index for index in sorted(indices)
+                if all(ancestors.get(key) for key in self._required[index])]
+
+    def _walk(self, tag) -> Iterator[Tuple[object, List[int]]]:
+        """(élément, sélecteurs à tester) pour chaque descendant de `tag`, dans l'ordre du document."""
+        # Clés suivies portées par les ancêtres de l'élément courant (`tag` et ses propres ancêtres compris)
+        ancestors: Dict[Tuple[str, Optional[str]], int] = {}
+        stack = []
+        for parent in [tag] + list(tag.parents):
+            if parent.name and parent.name != '[document]':
+                for key in _element_keys(parent):
+                    if key in self._tracked:
+                        ancestors[key] = ancestors.get(key, 0) + 1
+        for element in tag.descendants:
+            if not isinstance(element, Tag):
+                continue
+            while stack and stack[-1][0] is not element.parent:
+                for key in stack.pop()[1]:
+                    ancestors[key] -= 1
+            keys = _element_keys(element)
+            yield element, self._indices(keys, ancestors)
+            tracked = [key for key in keys if key in self._tracked]
+            for key in tracked:
+                ancestors[key] = ancestors.get(key, 0) + 1
+            stack.append((element, tracked))
+
+    def _candidates(self, tag, done: Optional[Set[int]] = None) -> Iterator[Tuple[object, List[int]]]:
+        """(élément, sélecteurs qu'il satisfait hors `done`), dans l'ordre du document."""
+        for element, indices in self._walk(tag):
+            matched = [index for index in indices
+                       if not (done and index in done) and self._compiled[index].match(element)]
+            if matched:
+                yield element, matched
+
+    def first_matches(self, tag) -> Iterator[Optional[object]]:
+        """Pour chaque sélecteur, par ordre de priorité, `tag.select_one(sélecteur)` (ou None).
+
+        Le parcours avance à la demande : si l'appelant s'arrête au premier
+        sélecteur qui lui convient, le reste de l'arbre n'est pas visité.
+        """
+        firsts: Dict[int, object] = {}
+        # Un sélecteur déjà résolu n'est plus testé sur la suite de l'arbre
+        done: Set[int] = set()
+        candidates = self._candidates(tag, done)
+        exhausted = False
+        for index in range(len(self.selectors)):
+            while index not in firsts and not exhausted:
+                try:
+                    element, matched = next(candidates)
+                except StopIteration:
+                    exhausted = True
+                    break
+                for match in matched:
+                    firsts[match] = element
+                    done.add(match)
+            yield firsts.get(index)
+
+    def select_one(self, tag) -> Optional[object]:
+        """Premier élément du sélecteur le plus prioritaire qui trouve quelque chose."""
+        return next((element for element in self.first_matches(tag) if element is not None), None)
+
+    def select(self, tag) -> List[object]:
+        """Éléments qui satisfont au moins un sélecteur, sans doublon, dans l'ordre du document."""
+        return [element for element, indices in self._walk(tag)
+                if any(self._compiled[index].match(element) for index in indices)]
+
+    def select_each(self, tag) -> List[object]:
+        """Comme `[e for s in selectors for e in tag.select(s)]` : regroupés par sélecteur, par priorité."""
+        matches: List[List[object]] = [[] for _ in self.selectors]
+        for element, matched in self._candidates(tag):
+            for index in matched:
+                matches[index].append(element)
+        return [element for group in matches for element in group]
@@ -0,0 +1,68 @@
+"""Forme canonique des URLs, pour reconnaître une même page sous plusieurs écritures.
+
+`https://www.site.fr/article/?utm_source=x#haut` et `http://site.fr/article`
+désignent la même page : même clé canonique. La forme canonique sert
+uniquement à dédoublonner, les pages restent téléchargées à leur URL d'origine.
+"""
+import hashlib
+from typing import Iterable, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi sans effet sur le contenu de la page
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'spm', 'cmpid', 'xtor', 'at_medium', 'at_campaign',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hsa_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """Forme canonique : https, hôte en minuscules sans `www.` ni port par défaut,
+    sans fragment ni paramètres de suivi, paramètres triés, sans slash final."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    # http et https servent la même page
+    if scheme in DEFAULT_PORTS:
+        scheme = 'https'
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not _is_tracking(name))
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def url_digest(url: str) -> bytes:
+    """Empreinte de 16 octets de la forme canonique d'une URL."""
+    return hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=16).digest()
+
+
+def dedupe_urls(urls: Iterable[str]) -> List[str]:
+    """Garde la première URL de chaque forme canonique, dans l'ordre donné."""
+    seen = set()
+    unique = []
+    for url in urls:
+        key = canonicalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
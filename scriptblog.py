@@ -1,40 +1,71 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import google.generativeai as genai
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import re
 import os
-import time
+import tempfile
 from datetime import datetime
-import json
-from typing import List, Dict, Optional
+import argparse
+from typing import Iterable, List, Optional
 from dotenv import load_dotenv
 
+from scrapx.blog_generation import BlogArticleGenerator, slugify
+from scrapx.config import env_float, env_int, env_str
+from scrapx.crawl_state import CrawlState, content_hash
+from scrapx.density import extractor_from_env
+from scrapx.discovery import DEFAULT_MAX_SITEMAPS, SiteDiscovery
+from scrapx.extraction import extract_main_image, parse_article_page
+from scrapx.extraction_profiles import ExtractionProfile, ExtractionProfiles
+from scrapx.fetcher import AsyncFetcher, DEFAULT_CONCURRENCY
+from scrapx.frontier import DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES_PER_SITE, ListingCrawler
+from scrapx.gemini import GeminiDispatcher
+from scrapx.http_cache import HttpCache
+from scrapx.http_client import session_from_env
+from scrapx.journal import FAILED, FETCHED, GENERATED, SAVED, RunJournal, run_with_retries
+from scrapx.model_router import ModelRouter
+from scrapx.near_duplicates import NearDuplicateIndex, minhash_signature
+from scrapx.parse_pool import ParsePool
+from scrapx.parsing import parser_from_env
+from scrapx.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage, workers_from_env
+from scrapx.politeness import DEFAULT_CRAWL_DELAY, PolitenessScheduler, interleave_by_host
+from scrapx.seen_urls import SeenUrls
+from scrapx.urls import dedupe_urls
+
 class BlogScraper:
-    def __init__(self, gemini_api_key: str):
+    def __init__(self, gemini_api_key: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 crawl_delay: float = DEFAULT_CRAWL_DELAY):
         
         self.gemini_api_key = gemini_api_key
         genai.configure(api_key=gemini_api_key)
         
-        model_names = ['gemini-2.0-flash']
-        self.model = None
-        
-        for model_name in model_names:
-            try:
-                self.model = genai.GenerativeModel(model_name)
-                print(f"✅ Modèle Gemini initialisé: {model_name}")
-                break
-            except Exception as e:
-                print(f"❌ Échec du modèle {model_name}: {e}")
-                continue
-        
-        if not self.model:
-            raise Exception("Aucun modèle Gemini disponible")
-            
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Modèles de GEMINI_MODELS : le plus rapide en bonne santé répond, les autres prennent le relais
+        self.model = ModelRouter.from_env(genai.GenerativeModel)
+        
+        self.dispatcher = GeminiDispatcher.from_env(self.model)
+        self.generator = BlogArticleGenerator.from_env(self.dispatcher)
+        # Écriture de l'article au fil de la génération (SCRAPX_BLOG_STREAMING=on)
+        self.stream_articles = env_str('SCRAPX_BLOG_STREAMING', 'off').lower() not in ('off', 'false', '0', 'none')
+        self.crawl_state = CrawlState.from_env('blog')
+        self.journal = RunJournal.from_env('blog')
+        self.seen_urls = SeenUrls.from_env()
+        self.near_duplicates = NearDuplicateIndex.from_env('blog')
+        self.html_parser = parser_from_env()
+        # Moteur d'extraction du texte : cascade de sélecteurs ou densité de texte
+        self.content_extractor = extractor_from_env()
+        self.parse_pool = ParsePool.from_env()
+        # Sélecteurs gagnants par site, essayés avant la cascade complète
+        self.extraction_profiles = ExtractionProfiles.from_env('blog')
+            
+        self.session = session_from_env(concurrency)
+        self.scheduler = PolitenessScheduler(self.session, crawl_delay)
+        self.fetcher = AsyncFetcher(self.session, concurrency, scheduler=self.scheduler,
+                                    http_cache=HttpCache.from_env())
+        self.discovery = SiteDiscovery(self.fetcher, self.html_parser,
+                                       env_int('SCRAPX_MAX_SITEMAPS', DEFAULT_MAX_SITEMAPS))
+        self.crawler = ListingCrawler(self.fetcher, self.parse_pool, self.html_parser,
+                                      max_depth=env_int('SCRAPX_CRAWL_MAX_DEPTH', DEFAULT_MAX_DEPTH),
+                                      max_pages_per_site=env_int('SCRAPX_MAX_PAGES_PER_SITE',
+                                                                 DEFAULT_MAX_PAGES_PER_SITE))
     
     def is_single_article_url(self, url: str) -> bool:
 
@@ -71,60 +102,23 @@ class BlogScraper:
         path = urlparse(url).path
         return len(path.strip('/').split('/')) >= 2
     
-    def extract_blog_links(self, blog_url: str) -> List[str]:
-        
+    def discover_article_links(self, blog_url: str, since: Optional[datetime] = None) -> List[str]:
+        """Articles annoncés par les flux RSS/Atom de la page et les sitemaps du site, les plus récents d'abord."""
+        links = self.discovery.discover(blog_url, since)
+        if links:
+            period = f" depuis le {since:%Y-%m-%d}" if since else ""
+            print(f"🗺️ {len(links)} article(s) trouvé(s) dans les sitemaps et flux{period}")
+        return links
+    
+    def extract_blog_links(self, blog_url: str, max_articles: Optional[int] = None) -> List[str]:
+        """Liens d'articles de la page de blog et de ses pages suivantes (pagination), jusqu'à `max_articles`."""
         try:
-            response = self.session.get(blog_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            article_links = set()
-            base_domain = urlparse(blog_url).netloc
-            
-            # Différents sélecteurs pour détecter les liens d'articles
-            selectors = [
-                'a[href*="/blog/"]',
-                'a[href*="/article/"]', 
-                'a[href*="/post/"]',
-                'article a',
-                '.post-title a',
-                '.entry-title a',
-                'h2 a',
-                'h3 a',
-                '.blog-post a',
-                '.article-link',
-                'a[href*="/20"]',  
-                'a[href*="/marques/"]',  
-            ]
-            
-            for selector in selectors:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(blog_url, href)
-                        if urlparse(full_url).netloc == base_domain:
-                            article_links.add(full_url)
-            
-            filtered_links = []
-            exclude_patterns = [
-                r'/page/',
-                r'/category/',
-                r'/tag/',
-                r'/author/',
-                r'/search/',
-                r'#',
-                r'\?',
-                r'/feed',
-                r'/rss',
-            ]
-            
-            for link in article_links:
-                if not any(re.search(pattern, link, re.IGNORECASE) for pattern in exclude_patterns):
-                    filtered_links.append(link)
+            # Les articles déjà traités ne consomment pas le budget du blog
+            skip = self.seen_urls.__contains__ if self.seen_urls else None
+            filtered_links = self.crawler.harvest([blog_url], max_articles, skip)
             
             print(f"Trouvé {len(filtered_links)} liens d'articles potentiels")
-            return list(set(filtered_links))[:20]  # Limiter à 20 articles max
+            return filtered_links
             
         except Exception as e:
             print(f"Erreur lors de l'extraction des liens: {e}")
@@ -132,250 +126,46 @@ class BlogScraper:
     
     def _extract_main_image(self, soup) -> Optional[str]:
         """Extrait l'URL de l'image principale de l'article."""
-        # Image par défaut si aucune image n'est trouvée
-        default_image = "https://images.unsplash.com/photo-1611224923853-80b023f02d71?ixlib=rb-4.0.3&auto=format&fit=crop&w=2070&q=80"
-        
-        # Sélecteurs communs pour les images principales d'articles
-        image_selectors = [
-            'meta[property="og:image"]',  # Open Graph image
-            'meta[name="twitter:image"]',  # Twitter Card image
-            '.article-featured-image img',  # Classes communes pour les images à la une
-            '.post-thumbnail img',
-            '.entry-featured-image img',
-            'article img:first-of-type',  # Première image dans l'article
-            '.wp-post-image',  # Image à la une WordPress
-            'article .image-principale',
-            '[itemprop="image"]'
-        ]
-        
-        # Chercher l'image avec les sélecteurs
-        for selector in image_selectors:
-            element = soup.select_one(selector)
-            if element:
-                # Selon le type d'élément, extraire l'URL
-                if element.name == 'meta':
-                    image_url = element.get('content')
-                else:
-                    image_url = element.get('src')
-                
-                if image_url:
-                    # S'assurer que l'URL est absolue
-                    if not image_url.startswith(('http://', 'https://')):
-                        base_url = soup.find('base', href=True)
-                        if base_url:
-                            image_url = urljoin(base_url['href'], image_url)
-                    return image_url
-        
-        # Si aucune image n'est trouvée, retourner l'image par défaut
-        return default_image
+        return extract_main_image(soup)
 
     def scrape_article_content(self, url: str) -> Optional[dict]:
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', '.sidebar', '.advertisement']):
-                element.decompose()
-            
-            content_selectors = [
-                'article',
-                '.post-content',
-                '.entry-content', 
-                '.article-content',
-                '.blog-post',
-                '.content',
-                'main',
-                '.post-body',
-                '[role="main"]'
-            ]
-            
-            content = ""
-            for selector in content_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    content = element.get_text(strip=True)
-                    if len(content) > 200:  # Contenu suffisant
-                        break
-            
-            if not content or len(content) < 200:
-                body = soup.find('body')
-                if body:
-                    content = body.get_text(strip=True)
-            
-            # Extraire l'image principale
-            image_url = self._extract_main_image(soup)
-            
-            return {
-                'content': content if len(content) > 100 else None,
-                'image_url': image_url
-            }
-            
+            response = self.fetcher.get(url)
         except Exception as e:
             print(f"Erreur lors du scraping de {url}: {e}")
             return None
-    
-    def _clean_markdown_response(self, text: str) -> str:
-        # 1. Initial global fence removal (case-insensitive for keywords)
-        text = re.sub(r'^```(?:markdown|yaml)?\s*\n', '', text, flags=re.IGNORECASE | re.MULTILINE)
-        text = re.sub(r'\n```\s*$', '', text, flags=re.MULTILINE)
-
-        # 2. Strip leading/trailing whitespace from the whole string
-        text = text.strip()
-
-        # 3. Handle specific "yaml" or "```yaml" prefixes on the first line
-        lines = text.splitlines()
-        
-        if not lines:
-            return "---\n---" # Return minimal valid MDX for empty input
-
-        # 4. Ensure dates are in YYYY-MM-DD format
-        date_pattern = r'publishDate:\s*([^\n]+)'
-        date_match = re.search(date_pattern, text)
-        if date_match:
-            current_date = date_match.group(1).strip()
-            try:
-                # Try to parse the date in various formats
-                for fmt in ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']:
-                    try:
-                        parsed_date = datetime.strptime(current_date, fmt)
-                        break
-                    except ValueError:
-                        continue
-                # Format the date as YYYY-MM-DD
-                formatted_date = parsed_date.strftime('%Y-%m-%d')
-                text = re.sub(date_pattern, f'publishDate: {formatted_date}', text)
-            except:
-                # If date parsing fails, use current date
-                text = re.sub(date_pattern, f'publishDate: {datetime.now().strftime("%Y-%m-%d")}', text)
-
-        first_line_stripped_lower = lines[0].strip().lower()
-        
-        # Check if the first line is one of the unwanted standalone prefixes
-        is_prefix_to_remove = False
-        if first_line_stripped_lower == "yaml":
-            is_prefix_to_remove = True
-        elif first_line_stripped_lower.startswith("```yaml") or first_line_stripped_lower.startswith("``` yaml"):
-            # Check if it's just the fence keyword and not content starting with ```yaml
-            temp_check = first_line_stripped_lower.replace("```yaml", "").replace("``` yaml", "").replace("`", "").strip()
-            if not temp_check:
-                is_prefix_to_remove = True
-                
-        if is_prefix_to_remove:
-            if len(lines) > 1:
-                text = "\n".join(lines[1:]) # Remove the prefix line
-            else:
-                # Only the prefix was present
-                return "---\n---" # Return minimal valid MDX
-
-        # 5. Strip leading/trailing whitespace again in case prefix removal left some
-        text = text.strip()
-
-        # 6. Ensure the text starts with "---". If not, prepend it.
-        if not text.startswith("---"):
-            # If text is now empty (e.g., it was only "yaml" and got stripped),
-            # ensure we don't just prepend "---" to an empty string without a newline.
-            if not text:
-                return "---\n---" # Minimal valid MDX for originally empty or prefix-only content
-            text = "---\n" + text
-        
-        # If the text was just "---" (e.g. from prepending to empty), ensure a closing "---".
-        # Or if the original text was just "---"
-        if text.strip() == "---":
-            text = "---\n---"
-
-        return text
+        return self.parse_article_content(url, response.content)
 
-    def generate_blog_article(self, content: str, original_url: str, image_url: Optional[str] = None) -> Optional[str]:
+    def parse_article_content(self, url: str, html: bytes) -> Optional[dict]:
+        """Extrait le contenu et l'image d'une page déjà téléchargée."""
         try:
-            # Image par défaut si aucune image n'est trouvée
-            default_image = "https://images.unsplash.com/photo-1611224923853-80b023f02d71?ixlib=rb-4.0.3&auto=format&fit=crop&w=2070&q=80"
+            content = parse_article_page(html, self.html_parser, self._profile_for(url), self.content_extractor)
+            self._learn(url, content)
+            return content
             
-            # Générer d'abord un titre temporaire pour pouvoir créer l'URL canonique
-            temp_prompt = f"""
-Génère uniquement un titre SEO optimisé pour cet article. Format attendu:
-'Titre entre apostrophes simples'
-
-Contenu à titrer:
-{content[:1000]}
-"""
-            temp_response = self.model.generate_content(temp_prompt)
-            if not temp_response or not temp_response.text:
-                return None
-            
-            # Extraire le titre et le slugifier
-            title_match = re.search(r"'([^']+)'", temp_response.text)
-            if not title_match:
-                return None
-            
-            title = title_match.group(1)
-            slug = self._slugify(title)
-            canonical_url = f"https://www.jeupix.com/blog/{slug}"
-            
-            prompt = f"""
-Transforme le contenu fourni en un article de blog professionnel, unique et engageant, au format MDX.
-Respecte SCRUPULEUSEMENT la structure YAML frontmatter et les instructions de formatage ci-dessous.
-
----
-publishDate: {datetime.now().strftime('%Y-%m-%d')}
-title: '{title}'
-excerpt: "Extrait de l''article généré par l''IA (1-2 phrases)"
-image: '{image_url if image_url else default_image}'
-tags:
-  - tag1
-  - tag2
-  - tag3
-metadata:
-  canonical: '{canonical_url}'
-draft: false
----
-
-# Titre Principal de l'Article (H1)
-
-[CORPS DE L'ARTICLE EN MARKDOWN BIEN STRUCTURÉ ET NARRATIF ICI]
-
-INSTRUCTIONS SPÉCIFIQUES:
-
-1.  **Frontmatter (YAML) - Respecte cet ordre et ce format EXACTEMENT:**
-    *   `publishDate`: Doit être au format `YYYY-MM-DD` (ex: 2024-01-02).
-    *   `title`: Utilise le titre généré précédemment.
-    *   `excerpt`: Génère un extrait court (1-2 phrases), percutant et cohérent avec l'introduction. Mêmes règles de formatage que pour `title`.
-    *   `image`: Utilise l'URL d'image fournie (`{image_url if image_url else default_image}`). Doit être une chaîne entre apostrophes simples.
-    *   `tags`: Fournis une liste de 3 tags pertinents (en français ou anglais). Chaque tag doit être une chaîne simple (pas besoin d'apostrophes autour de chaque tag individuel dans la liste YAML, mais la liste elle-même est sous `tags:`).
-    *   `metadata.canonical`: Utilise l'URL canonique générée (`{canonical_url}`). Doit être une chaîne (apostrophes simples si elle contient des caractères spéciaux YAML).
-    *   `draft`: Toujours `false`.
-
-2.  **Contenu de l'Article (MDX Body):**
-    *   **Réécriture Complète:** REFORMULE et RÉÉCRIS intégralement le contenu source pour créer un NOUVEL article de blog. Ne te contente pas de résumer ou de modifier légèrement.
-    *   **Titre H1:** Commence le corps de l'article par un titre principal (H1, formaté avec `#`). Ce titre H1 peut être différent du `title` du frontmatter.
-    *   **Style Narratif et Structuré:** Rédige le corps de l'article en Markdown simple et narratif. Utilise des titres et sous-titres (`##`, `###`) pour structurer le contenu, des paragraphes bien formés, des listes à puces (`- item`) ou numérotées (`1. item`) si approprié, du texte en gras (`**gras**`) ou italique (`*italique*`) pour mettre en évidence des points clés, et des citations (`> texte cité`) si pertinent. Le contenu doit être fluide, lisible et engageant.
-    *   **Longueur:** L'article doit faire au minimum 800 mots.
-    *   **Syntaxe MDX Valide:** Assure-toi que tout le contenu généré est compatible MDX. Échappe correctement les caractères spéciaux comme `{'{'}`, `{'}'}`, `<` et `>` s'ils doivent apparaître littéralement dans le texte et ne font pas partie d'une syntaxe MDX/HTML valide.
-
-3.  **Qualité & Style Linguistique:**
-    *   Rédige en français soutenu, professionnel et engageant.
-    *   L'article doit être unique, informatif et apporter une réelle valeur ajoutée au lecteur.
+        except Exception as e:
+            print(f"Erreur lors du scraping de {url}: {e}")
+            return None
+    
+    def _profile_for(self, url: str) -> Optional[ExtractionProfile]:
+        return self.extraction_profiles.profile_for(url) if self.extraction_profiles else None
 
-4.  **Format de Sortie:**
-    *   Réponds UNIQUEMENT avec le frontmatter YAML suivi du contenu MDX.
-    *   NE PAS inclure de balises ```markdown ou ``` au début ou à la fin de ta réponse.
-    *   Ta réponse doit être uniquement le document MDX complet, en commençant par `---` pour le frontmatter et se terminant après le contenu principal de l'article. N'inclus aucun commentaire, note, explication ou texte superflu en dehors du contenu de l'article lui-même.
+    def _learn(self, url: str, content: dict):
+        """Enregistre le profil d'extraction renvoyé avec le contenu de la page (et l'en retire)."""
+        profile = content.pop('profile', None)
+        if self.extraction_profiles:
+            self.extraction_profiles.update(url, profile)
 
-Contenu à transformer:
-{content[:4000]} 
-""" # Limité à 4000 caractères pour le contexte du prompt
+    def generate_blog_article(self, content: str, original_url: str, image_url: Optional[str] = None,
+                              paragraphs: Optional[List[str]] = None) -> Optional[str]:
+        """Article MDX réécrit par Gemini (un seul appel structuré par défaut, voir `scrapx.blog_generation`)."""
+        return self.generator.generate(content, image_url, paragraphs)
 
-            response = self.model.generate_content(prompt)
-            if not response or not response.text:
-                return None
-                
-            # Nettoyer la réponse
-            cleaned_content = self._clean_markdown_response(response.text)
-            return cleaned_content
-            
-        except Exception as e:
-            print(f"Erreur avec l'API Gemini: {e}")
-            return None
+    def stream_blog_article(self, content: str, original_url: str, image_url: Optional[str] = None,
+                            paragraphs: Optional[List[str]] = None, filepath: Optional[str] = None) -> Optional[str]:
+        """Génère l'article en l'écrivant sur disque au fil de la réponse ; retourne le chemin du fichier."""
+        return self.save_article_stream(self.generator.stream(content, image_url, paragraphs), original_url,
+                                        filepath=filepath)
     
     def _extract_site_name(self, url: str) -> str:
         """Extrait et nettoie le nom du site depuis l'URL."""
@@ -402,38 +192,14 @@ Contenu à transformer:
 
     def _slugify(self, text: str) -> str:
         """Convertit un texte en slug."""
-        # Convertir en minuscules
-        text = text.lower()
-        # Remplacer les caractères accentués
-        text = re.sub(r'[àáâãäçèéêëìíîïñòóôõöùúûüýÿ]', 
-                     lambda m: 'aaaaaceeeeiiiinooooouuuuyy'['àáâãäçèéêëìíîïñòóôõöùúûüýÿ'.index(m.group())], 
-                     text)
-        # Remplacer tout ce qui n'est pas alphanumérique par des tirets
-        text = re.sub(r'[^a-z0-9]+', '-', text)
-        # Supprimer les tirets en début et fin
-        text = text.strip('-')
-        # Réduire les tirets multiples
-        text = re.sub(r'-+', '-', text)
-        return text
+        return slugify(text)
 
-    def save_article(self, article_content: str, url: str, output_dir: str = "articles"):
-        """Sauvegarde l'article avec un nom basé sur le titre slugifié."""
+    def save_article(self, article_content: str, url: str, output_dir: str = "articles",
+                     filepath: Optional[str] = None):
+        """Sauvegarde l'article avec un nom basé sur le titre slugifié (ou dans `filepath` s'il est fourni)."""
         try:
             os.makedirs(output_dir, exist_ok=True)
-            
-            # Extraire le titre du contenu markdown
-            title_match = re.search(r"title: '([^']+)'", article_content)
-            if title_match:
-                title = title_match.group(1)
-                # Slugifier le titre
-                filename = f"{self._slugify(title)}.mdx" # Changement d'extension
-            else:
-                # Fallback si on ne trouve pas le titre
-                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-                filename = f"article-{timestamp}.mdx" # Changement d'extension
-            
-            # Construire le chemin complet
-            filepath = os.path.join(output_dir, filename)
+            filepath = self._article_path(article_content, output_dir, filepath)
             
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(article_content)
@@ -445,6 +211,60 @@ Contenu à transformer:
             print(f"Erreur lors de la sauvegarde: {e}")
             return None
     
+    def save_article_stream(self, chunks: Iterable[str], url: str, output_dir: str = "articles",
+                            filepath: Optional[str] = None) -> Optional[str]:
+        """Écrit l'article fragment par fragment dans un fichier temporaire, renommé une fois complet.
+
+        Le fichier `.*.mdx.part` grossit dans le dossier de sortie pendant la
+        génération (un outil d'aperçu peut le suivre) ; l'article final n'apparaît
+        qu'entier. Le nom est tiré du titre du premier fragment (le frontmatter).
+        """
+        # Le fichier temporaire est créé dans le dossier final, pour que le renommage soit atomique
+        directory = (os.path.dirname(filepath) if filepath else None) or output_dir
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.mdx.part', dir=directory)
+            head = None
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for chunk in chunks:
+                    head = head or chunk
+                    f.write(chunk)
+                    f.flush()
+            if not head:
+                raise ValueError("Réponse Gemini vide")
+            filepath = self._article_path(head, output_dir, filepath)
+            os.replace(temp_path, filepath)
+        except Exception as e:
+            print(f"Erreur lors de la génération de l'article {url}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+        print(f"Article sauvegardé: {filepath}")
+        return filepath
+
+    def _article_path(self, article_content: str, output_dir: str, filepath: Optional[str] = None) -> str:
+        """Chemin du fichier de l'article : `filepath` s'il est fourni, sinon le titre slugifié."""
+        # Extraire le titre du contenu markdown
+        # Les apostrophes d'un titre YAML entre apostrophes sont doublées
+        title_match = re.search(r"title: '((?:[^']|'')+)'", article_content)
+        if filepath:
+            # Régénération : on remplace le fichier produit au passage précédent
+            filename = os.path.basename(filepath)
+            output_dir = os.path.dirname(filepath) or output_dir
+        elif title_match:
+            title = title_match.group(1).replace("''", "'")
+            # Slugifier le titre
+            filename = f"{self._slugify(title)}.mdx" # Changement d'extension
+        else:
+            # Fallback si on ne trouve pas le titre
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            filename = f"article-{timestamp}.mdx" # Changement d'extension
+        
+        # Construire le chemin complet
+        return os.path.join(output_dir, filename)
+    
     def process_single_article(self, article_url: str, article_number: int = 1) -> Optional[str]:
         
         print(f"🎯 Traitement de l'article {article_number}: {article_url}")
@@ -454,56 +274,206 @@ Contenu à transformer:
             print(f"❌ Impossible de récupérer le contenu de l'article {article_number}")
             return None
         
+        return self._generate_and_save(article_url, content, article_number)
+
+    def _generate_and_save(self, article_url: str, content: dict, article_number: int) -> Optional[str]:
+        """Génère l'article à partir du contenu extrait puis le sauvegarde."""
+        if not content.get('content'):
+            print(f"❌ Contenu insuffisant pour l'article {article_number}")
+            return None
+
         print(f"✅ Contenu récupéré ({len(content['content'])} caractères)")
         
-        article = self.generate_blog_article(content['content'], article_url, content['image_url'])
-        if not article:
-            print(f"❌ Impossible de générer l'article {article_number}")
-            return None
+        if self.near_duplicates:
+            signature = self.parse_pool.call(minhash_signature, content['content'])
+            if self._find_near_duplicate(article_url, signature):
+                return None
         
-        # Nom de fichier unique avec numéro d'article et timestamp
-        filename = f"article_{article_number}_{int(time.time())}"
-        filepath = self.save_article(article, article_url)
+        if self.stream_articles:
+            filepath = self.stream_blog_article(content['content'], article_url, content['image_url'],
+                                                content.get('paragraphs'))
+        else:
+            article = self.generate_blog_article(content['content'], article_url, content['image_url'],
+                                                 content.get('paragraphs'))
+            if not article:
+                print(f"❌ Impossible de générer l'article {article_number}")
+                self._release(article_url)
+                return None
+            
+            filepath = self.save_article(article, article_url)
         
         if filepath:
             print(f"✅ Article {article_number} sauvegardé: {filepath}")
+            if self.near_duplicates:
+                self.near_duplicates.record(article_url, filepath)
             return filepath
         else:
             print(f"❌ Erreur lors de la sauvegarde de l'article {article_number}")
+            self._release(article_url)
             return None
+
+    def _find_near_duplicate(self, url: str, signature: bytes):
+        """Article quasi identique déjà traité `(url, fichier, similarité)` ; à défaut, `url` est réservée dans l'index."""
+        duplicate = self.near_duplicates.claim(url, signature)
+        if duplicate:
+            self._report_near_duplicate(url, duplicate)
+        return duplicate
+
+    @staticmethod
+    def _report_near_duplicate(url: str, duplicate):
+        original_url, output_path, score = duplicate
+        print(f"🧬 Quasi-doublon de {original_url} (similarité {score:.0%}), génération évitée: {url}")
+        if output_path:
+            print(f"   ↪ article existant: {output_path}")
+
+    def _release(self, url: str):
+        """Libère la place réservée par `url` dans l'index des quasi-doublons."""
+        if self.near_duplicates:
+            self.near_duplicates.release(url)
     
     def process_multiple_urls(self, urls: List[str]) -> List[str]:
         """
         Traite une liste d'URLs d'articles uniques
         """
-        processed_files = []
-        total_urls = len(urls)
-        
-        print(f"📊 Traitement de {total_urls} URL(s)...")
-        
-        for i, url in enumerate(urls, 1):
-            print(f"\n{'='*50}")
-            print(f"📝 Article {i}/{total_urls}")
-            
+        # Pas de filtre `seen_urls` ici : une URL donnée directement est toujours traitée,
+        # le crawl incrémental ne la régénère que si son contenu a changé
+        unique_urls = dedupe_urls(urls)
+        if len(unique_urls) < len(urls):
+            print(f"🔗 {len(urls) - len(unique_urls)} URL(s) en double ignorée(s) (même page)")
+        urls = unique_urls
+        print(f"📊 Traitement de {len(urls)} URL(s) (concurrence: {self.fetcher.concurrency})...")
+        
+        for url in urls:
             # Vérifier si c'est bien un article unique
             if not self.is_single_article_url(url):
                 print(f"⚠️ URL {url} ne semble pas être un article unique, traitement quand même...")
-            
-            filepath = self.process_single_article(url, i)
-            
-            if filepath:
-                processed_files.append(filepath)
-                print(f"✅ Article {i} traité avec succès")
-            else:
-                print(f"❌ Échec du traitement de l'article {i}")
-            
-            if i < total_urls:
-                print("⏳ Pause de 3 secondes...")
-                time.sleep(3)
         
+        if not self.journal:
+            return self._run_pipeline(urls)
+        
+        # Articles déjà sauvegardés dans ce lot (reprise avec --resume)
+        already_saved = [entry['output_path'] for entry in self.journal.entries(urls).values()
+                         if entry['status'] == SAVED and entry['output_path']]
+        return already_saved + run_with_retries(self.journal, urls, self._run_pipeline)
+
+    def _run_pipeline(self, urls: List[str]) -> List[str]:
+        pipeline = self._build_pipeline()
+        processed_files = asyncio.run(pipeline.run(interleave_by_host(urls)))
+        pipeline.report()
         return processed_files
+
+    def _mark(self, url: str, status: str, error: Optional[str] = None, output_path: Optional[str] = None):
+        """Enregistre l'avancement d'une URL dans le journal du lot."""
+        if self.journal:
+            self.journal.mark(url, status, error=error, output_path=output_path)
+
+    def _build_pipeline(self) -> Pipeline:
+        """Pipeline téléchargement → parsing → génération → écriture, chaque étage avec ses workers."""
+        return Pipeline([
+            Stage('fetch', self._fetch_stage, workers_from_env('fetch', self.fetcher.concurrency)),
+            Stage('parse', self._parse_stage, workers_from_env('parse', self.parse_pool.workers)),
+            Stage('generate', self._generate_stage, workers_from_env('generate', self.dispatcher.max_concurrency)),
+            Stage('write', self._write_stage, workers_from_env('write', 1)),
+        ], queue_size=env_int('SCRAPX_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+
+    async def _fetch_stage(self, url: str):
+        if self.journal:
+            self.journal.begin_attempt(url)
+        page = await self.fetcher.fetch(url)
+        if not page.ok:
+            print(f"❌ Erreur lors du scraping de {url}: {page.error}")
+            self._mark(url, FAILED, error=page.error)
+            return None
+        self._mark(url, FETCHED)
+        return page
+
+    async def _parse_stage(self, page):
+        # Parsing dans le pool de processus : seuls les octets et le texte extrait transitent
+        try:
+            content = await self.parse_pool.run(parse_article_page, page.content, self.html_parser,
+                                                self._profile_for(page.url), self.content_extractor)
+            self._learn(page.url, content)
+        except Exception as e:
+            print(f"Erreur lors du scraping de {page.url}: {e}")
+            content = None
+        if not content or not content.get('content'):
+            print(f"❌ Impossible de récupérer le contenu de {page.url}")
+            self._mark(page.url, FAILED, error="Contenu introuvable")
+            return None
+        print(f"✅ Contenu récupéré ({len(content['content'])} caractères): {page.url}")
+        
+        item = dict(content, url=page.url, content_hash=content_hash(content['content'], content['image_url']),
+                    unchanged=False, output_path=None)
+        if self.crawl_state:
+            item['unchanged'], item['output_path'] = self.crawl_state.check(page.url, item['content_hash'])
+        
+        # Même dépêche reprise par un autre site : pas d'appel Gemini
+        if self.near_duplicates and not item['unchanged']:
+            signature = await self.parse_pool.run(minhash_signature, content['content'])
+            duplicate = await self.near_duplicates.find_saved(page.url, signature)
+            if duplicate:
+                self._report_near_duplicate(page.url, duplicate)
+                # Rattachée à l'article existant : ni régénérée, ni réessayée par --resume
+                self._mark(page.url, SAVED, output_path=duplicate[1])
+                self._remember(page.url)
+                return None
+        return item
+
+    def _generate_stage(self, item):
+        if item['unchanged']:
+            # Contenu source identique au passage précédent : pas d'appel Gemini
+            return item
+        try:
+            if self.stream_articles:
+                # L'article est écrit sur disque pendant sa génération
+                item['filepath'] = self.stream_blog_article(item['content'], item['url'], item['image_url'],
+                                                            item.get('paragraphs'), filepath=item['output_path'])
+                article = item['filepath']
+            else:
+                article = item['article'] = self.generate_blog_article(item['content'], item['url'],
+                                                                       item['image_url'], item.get('paragraphs'))
+        except Exception:
+            # L'étage abandonne l'élément : les quasi-doublons qui l'attendent ne doivent pas rester bloqués
+            self._release(item['url'])
+            raise
+        if not article:
+            print(f"❌ Impossible de générer l'article pour {item['url']}")
+            self._mark(item['url'], FAILED, error="Échec de la génération")
+            self._release(item['url'])
+            return None
+        self._mark(item['url'], GENERATED)
+        return item
+
+    def _write_stage(self, item):
+        if item['unchanged']:
+            print(f"♻️ Contenu inchangé, article conservé: {item['output_path']}")
+            self._mark(item['url'], SAVED, output_path=item['output_path'])
+            self._remember(item['url'])
+            return item['output_path']
+        try:
+            filepath = item.get('filepath') or self.save_article(item['article'], item['url'],
+                                                                 filepath=item['output_path'])
+        except Exception:
+            self._release(item['url'])
+            raise
+        if not filepath:
+            self._mark(item['url'], FAILED, error="Échec de la sauvegarde")
+            self._release(item['url'])
+            return None
+        if self.crawl_state:
+            self.crawl_state.record(item['url'], item['content_hash'], filepath)
+        if self.near_duplicates:
+            self.near_duplicates.record(item['url'], filepath)
+        self._mark(item['url'], SAVED, output_path=filepath)
+        self._remember(item['url'])
+        return filepath
+
+    def _remember(self, url: str):
+        """Marque l'article comme traité : les pages de blog ne le reproposeront plus."""
+        if self.seen_urls:
+            self.seen_urls.add([url])
     
-    def process_blog(self, blog_url: str, max_articles: int = 10) -> List[str]:
+    def process_blog(self, blog_url: str, max_articles: int = 10, since: Optional[datetime] = None) -> List[str]:
         
         print(f"🔍 Analyse de l'URL: {blog_url}")
         
@@ -514,37 +484,27 @@ Contenu à transformer:
         
         print("🏠 URL détectée comme page de blog - recherche d'articles...")
         
-        article_links = self.extract_blog_links(blog_url)
+        # Sitemaps et flux d'abord ; à défaut, les liens de la page elle-même
+        article_links = self.discover_article_links(blog_url, since)
+        if not article_links:
+            article_links = self.extract_blog_links(blog_url, max_articles)
+        found = len(article_links)
+        
+        # Articles déjà traités par un autre blog, une autre entrée ou un passage précédent
+        if self.seen_urls:
+            article_links = self.seen_urls.unseen(article_links)
+            if len(article_links) < found:
+                print(f"🔗 {found - len(article_links)} article(s) déjà traité(s) ignoré(s)")
         
+        if found and not article_links:
+            print("✅ Aucun nouvel article à traiter")
+            return []
         if not article_links:
             print("❌ Aucun lien d'article trouvé")
             print("💡 Conseil: Vérifiez que l'URL pointe vers la page d'accueil du blog")
             return []
         
-        processed_files = []
-        
-        for i, link in enumerate(article_links[:max_articles]):
-            print(f"\n📝 Traitement de l'article {i+1}/{min(len(article_links), max_articles)}: {link}")
-            
-            content = self.scrape_article_content(link)
-            if not content:
-                print("❌ Impossible de récupérer le contenu")
-                continue
-            
-            print(f"✅ Contenu récupéré ({len(content['content'])} caractères)")
-            
-            article = self.generate_blog_article(content['content'], link, content['image_url'])
-            if not article:
-                print("❌ Impossible de générer l'article")
-                continue
-            
-            filename = f"article_{i+1}_{int(time.time())}"
-            filepath = self.save_article(article, link)
-            if filepath:
-                processed_files.append(filepath)
-                print(f"✅ Article sauvegardé")
-            
-            time.sleep(5)
+        processed_files = self.process_multiple_urls(article_links[:max_articles])
         
         print(f"\n🎉 Traitement terminé. {len(processed_files)} articles générés.")
         return processed_files
@@ -588,7 +548,19 @@ def load_config():
     
     return gemini_api_key, urls
 
+def parse_since(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"date invalide : {value} (format attendu : AAAA-MM-JJ)")
+
 def main():
+    parser = argparse.ArgumentParser(description='Génère des articles de blog à partir des URLs de urlblog.txt')
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre le dernier lot interrompu là où il s'est arrêté")
+    parser.add_argument('--since', type=parse_since, default=None,
+                        help="Pages de blog : ne retenir que les articles publiés ou modifiés depuis cette date (AAAA-MM-JJ)")
+    args = parser.parse_args()
     
     print("🚀 Démarrage du Blog Scraper Multi-URLs...")
     
@@ -603,7 +575,11 @@ def main():
     
     try:
         print(f"\n🔧 Initialisation du scraper...")
-        scraper = BlogScraper(gemini_api_key)
+        scraper = BlogScraper(gemini_api_key,
+                              env_int('SCRAPX_CONCURRENCY', DEFAULT_CONCURRENCY),
+                              env_float('SCRAPX_CRAWL_DELAY', DEFAULT_CRAWL_DELAY))
+        if scraper.journal and scraper.journal.open_run(resume=args.resume):
+            print(f"⏯️ Reprise du lot #{scraper.journal.run_id}")
         
         single_articles = [url for url in urls if scraper.is_single_article_url(url)]
         blog_pages = [url for url in urls if not scraper.is_single_article_url(url)]
@@ -624,8 +600,29 @@ def main():
             
             for blog_url in blog_pages:
                 print(f"\n🔄 Traitement du blog: {blog_url}")
-                files = scraper.process_blog(blog_url, max_articles)
+                files = scraper.process_blog(blog_url, max_articles, args.since)
                 processed_files.extend(files)
+            scraper.discovery.report()
+            scraper.crawler.report()
+        
+        if scraper.journal:
+            scraper.journal.finish()
+            scraper.journal.report()
+        scraper.fetcher.report()
+        if scraper.crawl_state:
+            scraper.crawl_state.report()
+        if scraper.extraction_profiles:
+            scraper.extraction_profiles.report()
+            scraper.extraction_profiles.close()
+        if scraper.seen_urls:
+            scraper.seen_urls.report()
+            scraper.seen_urls.close()
+        if scraper.near_duplicates:
+            scraper.near_duplicates.report()
+            scraper.near_duplicates.close()
+        scraper.dispatcher.report()
+        scraper.model.report()
+        scraper.parse_pool.close()
         
         if processed_files:
             print(f"\n🎉 Succès! {len(processed_files)} article(s) généré(s):")
@@ -1,17 +1,59 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 import google.generativeai as genai
-import yaml
 from datetime import datetime
 import re
 import argparse
 import sys
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
 import json
-import time
 import os
 from dotenv import load_dotenv
 
+from scrapx.condense import condense, content_budget_from_env
+from scrapx.config import env_float, env_int
+from scrapx.crawl_state import CrawlState, content_hash
+from scrapx.density import extractor_from_env
+from scrapx.extraction import (ProductArticle, extract_blocks, extract_main_content, extract_product_image,
+                               extract_title, main_content_element, parse_product_page)
+from scrapx.extraction_profiles import ExtractionProfiles
+from scrapx.fetcher import AsyncFetcher, DEFAULT_CONCURRENCY
+from scrapx.gemini import GeminiDispatcher
+from scrapx.http_cache import HttpCache
+from scrapx.http_client import session_from_env
+from scrapx.journal import FAILED, FETCHED, GENERATED, SAVED, RunJournal, run_with_retries
+from scrapx.model_router import ModelRouter
+from scrapx.near_duplicates import NearDuplicateIndex, minhash_signature
+from scrapx.parse_pool import ParsePool
+from scrapx.parsing import make_soup, parser_from_env
+from scrapx.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage, workers_from_env
+from scrapx.politeness import DEFAULT_CRAWL_DELAY, PolitenessScheduler, interleave_by_host
+from scrapx.raw_html_store import RawHtmlStore
+from scrapx.urls import canonicalize_url, dedupe_urls
+
+# Consignes communes aux prompts unitaire et par lot (points 2 à 15)
+PRODUCT_INSTRUCTIONS = """2.  `name`: Nom complet et détaillé du produit.
+3.  `amazonASIN`: Si un ASIN Amazon est clairement identifiable dans l'article pour le produit principal, utilise-le. Sinon, conserve "ASIN_PLACEHOLDER".
+4.  `publishDate` et `updateDate`: Doivent être au format `YYYY-MM-DD`. Tu peux utiliser la date actuelle si non spécifiée.
+5.  `draft`: Toujours `false`.
+6.  `title`: Titre engageant et SEO-friendly pour la fiche produit, différent du nom du produit.
+7.  `hookIntro`: Introduction concise (1-2 phrases) qui capte l'attention.
+8.  `keyBenefits`: Liste d'au moins 2 bénéfices clés au format "Titre du Bénéfice : Description".
+9.  `keyFeatures`: Liste d'au moins 2 caractéristiques techniques importantes.
+10. `detailedSpecs`: Description technique détaillée.
+11. `socialProof`: Fournis un exemple de preuve sociale (ex: "Très populaire auprès des joueurs", "Recommandé par les experts", "Noté 4.5/5 étoiles par plus de 1000 utilisateurs"). Si non disponible, indique "Non spécifié".
+12. `warrantyInfo`: Fournis des informations sur la garantie (ex: "Couvert par une garantie constructeur de 2 ans", "Garantie limitée de 1 an"). Si non disponible, indique "Non spécifié".
+13. `ctaText`: Texte pour le bouton d'appel à l'action (ex: "Voir le Prix sur Amazon", "Comparer les Offres").
+14. `category`: DOIT être l'une des suivantes : "Moniteur", "Console", "PC", "Manette", "Jeux Vidéo". Ne pas inventer d'autres catégories.
+15. `tags`: Liste d'au moins 3 tags pertinents incluant marque, modèle et mots-clés."""
+
+# Mode lot : nombre d'articles envoyés dans une même requête Gemini (1 = une requête par article)
+DEFAULT_BATCH_SIZE = 4
+BATCH_GENERATION_CONFIG = {'response_mime_type': 'application/json'}
+# Champs sans lesquels une fiche du lot est rejetée (et régénérée seule)
+REQUIRED_TEXT_FIELDS = ('name', 'brand', 'model', 'title', 'hookIntro')
+REQUIRED_LIST_FIELDS = ('keyBenefits', 'keyFeatures', 'tags')
+
 class ProductScraper:
 
     @staticmethod
@@ -20,7 +62,7 @@ class ProductScraper:
             return text_input # Return non-strings as is
         return text_input.replace("'", "''")
 
-    def __init__(self):
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, crawl_delay=DEFAULT_CRAWL_DELAY):
         
         load_dotenv()
         
@@ -29,12 +71,35 @@ class ProductScraper:
             raise ValueError("❌ GEMINI_API_KEY non trouvée dans le fichier .env")
         
         genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.model = ModelRouter.from_env(genai.GenerativeModel)
+        self.dispatcher = GeminiDispatcher.from_env(self.model)
+        self.crawl_state = CrawlState.from_env('fiche')
+        self.journal = RunJournal.from_env('fiche')
+        # Même produit décrit par plusieurs sites : une seule fiche
+        self.near_duplicates = NearDuplicateIndex.from_env('fiche')
+        self.batch_size = max(1, env_int('SCRAPX_FICHE_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        # Budget de tokens du texte de chaque article dans les prompts
+        self.content_tokens = content_budget_from_env()
+        # Statistiques du mode lot
+        self.batch_requests = 0
+        self.batch_retries = 0
+        self.html_parser = parser_from_env()
+        # Moteur d'extraction du texte : cascade de sélecteurs ou densité de texte
+        self.content_extractor = extractor_from_env()
+        self.parse_pool = ParsePool.from_env()
+        # Pages brutes gardées sur disque pour le débogage (désactivé par défaut)
+        self.raw_html_store = RawHtmlStore.from_env()
+        # Sélecteurs gagnants par site, essayés avant la cascade complète
+        self.extraction_profiles = ExtractionProfiles.from_env('fiche')
         
         # Headers pour les requêtes HTTP
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.session = session_from_env(concurrency, self.headers)
+        self.scheduler = PolitenessScheduler(self.session, crawl_delay)
+        self.fetcher = AsyncFetcher(self.session, concurrency, scheduler=self.scheduler,
+                                    http_cache=HttpCache.from_env())
 
     def load_urls_from_file(self, filename='urlfiche.txt'):
         
@@ -73,129 +138,73 @@ class ProductScraper:
         
         try:
             print(f"📥 Scraping de l'article : {url}")
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraction du contenu principal
-            content = self._extract_main_content(soup)
-            title = self._extract_title(soup)
-            image_url = self._extract_product_image(soup)
-            
-            return {
-                'url': url,
-                'title': title,
-                'content': content,
-                'image_url': image_url,
-                'raw_html': str(soup)
-            }
-            
+            response = self.fetcher.get(url)
         except requests.RequestException as e:
             print(f"❌ Erreur lors du scraping de {url}: {e}")
             return None
+        
+        if self.raw_html_store:
+            self.raw_html_store.save(url, response.content)
+        return self.parse_article(url, response.content)
+
+    def parse_article(self, url, html):
+        """Extrait les données d'un article déjà téléchargé."""
+        try:
+            soup = make_soup(html, self.html_parser)
+            profile = self._profile_for(url)
+            
+            # Extraction du contenu principal (texte brut et blocs pour le prompt)
+            content_element = main_content_element(soup, profile, self.content_extractor)
+            content = content_element.get_text(separator=' ', strip=True)
+            paragraphs = extract_blocks(content_element)
+            title = self._extract_title(soup, profile)
+            image_url = self._extract_product_image(soup, profile)
+            
+            article = ProductArticle(url, title, content, paragraphs, image_url)
+            self._learn(url, profile)
+            return article
+            
         except Exception as e:
             print(f"❌ Erreur inattendue pour {url}: {e}")
             return None
 
-    def _extract_title(self, soup):
-        
-        selectors = ['h1', 'title', '.article-title', '.post-title', '#title']
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element and element.get_text().strip():
-                return element.get_text().strip()
-        
-        return "Titre non trouvé"
+    def _profile_for(self, url):
+        return self.extraction_profiles.profile_for(url) if self.extraction_profiles else None
+
+    def _learn(self, url, profile):
+        if self.extraction_profiles:
+            self.extraction_profiles.update(url, profile)
+
+    def _extract_title(self, soup, profile=None):
+        return extract_title(soup, profile)
 
     def _extract_main_content(self, soup):
-        
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']):
-            element.decompose()
-        
-        content_selectors = [
-            'article', '.article-content', '.post-content', '.entry-content',
-            '.content', 'main', '#content', '.article-body', '.post-body'
-        ]
-        
-        for selector in content_selectors:
-            content_element = soup.select_one(selector)
-            if content_element:
-                return content_element.get_text(separator=' ', strip=True)
-        
-        body = soup.find('body')
-        if body:
-            return body.get_text(separator=' ', strip=True)
-        
-        return soup.get_text(separator=' ', strip=True)
+        return extract_main_content(soup, self.content_extractor)
 
-    def _extract_product_image(self, soup):
+    def _extract_product_image(self, soup, profile=None):
         """Extrait l'URL de l'image principale du produit."""
-        # Image par défaut si aucune image n'est trouvée
-        default_image = "https://images.unsplash.com/photo-1611224923853-80b023f02d71?ixlib=rb-4.0.3&auto=format&fit=crop&w=2070&q=80"
-        
-        # Sélecteurs spécifiques aux images de produits
-        image_selectors = [
-            # Sélecteurs Open Graph et Twitter
-            'meta[property="og:image"]',
-            'meta[name="twitter:image"]',
-            # Sélecteurs spécifiques aux sites e-commerce
-            '#landingImage',  # Amazon
-            '#main-image',    # Commun
-            '.product-image-main img',
-            '.product-featured-image',
-            '.gallery-image--default',
-            '[data-main-image]',
-            # Sélecteurs génériques pour images de produits
-            '.product-image img',
-            '.primary-image',
-            '.main-product-image',
-            # Fallback sur première image pertinente
-            'img[itemprop="image"]',
-            '.product img:first-of-type'
-        ]
-        
-        for selector in image_selectors:
-            element = soup.select_one(selector)
-            if element:
-                # Extraire l'URL selon le type d'élément
-                if element.name == 'meta':
-                    image_url = element.get('content')
-                else:
-                    # Chercher d'abord data-src pour les images lazy-loaded
-                    image_url = element.get('data-src') or element.get('src')
-                
-                if image_url:
-                    # Nettoyer l'URL
-                    image_url = image_url.split('?')[0]  # Retirer les paramètres
-                    # S'assurer que l'URL est absolue
-                    if not image_url.startswith(('http://', 'https://')):
-                        base_url = soup.find('base', href=True)
-                        if base_url:
-                            image_url = urljoin(base_url['href'], image_url)
-                    return image_url
-        
-        # Si aucune image n'est trouvée, retourner l'image par défaut
-        return default_image
+        return extract_product_image(soup, profile)
 
     def generate_product_sheet(self, article_data):
         """Génère une fiche produit à partir d'UN SEUL article"""
         try:
-            print(f"🤖 Génération de la fiche produit avec Gemini pour: {article_data['url']}")
+            print(f"🤖 Génération de la fiche produit avec Gemini pour: {article_data.url}")
             
             prompt = self._create_gemini_prompt(article_data)
             
-            response = self.model.generate_content(prompt)
+            response = self.dispatcher.generate(prompt)
             
             if not response or not response.text:
                 raise Exception("Réponse vide de l'API Gemini")
             
             product_data = self._parse_gemini_response(response.text)
+            if not product_data:
+                # Réponse inexploitable : ne pas la resservir depuis le cache au prochain essai
+                self.dispatcher.discard(prompt)
             
             if product_data:
                 # Ajouter l'URL de l'article original à product_data pour le canonical link
-                product_data['original_article_url'] = article_data.get('url', '')
+                product_data['original_article_url'] = article_data.url
             
             markdown_content = self._generate_markdown(product_data) # product_data peut être None
             
@@ -205,17 +214,95 @@ class ProductScraper:
             print(f"❌ Erreur lors de la génération avec Gemini: {e}")
             return None
 
-    def _create_gemini_prompt(self, article_data):
-        """Crée le prompt pour UN SEUL article"""
+    def generate_product_sheets(self, articles):
+        """Génère les fiches de plusieurs articles en UNE requête ; retourne {url: fiche ou None}.
+
+        Chaque fiche de la réponse est validée séparément : une fiche absente ou
+        mal formée est régénérée seule, sans relancer le reste du lot.
+        """
+        if len(articles) == 1:
+            return {articles[0].url: self.generate_product_sheet(articles[0])}
         
-        prompt = f"""
-Tu es un expert en rédaction de fiches produits techniques. À partir de l'article suivant, tu dois extraire les informations d'un produit et créer une fiche produit EXACTEMENT dans ce format JSON (respecte scrupuleusement la structure et l'ordre des champs) :
+        print(f"🤖 Génération groupée de {len(articles)} fiches produits avec Gemini")
+        prompt = self._create_batch_prompt(articles)
+        products = {}
+        try:
+            response = self.dispatcher.generate(prompt, generation_config=BATCH_GENERATION_CONFIG)
+            self.batch_requests += 1
+            if response and response.text:
+                products = self._parse_batch_response(response.text, articles)
+        except Exception as e:
+            print(f"❌ Erreur lors de la génération groupée avec Gemini: {e}")
+        if not products:
+            # Réponse inexploitable : ne pas la resservir depuis le cache au prochain essai
+            self.dispatcher.discard(prompt, generation_config=BATCH_GENERATION_CONFIG)
+        
+        sheets = {}
+        for article_data in articles:
+            url = article_data.url
+            product_data = products.get(url)
+            if product_data is None:
+                print(f"🔁 Fiche absente ou invalide dans le lot, nouvelle génération seule : {url}")
+                self.batch_retries += 1
+                sheets[url] = self.generate_product_sheet(article_data)
+                continue
+            if not product_data.get('image'):
+                product_data['image'] = article_data.image_url
+            product_data['original_article_url'] = url
+            sheets[url] = self._generate_markdown(product_data)
+        return sheets
+
+    def _parse_batch_response(self, response_text, articles):
+        """Fiches valides d'une réponse groupée, indexées par l'URL de leur article."""
+        response_text = response_text.strip()
+        json_start = response_text.find('[')
+        json_end = response_text.rfind(']') + 1
+        try:
+            items = json.loads(response_text[json_start:json_end]) if json_start != -1 else None
+        except json.JSONDecodeError as e:
+            print(f"❌ Erreur de parsing JSON du lot: {e}")
+            return {}
+        if not isinstance(items, list):
+            print("❌ Aucun tableau JSON trouvé dans la réponse groupée")
+            return {}
+        
+        # L'URL renvoyée peut différer légèrement de celle envoyée (slash final, www...)
+        urls = {canonicalize_url(article.url): article.url for article in articles}
+        products = {}
+        for item in items:
+            url = None
+            if isinstance(item, dict) and isinstance(item.get('url'), str):
+                url = urls.get(canonicalize_url(item['url']))
+            if url is None or url in products:
+                print("⚠️ Fiche du lot ignorée (URL absente, inconnue ou en double)")
+                continue
+            problem = self._validate_product(item)
+            if problem:
+                print(f"⚠️ Fiche du lot invalide pour {url} : {problem}")
+                continue
+            products[url] = item
+        return products
 
-{{
+    @staticmethod
+    def _validate_product(product_data):
+        """Raison du rejet d'une fiche, ou None si elle est exploitable."""
+        for field in REQUIRED_TEXT_FIELDS:
+            if not isinstance(product_data.get(field), str) or not product_data[field].strip():
+                return f"champ `{field}` manquant"
+        for field in REQUIRED_LIST_FIELDS:
+            values = product_data.get(field)
+            if not isinstance(values, list) or not values or not all(isinstance(value, str) for value in values):
+                return f"liste `{field}` manquante ou invalide"
+        return None
+
+    def _product_template(self, image, url=None):
+        """Modèle JSON d'une fiche ; en mode lot, le champ `url` identifie l'article d'origine."""
+        url_field = f'\n    "url": "{url}",' if url is not None else ''
+        return f"""{{{url_field}
     "name": "Nom complet du produit",
     "brand": "Marque du produit",
     "model": "Modèle exact du produit",
-    "image": "{article_data.get('image_url', '')}",
+    "image": "{image}",
     "amazonASIN": "ASIN_PLACEHOLDER",
     "publishDate": "YYYY-MM-DD",
     "updateDate": "YYYY-MM-DD",
@@ -237,35 +324,54 @@ Tu es un expert en rédaction de fiches produits techniques. À partir de l'arti
     "affiliateLink": "https://www.amazon.fr/dp/ASIN_PLACEHOLDER?tag=votretag-21",
     "category": "CHOISIR_UNE_CATEGORIE_PARMI_LA_LISTE_AUTORISEE",
     "tags": ["tag1", "tag2", "tag3"]
-}}
+}}"""
+
+    def _create_gemini_prompt(self, article_data):
+        """Crée le prompt pour UN SEUL article"""
+        
+        prompt = f"""
+Tu es un expert en rédaction de fiches produits techniques. À partir de l'article suivant, tu dois extraire les informations d'un produit et créer une fiche produit EXACTEMENT dans ce format JSON (respecte scrupuleusement la structure et l'ordre des champs) :
+
+{self._product_template(article_data.image_url)}
 
 ARTICLE À ANALYSER:
-URL: {article_data['url']}
-Titre: {article_data['title']}
-Contenu: {article_data['content'][:4000]}...
+URL: {article_data.url}
+Titre: {article_data.title}
+Contenu: {condense(article_data.paragraphs or article_data.content, self.content_tokens)}
 
 INSTRUCTIONS IMPORTANTES:
 1.  Extrait UNIQUEMENT les informations du produit principal mentionné dans cet article.
-2.  `name`: Nom complet et détaillé du produit.
-3.  `amazonASIN`: Si un ASIN Amazon est clairement identifiable dans l'article pour le produit principal, utilise-le. Sinon, conserve "ASIN_PLACEHOLDER".
-4.  `publishDate` et `updateDate`: Doivent être au format `YYYY-MM-DD`. Tu peux utiliser la date actuelle si non spécifiée.
-5.  `draft`: Toujours `false`.
-6.  `title`: Titre engageant et SEO-friendly pour la fiche produit, différent du nom du produit.
-7.  `hookIntro`: Introduction concise (1-2 phrases) qui capte l'attention.
-8.  `keyBenefits`: Liste d'au moins 2 bénéfices clés au format "Titre du Bénéfice : Description".
-9.  `keyFeatures`: Liste d'au moins 2 caractéristiques techniques importantes.
-10. `detailedSpecs`: Description technique détaillée.
-11. `socialProof`: Fournis un exemple de preuve sociale (ex: "Très populaire auprès des joueurs", "Recommandé par les experts", "Noté 4.5/5 étoiles par plus de 1000 utilisateurs"). Si non disponible, indique "Non spécifié".
-12. `warrantyInfo`: Fournis des informations sur la garantie (ex: "Couvert par une garantie constructeur de 2 ans", "Garantie limitée de 1 an"). Si non disponible, indique "Non spécifié".
-13. `ctaText`: Texte pour le bouton d'appel à l'action (ex: "Voir le Prix sur Amazon", "Comparer les Offres").
-14. `category`: DOIT être l'une des suivantes : "Moniteur", "Console", "PC", "Manette", "Jeux Vidéo". Ne pas inventer d'autres catégories.
-15. `tags`: Liste d'au moins 3 tags pertinents incluant marque, modèle et mots-clés.
+{PRODUCT_INSTRUCTIONS}
 16. Ta réponse ne doit contenir QUE l'objet JSON. N'ajoute aucun commentaire, explication, ou texte conversationnel avant ou après l'objet JSON.
 17. Réponds UNIQUEMENT avec le JSON, sans texte supplémentaire avant ou après.
 """
         
         return prompt
 
+    def _create_batch_prompt(self, articles):
+        """Crée UN prompt pour plusieurs articles : les consignes ne sont envoyées qu'une fois."""
+        blocks = "\n".join(
+            f"""
+--- ARTICLE {number} ---
+URL: {article.url}
+Image: {article.image_url or ''}
+Titre: {article.title}
+Contenu: {condense(article.paragraphs or article.content, self.content_tokens)}
+""" for number, article in enumerate(articles, 1))
+        
+        return f"""
+Tu es un expert en rédaction de fiches produits techniques. Pour CHACUN des {len(articles)} articles ci-dessous, tu dois extraire les informations d'un produit et créer une fiche produit. Réponds avec un tableau JSON contenant une fiche par article, chacune EXACTEMENT dans ce format (respecte scrupuleusement la structure et l'ordre des champs) :
+
+{self._product_template("URL Image de l'article", url="URL exacte de l'article")}
+
+ARTICLES À ANALYSER:
+{blocks}
+INSTRUCTIONS IMPORTANTES:
+1.  Pour chaque article, extrait UNIQUEMENT les informations du produit principal qu'il mentionne, sans mélanger les articles. `url` reprend EXACTEMENT l'URL de l'article et `image` son URL Image.
+{PRODUCT_INSTRUCTIONS}
+16. Ta réponse ne doit contenir QUE le tableau JSON, avec un objet par article, dans l'ordre des articles. N'ajoute aucun commentaire, explication, ou texte conversationnel avant ou après.
+"""
+
     def _parse_gemini_response(self, response_text):
         try:
             response_text = response_text.strip()
@@ -424,62 +530,186 @@ INSTRUCTIONS IMPORTANTES:
         print(f"🚀 Traitement de l'URL : {url}")
         
         # Scraper l'article
-        article_data = self.scrape_article(url) # Contient 'url', 'title', 'content', 'image_url', 'raw_html'
+        article_data = self.scrape_article(url) # ProductArticle : url, title, content, paragraphs, image_url
         
         if article_data is None:
             print(f"❌ Impossible de récupérer l'article de {url}")
             return None
         
-        print(f"✅ Article récupéré avec succès : {article_data['title']}")
+        print(f"✅ Article récupéré avec succès : {article_data.title}")
         
         # Générer la fiche produit
-        # On doit s'assurer que article_data['url'] est passé pour le canonical link
+        # On doit s'assurer que article_data.url est passé pour le canonical link
         product_sheet = self.generate_product_sheet(article_data) # article_data est passé ici
         
         return product_sheet
 
     def process_all_urls(self, urls):
-        """Traite TOUTES les URLs et génère UNE fiche par URL."""
-        print(f"🚀 Démarrage du traitement de {len(urls)} URL(s)...")
-        
-        results = []
-        
-        for i, url in enumerate(urls, 1):
-            print(f"\n--- Traitement {i}/{len(urls)} ---")
-            
-            # Traiter chaque URL individuellement
-            product_sheet = self.process_single_url(url)
-            
-            if product_sheet:
-                
-                filepath = self.save_to_file(product_sheet) 
-                
-                if filepath:
-                    results.append({
-                        'url': url,
-                        'filename': filepath,
-                        'success': True
-                    })
-                else:
-                    results.append({
-                        'url': url,
-                        'filename': None,
-                        'success': False
-                    })
+        """Traite TOUTES les URLs et génère UNE fiche par URL (une seule par page, même écrite autrement)."""
+        # Toutes les URLs du fichier sont traitées à chaque passage (pas d'ensemble d'URLs déjà vues) :
+        # le crawl incrémental ne régénère que les fiches dont l'article a changé
+        unique_urls = dedupe_urls(urls)
+        if len(unique_urls) < len(urls):
+            print(f"🔗 {len(urls) - len(unique_urls)} URL(s) en double ignorée(s) (même page)")
+        urls = unique_urls
+        print(f"🚀 Démarrage du traitement de {len(urls)} URL(s) (concurrence : {self.fetcher.concurrency})...")
+        
+        # Chaque URL est en échec tant que l'étage d'écriture ne l'a pas sauvegardée
+        results = {url: {'url': url, 'filename': None, 'success': False} for url in urls}
+        
+        if self.journal:
+            # Fiches déjà sauvegardées dans ce lot (reprise avec --resume)
+            for url, entry in self.journal.entries(urls).items():
+                if entry['status'] == SAVED:
+                    results[url].update({'filename': entry['output_path'], 'success': True})
+            saved = run_with_retries(self.journal, list(results), self._run_pipeline)
+        else:
+            saved = self._run_pipeline(list(results))
+        
+        for url, filepath in saved:
+            results[url].update({'filename': filepath, 'success': True})
+        
+        # Restituer les résultats dans l'ordre du fichier d'URLs
+        return list(results.values())
+
+    def _run_pipeline(self, urls):
+        pipeline = self._build_pipeline()
+        saved = asyncio.run(pipeline.run(interleave_by_host(urls)))
+        pipeline.report()
+        return saved
+
+    def _mark(self, url, status, error=None, output_path=None):
+        """Enregistre l'avancement d'une URL dans le journal du lot."""
+        if self.journal:
+            self.journal.mark(url, status, error=error, output_path=output_path)
+
+    def _build_pipeline(self):
+        """Pipeline téléchargement → parsing → génération → écriture, chaque étage avec ses workers."""
+        return Pipeline([
+            Stage('fetch', self._fetch_stage, workers_from_env('fetch', self.fetcher.concurrency)),
+            Stage('parse', self._parse_stage, workers_from_env('parse', self.parse_pool.workers)),
+            self._generate_stage_config(),
+            Stage('write', self._write_stage, workers_from_env('write', 1)),
+        ], queue_size=env_int('SCRAPX_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+
+    def _generate_stage_config(self):
+        workers = workers_from_env('generate', self.dispatcher.max_concurrency)
+        if self.batch_size > 1:
+            return Stage('generate', self._generate_batch_stage, workers, batch_size=self.batch_size)
+        return Stage('generate', self._generate_stage, workers)
+
+    async def _fetch_stage(self, url):
+        if self.journal:
+            self.journal.begin_attempt(url)
+        page = await self.fetcher.fetch(url)
+        if not page.ok:
+            print(f"❌ Erreur lors du scraping de {url}: {page.error}")
+            self._mark(url, FAILED, error=page.error)
+            return None
+        self._mark(url, FETCHED)
+        return page
+
+    async def _parse_stage(self, page):
+        # Parsing dans le pool de processus : seuls les octets et le texte extrait transitent
+        try:
+            if self.raw_html_store:
+                await asyncio.get_running_loop().run_in_executor(None, self.raw_html_store.save,
+                                                                 page.url, page.content)
+            article_data = await self.parse_pool.run(parse_product_page, page.content, self.html_parser,
+                                                     page.url, self._profile_for(page.url), self.content_extractor)
+        except Exception as e:
+            print(f"❌ Erreur inattendue pour {page.url}: {e}")
+            article_data = None
+        if article_data is None:
+            print(f"❌ Impossible de récupérer l'article de {page.url}")
+            self._mark(page.url, FAILED, error="Article illisible")
+            return None
+        print(f"✅ Article récupéré avec succès : {article_data.title}")
+        self._learn(page.url, article_data.profile)
+        article_data.profile = None
+        
+        article_data.content_hash = content_hash(article_data.title, article_data.content,
+                                                 article_data.image_url)
+        if self.crawl_state:
+            article_data.unchanged, article_data.output_path = self.crawl_state.check(
+                page.url, article_data.content_hash)
+        
+        # Même article repris par un autre site : pas d'appel Gemini, la fiche existante est réutilisée
+        if self.near_duplicates and not article_data.unchanged:
+            signature = await self.parse_pool.run(minhash_signature, article_data.content)
+            duplicate = await self.near_duplicates.find_saved(page.url, signature)
+            if duplicate:
+                original_url, output_path, score = duplicate
+                print(f"🧬 Quasi-doublon de {original_url} (similarité {score:.0%}), génération évitée : {page.url}")
+                article_data.duplicate_of, article_data.output_path = original_url, output_path
+                article_data.unchanged = True
+        return article_data
+
+    def _generate_stage(self, article_data):
+        if article_data.unchanged:
+            # Article source identique au passage précédent (ou quasi-doublon) : pas d'appel Gemini
+            return article_data
+        try:
+            product_sheet = self.generate_product_sheet(article_data)
+        except Exception:
+            # L'étage abandonne l'article : les quasi-doublons qui l'attendent ne doivent pas rester bloqués
+            self._release(article_data.url)
+            raise
+        return self._attach_sheet(article_data, product_sheet)
+
+    def _generate_batch_stage(self, batch):
+        """Génère en une requête les fiches d'un lot d'articles (mode SCRAPX_FICHE_BATCH_SIZE > 1)."""
+        pending = [article_data for article_data in batch if not article_data.unchanged]
+        try:
+            sheets = self.generate_product_sheets(pending) if pending else {}
+        except Exception:
+            for article_data in pending:
+                self._release(article_data.url)
+            raise
+        return [article_data if article_data.unchanged
+                else self._attach_sheet(article_data, sheets.get(article_data.url))
+                for article_data in batch]
+
+    def _attach_sheet(self, article_data, product_sheet):
+        if not product_sheet:
+            print(f"❌ Impossible de générer la fiche produit pour {article_data.url}")
+            self._mark(article_data.url, FAILED, error="Échec de la génération")
+            self._release(article_data.url)
+            return None
+        article_data.product_sheet = product_sheet
+        self._mark(article_data.url, GENERATED)
+        return article_data
+
+    def _write_stage(self, article_data):
+        url = article_data.url
+        if article_data.unchanged:
+            if article_data.duplicate_of:
+                print(f"🧬 Fiche de {article_data.duplicate_of} réutilisée : {article_data.output_path}")
             else:
-                print(f"❌ Impossible de générer la fiche produit pour {url}")
-                results.append({
-                    'url': url,
-                    'filename': None,
-                    'success': False
-                })
-            
-            # Pause entre les URLs pour éviter de surcharger les serveurs
-            if i < len(urls):
-                print("⏳ Pause de 2 secondes avant l'URL suivante...")
-                time.sleep(5)
-        
-        return results
+                print(f"♻️ Article inchangé, fiche conservée : {article_data.output_path}")
+            self._mark(url, SAVED, output_path=article_data.output_path)
+            return url, article_data.output_path
+        # Une fiche déjà produite pour cette URL est régénérée à la même place
+        try:
+            filepath = self.save_to_file(article_data.product_sheet, article_data.output_path)
+        except Exception:
+            self._release(url)
+            raise
+        if not filepath:
+            self._mark(url, FAILED, error="Échec de la sauvegarde")
+            self._release(url)
+            return None
+        if self.crawl_state:
+            self.crawl_state.record(url, article_data.content_hash, filepath)
+        if self.near_duplicates:
+            self.near_duplicates.record(url, filepath)
+        self._mark(url, SAVED, output_path=filepath)
+        return url, filepath
+
+    def _release(self, url):
+        """Libère la place réservée par `url` dans l'index des quasi-doublons."""
+        if self.near_duplicates:
+            self.near_duplicates.release(url)
 
     def _slugify(self, text):
         """Convertit un texte en slug (caractères simples, sans accents, avec tirets)."""
@@ -545,12 +775,21 @@ def main():
     parser = argparse.ArgumentParser(description='Génère des fiches produits à partir d\'articles web')
     parser.add_argument('--urls-file', '-f', default='urlfiche.txt', help='Fichier contenant les URLs (défaut: urlfiche.txt)')
     parser.add_argument('--single-url', '-u', help='Traiter une seule URL directement')
+    parser.add_argument('--concurrency', '-c', type=int, default=None,
+                        help=f'Nombre de téléchargements simultanés (défaut: SCRAPX_CONCURRENCY ou {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--delay', '-d', type=float, default=None,
+                        help=f'Délai minimal entre deux requêtes vers un même site, en secondes (défaut: SCRAPX_CRAWL_DELAY ou {DEFAULT_CRAWL_DELAY:g})')
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre le dernier lot interrompu là où il s'est arrêté")
     
     args = parser.parse_args()
     
     # Initialiser le scraper
     try:
-        scraper = ProductScraper()
+        load_dotenv()
+        concurrency = args.concurrency or env_int('SCRAPX_CONCURRENCY', DEFAULT_CONCURRENCY)
+        crawl_delay = args.delay if args.delay is not None else env_float('SCRAPX_CRAWL_DELAY', DEFAULT_CRAWL_DELAY)
+        scraper = ProductScraper(concurrency, crawl_delay)
     except ValueError as e:
         print(e)
         sys.exit(1)
@@ -568,9 +807,32 @@ def main():
             print(f"💡 Créez le fichier {args.urls_file} avec une URL par ligne.")
             sys.exit(1)
     
+    if scraper.journal and scraper.journal.open_run(resume=args.resume):
+        print(f"⏯️ Reprise du lot #{scraper.journal.run_id}")
+    
     # Traiter les URLs
     try:
         results = scraper.process_all_urls(urls)
+        if scraper.journal:
+            scraper.journal.finish()
+            scraper.journal.report()
+        scraper.fetcher.report()
+        if scraper.crawl_state:
+            scraper.crawl_state.report()
+        if scraper.raw_html_store:
+            scraper.raw_html_store.report()
+        if scraper.extraction_profiles:
+            scraper.extraction_profiles.report()
+            scraper.extraction_profiles.close()
+        if scraper.near_duplicates:
+            scraper.near_duplicates.report()
+            scraper.near_duplicates.close()
+        scraper.dispatcher.report()
+        scraper.model.report()
+        if scraper.batch_requests:
+            print(f"   Mode lot : {scraper.batch_requests} requête(s) groupée(s) (jusqu'à {scraper.batch_size} "
+                  f"articles chacune), {scraper.batch_retries} fiche(s) régénérée(s) seule(s)")
+        scraper.parse_pool.close()
         
         # Afficher le résumé
         successful = [r for r in results if r['success']]